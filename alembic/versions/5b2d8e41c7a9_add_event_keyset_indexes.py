@@ -0,0 +1,52 @@
+"""add event keyset indexes
+
+Revision ID: 5b2d8e41c7a9
+Revises: ef2910566747
+Create Date: 2026-10-17 09:12:40.118214
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2d8e41c7a9"
+down_revision: str | None = "ef2910566747"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Keyset pagination orders by (createdAt, id), which needs non-null keys
+    op.execute('UPDATE events SET "createdAt" = now() WHERE "createdAt" IS NULL')
+    op.alter_column(
+        "events",
+        "createdAt",
+        existing_type=sa.DateTime(),
+        nullable=False,
+        existing_server_default=sa.text("now()"),
+    )
+    op.create_index(
+        "ix_events_createdAt_id", "events", ["createdAt", "id"], unique=False
+    )
+    op.create_index(
+        "ix_events_name_createdAt_id",
+        "events",
+        ["name", "createdAt", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_name_createdAt_id", table_name="events")
+    op.drop_index("ix_events_createdAt_id", table_name="events")
+    op.alter_column(
+        "events",
+        "createdAt",
+        existing_type=sa.DateTime(),
+        nullable=True,
+        existing_server_default=sa.text("now()"),
+    )
@@ -0,0 +1,45 @@
+"""add event rollups
+
+Revision ID: a41f3c9d2e67
+Revises: 5b2d8e41c7a9
+Create Date: 2026-10-17 11:03:27.540912
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a41f3c9d2e67"
+down_revision: str | None = "5b2d8e41c7a9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_rollups",
+        sa.Column("resolution", sa.String(length=10), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("field", sa.String(length=200), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("sum", sa.Float(), nullable=True),
+        sa.Column("min", sa.Float(), nullable=True),
+        sa.Column("max", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("resolution", "name", "field", "bucket"),
+    )
+    op.create_table(
+        "event_rollup_dirty",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("name", "bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_rollup_dirty")
+    op.drop_table("event_rollups")
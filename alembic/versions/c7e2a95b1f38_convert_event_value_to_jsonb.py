@@ -0,0 +1,58 @@
+"""convert event value to jsonb
+
+Revision ID: c7e2a95b1f38
+Revises: a41f3c9d2e67
+Create Date: 2026-10-17 14:26:51.302117
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7e2a95b1f38"
+down_revision: str | None = "a41f3c9d2e67"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# A \u0000 escape, unless its backslash is itself escaped: it must follow an
+# even number of backslashes, as in "\\\u0000" but not "\\u0000"
+NUL_ESCAPE = r"(?<=(^|[^\\])(\\\\)*)\\u0000"
+
+
+def upgrade() -> None:
+    # jsonb cannot store NUL characters, which json accepted as \u0000 escapes
+    op.alter_column(
+        "events",
+        "value",
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        postgresql_using=(
+            f"regexp_replace(value::text, '{NUL_ESCAPE}', '\ufffd', 'g')::jsonb"
+        ),
+        existing_nullable=True,
+    )
+    op.create_index(
+        "ix_events_value_gin",
+        "events",
+        ["value"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"value": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_value_gin", table_name="events")
+    op.alter_column(
+        "events",
+        "value",
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        postgresql_using="value::json",
+        existing_nullable=True,
+    )
@@ -0,0 +1,82 @@
+"""partition events by createdAt
+
+Revision ID: d4f81b6a9c03
+Revises: c7e2a95b1f38
+Create Date: 2026-10-17 18:03:27.554190
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f81b6a9c03"
+down_revision: str | None = "c7e2a95b1f38"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = [
+    ("ix_events_id", ["id"], {}),
+    ("ix_events_createdAt_id", ["createdAt", "id"], {}),
+    ("ix_events_name_createdAt_id", ["name", "createdAt", "id"], {}),
+    (
+        "ix_events_value_gin",
+        ["value"],
+        {"postgresql_using": "gin", "postgresql_ops": {"value": "jsonb_path_ops"}},
+    ),
+]
+
+
+def upgrade() -> None:
+    # The existing table becomes the default partition as it is, without
+    # copying rows; `python -m api.utils.partitions backfill` moves them into
+    # range partitions
+    op.rename_table("events", "events_default")
+    op.drop_constraint("events_pkey", "events_default", type_="primary")
+    indexes = op.get_bind().execute(
+        sa.text("SELECT indexname FROM pg_indexes WHERE tablename = 'events_default'")
+    )
+    for (name,) in indexes.all():
+        # Names of the parent's indexes must stay free; equivalent indexes of
+        # the default partition are attached to them rather than rebuilt
+        new_name = f"events_default_{name.removeprefix('ix_events_')}"[:63]
+        op.execute(f'ALTER INDEX "{name}" RENAME TO "{new_name}"')
+
+    op.create_table(
+        "events",
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('events_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("value", postgresql.JSONB(), nullable=True),
+        sa.Column(
+            "createdAt", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        # Unique constraints on a partitioned table must include the
+        # partition key; ids still come from a single sequence
+        sa.PrimaryKeyConstraint("id", "createdAt", name="events_pkey"),
+        postgresql_partition_by='RANGE ("createdAt")',
+    )
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+    for name, columns, kwargs in INDEXES:
+        op.create_index(name, "events", columns, unique=False, **kwargs)
+    op.execute("ALTER TABLE events ATTACH PARTITION events_default DEFAULT")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE events_unpartitioned (LIKE events INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO events_unpartitioned SELECT * FROM events")
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY NONE")
+    op.drop_table("events")
+    op.rename_table("events_unpartitioned", "events")
+    op.create_primary_key("events_pkey", "events", ["id"])
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+    for name, columns, kwargs in INDEXES:
+        op.create_index(name, "events", columns, unique=False, **kwargs)
@@ -0,0 +1,42 @@
+"""add event dedup keys
+
+Revision ID: e8a3c5d17f42
+Revises: d4f81b6a9c03
+Create Date: 2026-10-17 20:41:09.318842
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8a3c5d17f42"
+down_revision: str | None = "d4f81b6a9c03"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_dedup_keys",
+        sa.Column("key", sa.String(length=200), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "createdAt", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_event_dedup_keys_createdAt"),
+        "event_dedup_keys",
+        ["createdAt"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_event_dedup_keys_createdAt"), table_name="event_dedup_keys")
+    op.drop_table("event_dedup_keys")
@@ -0,0 +1,271 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Hashable, Mapping
+from typing import Any, Literal
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.core.cache import TTLCache
+from api.core.config import settings
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+RouteClass = Literal["auth", "export", "ingest", "read"]
+
+# Shares of the connection pool given to each class by default
+POOL_SHARES: dict[RouteClass, float] = {
+    "ingest": 0.35,
+    "read": 0.4,
+    "export": 0.1,
+    "auth": 0.15,
+}
+
+# Health checks and metrics must answer under overload; live streams are
+# long-lived and capped by their own subscriber limit
+EXEMPT_PATHS = ("/health", "/metrics", "/events/stream")
+
+
+def route_class(method: str, path: str) -> RouteClass | None:
+    """Admission class of a request, None if it is not limited.
+
+    Event writes of any kind are ``ingest``, exports ``export`` and other
+    event requests ``read``.
+    """
+    if path.startswith(EXEMPT_PATHS):
+        return None
+    if path.startswith("/auth"):
+        return "auth"
+    if path.startswith("/events/export"):
+        return "export"
+    if path.startswith("/events"):
+        return "read" if method in ("GET", "HEAD") else "ingest"
+    return None
+
+
+class AdmissionLimiter:
+    """Limits how many requests of one class are handled at once.
+
+    Requests beyond ``limit`` wait in FIFO order, at most ``max_queue`` of
+    them. A request is shed when the queue is full or after it has waited
+    ``max_wait`` seconds, so that under overload requests fail fast instead
+    of piling up on database connection checkouts.
+    """
+
+    def __init__(self, limit: int, max_queue: int, max_wait: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_seconds_total = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def acquire(self) -> bool:
+        """Wait for a slot.
+
+        Returns:
+            bool: Whether the request was admitted; if so, ``release`` must
+                be called once it is handled
+        """
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self._admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # The slot may have been handed over just as the wait ended
+            handed_over = waiter.done() and not waiter.cancelled()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if asyncio.current_task().cancelling():
+                if handed_over:
+                    self.release()
+                raise
+            if not handed_over:
+                self._timed_out += 1
+                return False
+        waited = time.perf_counter() - queued
+        self._admitted += 1
+        self._wait_seconds_total += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        return True
+
+    def release(self) -> None:
+        """Free a slot, handing it to the longest waiting request if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """Occupancy, shed requests and queue waits."""
+        admitted = self._admitted
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "avg_wait_seconds": (
+                self._wait_seconds_total / admitted if admitted else 0.0
+            ),
+            "max_wait_seconds": self._max_wait_seconds,
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying a concurrency limit per route class.
+
+    Shed requests get a 503 with ``Retry-After`` without reaching the
+    application. A slot is held until the response has been sent.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiters: Mapping[RouteClass, AdmissionLimiter],
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.limiters = limiters
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limiter = self.limiters.get(route_class(scope["method"], scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+class RateLimiter:
+    """Token bucket rate limits per key, e.g. per user.
+
+    Each key may make ``burst`` requests at once and ``rate`` per second
+    after that. Buckets of the ``max_keys`` most recent keys are kept; a
+    forgotten bucket starts full again.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        self.rate = rate
+        self.burst = burst
+        # A bucket left alone until it has refilled is the same as a new one
+        self._buckets: TTLCache[Hashable, tuple[float, float]] = TTLCache(
+            maxsize=max_keys, ttl=burst / rate if rate > 0 else 0
+        )
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key: Hashable) -> float:
+        """Take a token from a key's bucket.
+
+        Args:
+            key: Rate-limited key
+
+        Returns:
+            float: 0 if the request is allowed, otherwise seconds until the
+                bucket has a token again
+        """
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(self.burst)
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        if tokens < 1:
+            self.limited += 1
+            return (1 - tokens) / self.rate
+        self._buckets.set(key, (tokens - 1, now))
+        self.allowed += 1
+        return 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Allowed and limited request counts."""
+        return {
+            "enabled": self.rate > 0,
+            "rate": self.rate,
+            "burst": self.burst,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def pool_capacity() -> int:
+    """Connections the primary pool can hand out at once."""
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+
+def default_limits(capacity: int) -> dict[RouteClass, int]:
+    """Split ``capacity`` concurrent requests between the route classes."""
+    return {
+        route: max(1, int(capacity * share)) for route, share in POOL_SHARES.items()
+    }
+
+
+def check_capacity(limiters: Mapping[RouteClass, AdmissionLimiter]) -> None:
+    """Warn when admitted requests may still queue for pool connections."""
+    admitted = sum(limiter.limit for limiter in limiters.values())
+    if admitted > pool_capacity():
+        logger.warning(
+            "Admission limits allow %d concurrent requests but the database "
+            "pool has %d connections; admitted requests may wait up to "
+            "DB_POOL_TIMEOUT for one",
+            admitted,
+            pool_capacity(),
+            extra={"admitted": admitted, "pool_capacity": pool_capacity()},
+        )
+
+
+admission_limiters: dict[RouteClass, AdmissionLimiter] = {
+    route: AdmissionLimiter(
+        limit=limit,
+        max_queue=limit * settings.ADMISSION_QUEUE_PER_SLOT,
+        max_wait=settings.ADMISSION_MAX_QUEUE_SECONDS,
+    )
+    for route, limit in (
+        settings.ADMISSION_LIMITS or default_limits(pool_capacity())
+    ).items()
+}
+
+# Authenticated requests per user, keyed by the token subject
+user_rate_limiter = RateLimiter(
+    rate=settings.RATE_LIMIT_PER_SECOND,
+    burst=settings.RATE_LIMIT_BURST,
+    max_keys=settings.RATE_LIMIT_MAX_USERS,
+)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,12 +9,145 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Event API"
     DATABASE_URL: str
     DEBUG: bool = False
+    # Logging, written to stdout by a background thread
+    LOG_LEVEL: str = "INFO"  # DEBUG=true forces DEBUG
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_QUEUE_SIZE: int = 10_000  # records buffered before new ones are dropped
+    # Fraction of INFO and DEBUG records kept per logger, sampled per request,
+    # e.g. {"api.access": 0.1, "api.src.events.routes": 0.01}
+    LOG_SAMPLING: dict[str, float] = {}
+
+    # Upgrade the database to the latest migration when a worker starts
+    MIGRATE_ON_STARTUP: bool = True
+
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED: bool = True
+    METRICS_SLOW_QUERY_SECONDS: float = 0.5  # statements logged and counted as slow
+
+    # Connection pool, per worker process; size + overflow across all workers
+    # must stay below the server's max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = -1  # seconds before a connection is replaced; -1 never
+    DB_POOL_PRE_PING: bool = False
+    # Prepared statements cached per connection; 0 behind pgbouncer
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # Read replicas, used round-robin for read-only queries
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0  # seconds between health checks
+    DB_REPLICA_MAX_LAG: float = 10.0  # seconds behind before ejection
+    DB_REPLICA_EJECT_SECONDS: float = 30.0  # time out of rotation after a failure
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # primary-only reads after a write
 
     # JWT Settings
     JWT_SECRET: str  # Change in production
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION: int = 30  # minutes
 
+    # Authenticated principal cache
+    AUTH_CACHE_TTL: float = 60.0  # seconds
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    # Accept tokens issued less than this many seconds ago from their claims
+    # alone, without looking the user up (0 disables)
+    AUTH_TRUST_CLAIMS_SECONDS: int = 0
+
+    # Password hashing runs in its own thread pool; logins beyond
+    # workers + queue are rejected with 503
+    AUTH_HASH_WORKERS: int = 2
+    AUTH_HASH_MAX_QUEUE: int = 32
+
+    # Admission control, per worker process: requests beyond a route class's
+    # concurrency limit wait in a bounded queue and are shed with 503 once it
+    # is full or they have waited too long. Classes: ingest (event writes),
+    # read (other event requests), export (GET /events/export, which holds
+    # its slot until the whole export has been sent) and auth. Without
+    # limits, the primary pool's size + overflow is split between the
+    # classes so that admitted requests do not queue for connections;
+    # classes absent from explicit limits are not limited
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LIMITS: dict[Literal["ingest", "read", "export", "auth"], int] = {}
+    ADMISSION_QUEUE_PER_SLOT: int = 10  # waiting requests per concurrency slot
+    ADMISSION_MAX_QUEUE_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER: int = 1  # seconds, sent with shed requests
+
+    # Token bucket rate limit per authenticated user, per worker process;
+    # requests over it get 429 (0 disables)
+    RATE_LIMIT_PER_SECOND: float = 0.0
+    RATE_LIMIT_BURST: int = 50
+    RATE_LIMIT_MAX_USERS: int = 10_000
+
+    # Event ingestion
+    EVENT_BATCH_MAX_SIZE: int = 10_000  # items per POST /events/batch
+    EVENT_BATCH_CHUNK_SIZE: int = 500  # rows per multi-row INSERT
+    EVENT_UPLOAD_CHUNK_SIZE: int = 5_000  # rows per COPY
+    EVENT_UPLOAD_MAX_LINE_BYTES: int = 1_048_576
+    EVENT_UPLOAD_MAX_REPORTED_ERRORS: int = 100
+    # Dedup keys of ingested events are remembered for this long; the most
+    # recent ones are also kept in memory, so retries skip claiming the key
+    EVENT_DEDUP_WINDOW_HOURS: float = 24.0
+    EVENT_DEDUP_RECENT_KEYS: int = 100_000  # per worker process
+    EVENT_DEDUP_EXPIRY_INTERVAL: float = 600.0  # seconds between expiry passes
+    EVENT_DEDUP_EXPIRY_BATCH: int = 10_000  # keys deleted per transaction
+    EVENT_BULK_CHUNK_SIZE: int = 1_000  # rows per transaction of bulk PATCH/DELETE
+
+    # Event listing
+    EVENT_PAGE_DEFAULT_LIMIT: int = 100
+    EVENT_PAGE_MAX_LIMIT: int = 1_000
+    EVENT_EXPORT_BATCH_SIZE: int = 5_000  # rows fetched per server-side cursor read
+    # Encode event reads straight from rows with orjson instead of going
+    # through response models
+    EVENT_FAST_JSON: bool = True
+
+    # Cache of encoded GET /events/ and GET /events/{id} responses, with
+    # ETags. The in-process cache is only invalidated by writes through its
+    # own worker, so by default the cache is enabled only with the shared
+    # Redis backend; enable it explicitly for single-worker deployments
+    EVENT_CACHE_ENABLED: bool | None = None
+    EVENT_CACHE_TTL: float = 60.0  # seconds
+    EVENT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # per worker process
+    # Share the cache between workers in Redis (needs the 'cache' extra)
+    EVENT_CACHE_REDIS_URL: str | None = None
+
+    # Live event stream at GET /events/stream, fed by LISTEN/NOTIFY
+    EVENT_STREAM_ENABLED: bool = True
+    EVENT_STREAM_MAX_SUBSCRIBERS: int = 1_000  # per worker process
+    EVENT_STREAM_QUEUE_SIZE: int = 256  # messages a subscriber may fall behind
+    EVENT_STREAM_KEEPALIVE: float = 15.0  # seconds between idle comments
+
+    # Dotted numeric paths in value that get an expression index
+    # (run `python -m api.utils.indexes` after changing)
+    EVENT_VALUE_INDEXED_PATHS: list[str] = []
+
+    # Event aggregation
+    EVENT_AGGREGATE_MAX_BUCKETS: int = 10_000
+    EVENT_SERIES_MAX_POINTS: int = 1_000_000  # raw points read per series query
+    EVENT_DOWNSAMPLE_MAX_POINTS: int = 10_000
+
+    # Event rollups (run `python -m api.utils.rollups rebuild` before enabling)
+    EVENT_ROLLUPS_ENABLED: bool = False
+    EVENT_ROLLUP_FIELDS: list[str] = []  # dotted numeric paths in value
+    EVENT_ROLLUP_COMPACT_INTERVAL: float = 5.0  # seconds
+    EVENT_ROLLUP_COMPACT_BATCH: int = 1_000  # dirty minute buckets per pass
+
+    # The events table is range-partitioned on createdAt; maintenance keeps
+    # upcoming partitions created and drops expired ones
+    EVENT_PARTITION_MAINTENANCE_ENABLED: bool = True
+    EVENT_PARTITION_INTERVAL: Literal["day", "month"] = "month"
+    EVENT_PARTITION_PREMAKE: int = 2  # upcoming partitions created ahead of time
+    EVENT_PARTITION_MAINTENANCE_INTERVAL: float = 3600.0  # seconds
+    # Drop events older than this, a whole partition at a time; rollups of
+    # dropped events are kept. None keeps events forever
+    EVENT_RETENTION_DAYS: int | None = None
+
+    # Write-behind ingest buffer for POST /events/
+    EVENT_BUFFER_ENABLED: bool = False
+    EVENT_BUFFER_MAX_BATCH: int = 500  # events per group commit
+    EVENT_BUFFER_MAX_DELAY_MS: int = 10  # longest wait before a flush
+    EVENT_BUFFER_MAX_QUEUE: int = 10_000
+    EVENT_BUFFER_DEFAULT_ACK: Literal["durable", "enqueue"] = "durable"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,13 +1,59 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import Pool
 
 from api.core.config import settings
+from api.core.metrics import instrument_engine
+from api.core.pool import InstrumentedQueuePool, pool_metrics
+from api.core.routing import ReplicaSet, RoutingSession
+
+
+def create_engine(url: str, poolclass: type[Pool] | None = None) -> AsyncEngine:
+    """Create an async engine with the configured pool settings."""
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # SQLAlchemy's own prepared statement cache and asyncpg's
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
 
 # Create async engine
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool)
+pool_metrics.instrument(engine)
+
+# Read replicas for queries marked with execution_options(replica=True)
+replicas = ReplicaSet(
+    [create_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    eject_seconds=settings.DB_REPLICA_EJECT_SECONDS,
+    sticky_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "primary")
+    for index, replica in enumerate(replicas.engines):
+        instrument_engine(replica, f"replica{index}")
 
 # Create async session factory
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_session = sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    replicas=replicas,
+    expire_on_commit=False,
+)
 
 # Create declarative base for models
 Base = declarative_base()
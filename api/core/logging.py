@@ -1,20 +1,211 @@
+import atexit
 import logging
+import queue
+import random
+import re
 import sys
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from api.core.config import settings
 
+# ID of the request being handled, added to every record logged while it is
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Incoming X-Request-ID values are reused only if they look like an ID
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "sample_rate",
+}
+
+_listener: QueueListener | None = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line.
+
+    Fields passed with ``extra`` are included as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None) is not None:
+            payload["request_id"] = record.request_id
+        if getattr(record, "sample_rate", None) is not None:
+            payload["sample_rate"] = record.sample_rate
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of a logger's records below WARNING.
+
+    Records are sampled per request, so a request that is kept keeps all of
+    its records from the logger; records outside requests are sampled at
+    random. Kept records carry the rate so that counts can be scaled back.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._threshold = rate * 2**32
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        current = request_id.get()
+        if current is not None:
+            keep = zlib.crc32(current.encode()) < self._threshold
+        else:
+            keep = random.random() < self.rate
+        if keep:
+            record.sample_rate = self.rate
+        return keep
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread without formatting or blocking.
+
+    Only the message is rendered in the calling thread, so that later changes
+    to its arguments do not show up in the output. Records are dropped,
+    and counted, when the queue is full rather than stalling the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        current = request_id.get()
+        if current is not None:
+            record.request_id = current
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logging() -> None:
-    """Set up logging configuration."""
-    format_string = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
-    logging.basicConfig(
-        level=logging.DEBUG if settings.DEBUG else logging.INFO,
-        format=format_string,
-        datefmt="%H:%M:%S",
-        stream=sys.stdout,
-    )
+    """Route all logging through a queue to a writer thread.
+
+    Records are written to stdout as JSON lines, or as text with
+    ``LOG_FORMAT=text``. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if settings.LOG_FORMAT == "json":
+        formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(
+            "[%(asctime)s] [%(levelname)s] [%(name)s] [%(request_id)s] %(message)s",
+            datefmt="%H:%M:%S",
+            defaults={"request_id": "-"},
+        )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG if settings.DEBUG else settings.LOG_LEVEL)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+
+    for name, rate in settings.LOG_SAMPLING.items():
+        logging.getLogger(name).addFilter(SamplingFilter(rate))
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance."""
     return logging.getLogger(name)
+
+
+access_logger = get_logger("api.access")
+
+
+class RequestLoggingMiddleware:
+    """ASGI middleware assigning request IDs and logging each request.
+
+    The ID comes from the ``X-Request-ID`` header when the client sends a
+    valid one and is generated otherwise; it is echoed in the response and
+    attached to every record logged while the request is handled. One
+    ``api.access`` record per request carries its status and duration.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")
+        current = incoming if _REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+        token = request_id.set(current)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-request-id", current.encode()),
+                ]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if access_logger.isEnabledFor(logging.INFO):
+                duration_ms = (time.perf_counter() - started) * 1000
+                access_logger.info(
+                    "%s %s %s %.1fms",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    duration_ms,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 3),
+                    },
+                )
+            request_id.reset(token)
@@ -0,0 +1,248 @@
+import time
+from collections.abc import Callable, Iterable, Mapping
+from contextvars import ContextVar
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+)
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.core.config import settings
+from api.core.logging import get_logger
+from api.core.pool import WAIT_BUCKETS, pool_metrics
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERIES_PER_REQUEST_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Route label of requests that matched no route, so that scanners probing
+# random paths cannot create unbounded label values
+UNMATCHED_ROUTE = "unmatched"
+
+http_requests = Counter(
+    "http_requests",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled.",
+    ["method"],
+)
+http_request_queries = Histogram(
+    "http_request_db_queries",
+    "Database statements run while handling one request.",
+    ["method", "route"],
+    buckets=QUERIES_PER_REQUEST_BUCKETS,
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time, by statement type.",
+    ["engine", "operation"],
+    buckets=QUERY_BUCKETS,
+)
+db_query_errors = Counter(
+    "db_query_errors",
+    "Database statements that raised an error.",
+    ["engine", "operation"],
+)
+db_slow_queries = Counter(
+    "db_slow_queries",
+    "Database statements slower than METRICS_SLOW_QUERY_SECONDS.",
+    ["engine", "operation"],
+)
+
+# Statements counted for the request being handled, None outside requests
+_request_queries: ContextVar[list[int] | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def operation(statement: str) -> str:
+    """Statement type used as a label, e.g. ``SELECT`` or ``INSERT``."""
+    keyword = statement.lstrip(" \n\t(").split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "UNKNOWN"
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement run through ``engine``.
+
+    Args:
+        engine: Engine to instrument
+        name: Value of the ``engine`` label, e.g. ``primary``
+    """
+    target = engine.sync_engine
+
+    @event.listens_for(target, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+    @event.listens_for(target, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        kind = operation(statement)
+        db_query_duration.labels(name, kind).observe(elapsed)
+        if elapsed >= settings.METRICS_SLOW_QUERY_SECONDS:
+            db_slow_queries.labels(name, kind).inc()
+            logger.warning(
+                "Slow %s on %s took %.3fs: %s",
+                kind,
+                name,
+                elapsed,
+                statement[:500],
+                extra={"operation": kind, "engine": name, "duration_s": elapsed},
+            )
+
+    @event.listens_for(target, "handle_error")
+    def handle_error(context):
+        started = context.connection and context.connection.info.get("query_started")
+        if started:
+            started.pop()
+        db_query_errors.labels(name, operation(context.statement or "")).inc()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and queries per route.
+
+    Routes are labelled with their path template (``/events/{event_id}``),
+    so label values stay bounded. Streaming responses are timed until their
+    last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _request_queries.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            http_requests.labels(method, path, str(status_code)).inc()
+            http_request_duration.labels(method, path).observe(elapsed)
+            http_request_queries.labels(method, path).observe(queries[0])
+
+
+class StatsCollector(Collector):
+    """Exports a component's existing stats as Prometheus metrics.
+
+    Numeric values of the mapping returned by ``stats`` become gauges named
+    ``{prefix}_{key}``, or counters for the keys listed in ``counters``.
+    Other values are skipped.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        stats: Callable[[], Mapping[str, Any]],
+        counters: Iterable[str] = (),
+    ):
+        self.prefix = prefix
+        self.stats = stats
+        self.counters = set(counters)
+
+    def collect(self):
+        for key, value in self.stats().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            if key in self.counters:
+                yield CounterMetricFamily(name, f"{self.prefix} {key}", value=value)
+            else:
+                yield GaugeMetricFamily(name, f"{self.prefix} {key}", value=value)
+
+
+class PoolCollector(Collector):
+    """Exports the connection pool's occupancy, churn and checkout waits."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def collect(self):
+        snapshot = pool_metrics.snapshot(self.engine)
+        waits = snapshot.pop("wait_seconds")
+        yield from StatsCollector(
+            "db_pool",
+            lambda: snapshot,
+            counters=(
+                "checkouts",
+                "timeouts",
+                "connections_opened",
+                "connections_closed",
+                "invalidations",
+            ),
+        ).collect()
+        buckets = [
+            (bound, waits["buckets"][bound])
+            for bound in (*map(str, WAIT_BUCKETS), "+Inf")
+        ]
+        yield HistogramMetricFamily(
+            "db_pool_wait_seconds",
+            "Time checkouts waited for a connection.",
+            buckets=buckets,
+            sum_value=waits["sum"],
+        )
+
+
+def render() -> tuple[bytes, str]:
+    """All metrics in Prometheus text format, with their content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,119 @@
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """Counters for connection checkouts, waits and churn of one engine."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        """Record how long a checkout waited for a connection."""
+        for index, bound in enumerate(WAIT_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            index = len(WAIT_BUCKETS)
+        self.wait_counts[index] += 1
+        self.wait_seconds_total += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """Count connection lifecycle events of ``engine``'s pool."""
+        target = engine.sync_engine
+
+        @event.listens_for(target, "checkout")
+        def on_checkout(*args):
+            self.checkouts += 1
+
+        @event.listens_for(target, "connect")
+        def on_connect(*args):
+            self.connects += 1
+
+        @event.listens_for(target, "close")
+        def on_close(*args):
+            self.closes += 1
+
+        @event.listens_for(target, "close_detached")
+        def on_close_detached(*args):
+            self.closes += 1
+
+        @event.listens_for(target, "invalidate")
+        def on_invalidate(*args):
+            self.invalidations += 1
+
+    def snapshot(self, engine: AsyncEngine) -> dict[str, Any]:
+        """Current pool occupancy together with the accumulated counters.
+
+        Wait buckets are cumulative, keyed by their upper bound in seconds.
+        """
+        pool = engine.pool
+        waits = sum(self.wait_counts)
+        buckets, running = {}, 0
+        for bound, count in zip((*WAIT_BUCKETS, "+Inf"), self.wait_counts):
+            running += count
+            buckets[str(bound)] = running
+        status = {"pool_class": type(pool).__name__}
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            status.update(
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return {
+            **status,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connections_opened": self.connects,
+            "connections_closed": self.closes,
+            "invalidations": self.invalidations,
+            "wait_seconds": {
+                "count": waits,
+                "sum": self.wait_seconds_total,
+                "avg": self.wait_seconds_total / waits if waits else 0,
+                "max": self.max_wait_seconds,
+                "buckets": buckets,
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waits for a connection.
+
+    The wait includes opening a new connection when the pool grows and the
+    pre-ping, if enabled.
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - started)
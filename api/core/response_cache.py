@@ -0,0 +1,337 @@
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request, Response, status
+
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Rough per-entry bookkeeping cost, counted against the byte budget
+ENTRY_OVERHEAD = 200
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Encoded response body and its strong ETag."""
+
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``.
+
+    ``If-None-Match`` uses weak comparison, so ``W/`` prefixes are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def conditional_response(
+    entry: CachedResponse, request: Request, media_type: str = "application/json"
+) -> Response:
+    """Send ``entry``, or 304 Not Modified if the client already has it."""
+    headers = {"ETag": entry.etag}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
+class ResponseCacheBackend(ABC):
+    """Storage for cached responses.
+
+    Entries are tagged with what they were built from. Invalidating a tag
+    drops its entries and bumps its version; an entry is only stored or
+    served under the current versions of its tags, so a response built from
+    data read before a write can never be cached after it.
+    """
+
+    name = "none"
+    evictions = 0
+
+    @abstractmethod
+    async def versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        """Current versions of ``tags``."""
+
+    @abstractmethod
+    async def get(self, key: str, versions: tuple[int, ...]) -> CachedResponse | None:
+        """Get the entry stored under ``key`` at ``versions``."""
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        versions: tuple[int, ...],
+        entry: CachedResponse,
+        tags: Sequence[str],
+    ) -> None:
+        """Store an entry built while ``tags`` were at ``versions``."""
+
+    @abstractmethod
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        """Drop all entries carrying any of ``tags``."""
+
+    def usage(self) -> dict[str, int | None]:
+        """Number of entries and bytes held, where known."""
+        return {"entries": None, "bytes": None}
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+
+class MemoryBackend(ResponseCacheBackend):
+    """In-process LRU storage bounded by a byte budget.
+
+    Not thread-safe; meant to be used from the event loop only. Each worker
+    process has its own copy, so a write through one worker invalidates only
+    that worker's entries; the others serve theirs until ``ttl`` expires.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[
+            str, tuple[float, tuple[int, ...], CachedResponse, Sequence[str]]
+        ] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._keys_by_tag: dict[str, set[str]] = {}
+
+    async def versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    async def get(self, key: str, versions: tuple[int, ...]) -> CachedResponse | None:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        expires, stored_versions, entry, _ = stored
+        if expires <= time.monotonic() or stored_versions != versions:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(
+        self,
+        key: str,
+        versions: tuple[int, ...],
+        entry: CachedResponse,
+        tags: Sequence[str],
+    ) -> None:
+        size = _size(key, entry)
+        if self.ttl <= 0 or size > self.max_bytes:
+            return
+        if await self.versions(tags) != versions:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, versions, entry, tags)
+        self.bytes += size
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            for key in self._keys_by_tag.pop(tag, ()):
+                self._drop(key)
+
+    def usage(self) -> dict[str, int | None]:
+        return {"entries": len(self._entries), "bytes": self.bytes}
+
+    def _drop(self, key: str) -> None:
+        stored = self._entries.pop(key, None)
+        if stored is None:
+            return
+        _, _, entry, tags = stored
+        self.bytes -= _size(key, entry)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class RedisBackend(ResponseCacheBackend):
+    """Storage shared by all workers in Redis (requires the ``cache`` extra).
+
+    Tag versions are Redis counters that are part of every entry's key, so
+    invalidation is a single ``INCR`` per tag; entries under old versions are
+    never read again and expire after ``ttl``. Memory is bounded by the
+    server's ``maxmemory`` policy rather than by this process.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "visi:responses:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "A shared response cache requires the redis package "
+                "(install the 'cache' extra)"
+            ) from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def versions(self, tags: Sequence[str]) -> tuple[int, ...]:
+        values = await self.client.mget([self._tag_key(tag) for tag in tags])
+        return tuple(int(value or 0) for value in values)
+
+    async def get(self, key: str, versions: tuple[int, ...]) -> CachedResponse | None:
+        value = await self.client.get(self._entry_key(key, versions))
+        if value is None:
+            return None
+        etag, body = value.split(b"\n", 1)
+        return CachedResponse(body=body, etag=etag.decode())
+
+    async def set(
+        self,
+        key: str,
+        versions: tuple[int, ...],
+        entry: CachedResponse,
+        tags: Sequence[str],
+    ) -> None:
+        if self.ttl <= 0:
+            return
+        await self.client.set(
+            self._entry_key(key, versions),
+            entry.etag.encode() + b"\n" + entry.body,
+            px=int(self.ttl * 1000),
+        )
+
+    async def invalidate(self, tags: Sequence[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for tag in tags:
+                pipeline.incr(self._tag_key(tag))
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _entry_key(self, key: str, versions: tuple[int, ...]) -> str:
+        return f"{self.prefix}{key}@{'.'.join(map(str, versions))}"
+
+
+class ResponseCache:
+    """Cache of encoded responses in front of a backend, with hit counters.
+
+    Backend failures are logged and treated as misses, so that an outage of
+    a shared cache degrades to uncached responses rather than errors.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get_or_set(
+        self,
+        key: str,
+        tags: Sequence[str],
+        produce: Callable[[], Awaitable[bytes]],
+    ) -> CachedResponse:
+        """Get a cached response, or build and cache it.
+
+        Args:
+            key: Cache key, identifying the request
+            tags: What the response is built from, for invalidation
+            produce: Builds the encoded response on a miss
+
+        Returns:
+            CachedResponse: Response body and ETag
+        """
+        if not self.enabled:
+            body = await produce()
+            return CachedResponse(body=body, etag=make_etag(body))
+
+        versions = None
+        try:
+            versions = await self.backend.versions(tags)
+            entry = await self.backend.get(key, versions)
+        except Exception as e:
+            self._failed("read", e)
+            entry = None
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        body = await produce()
+        entry = CachedResponse(body=body, etag=make_etag(body))
+        if versions is not None:
+            try:
+                await self.backend.set(key, versions, entry, tags)
+            except Exception as e:
+                self._failed("write", e)
+        return entry
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop cached responses built from any of ``tags``."""
+        if not self.enabled:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.invalidate(tags)
+        except Exception as e:
+            self._failed("invalidation", e)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and memory use."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **self.backend.usage(),
+        }
+
+    async def close(self) -> None:
+        """Release the backend's connections."""
+        await self.backend.close()
+
+    def _failed(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning(
+            "Response cache %s failed: %s",
+            operation,
+            error,
+            extra={"operation": operation},
+        )
+
+
+def _size(key: str, entry: CachedResponse) -> int:
+    return len(key) + len(entry.body) + len(entry.etag) + ENTRY_OVERHEAD
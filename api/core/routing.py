@@ -0,0 +1,206 @@
+import asyncio
+import time
+from collections.abc import Hashable
+from contextvars import ContextVar
+from functools import partial
+from typing import Any
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Executable
+
+from api.core.cache import TTLCache
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Identifies the client of the current request (the user ID once
+# authenticated) so that its reads can follow its own writes
+read_your_writes_key: ContextVar[Hashable | None] = ContextVar(
+    "read_your_writes_key", default=None
+)
+
+# Replication delay of a standby; 0 when it has replayed everything received,
+# so that an idle primary does not make replicas look stale
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReplicaSet:
+    """Read replicas used round-robin, with health-based ejection.
+
+    A replica is ejected for ``eject_seconds`` when the database reports a
+    broken or refused connection, and by the periodic health check for as
+    long as it does not answer (including unreachable hosts) or lags more
+    than ``max_lag`` seconds behind. Clients that wrote within the last
+    ``sticky_seconds`` read from the primary.
+    """
+
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        eject_seconds: float,
+        sticky_seconds: float,
+        max_lag: float,
+        check_interval: float,
+    ):
+        self.engines = engines
+        self.eject_seconds = eject_seconds
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = 0
+        self._ejected_until = [0.0] * len(engines)
+        self._reasons: list[str | None] = [None] * len(engines)
+        self._lags: list[float | None] = [None] * len(engines)
+        self._recent_writers: TTLCache[Hashable, bool] = TTLCache(
+            maxsize=100_000, ttl=sticky_seconds
+        )
+        self._task: asyncio.Task | None = None
+        for index, engine in enumerate(engines):
+            event.listen(
+                engine.sync_engine, "handle_error", partial(self._on_error, index)
+            )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any replica is configured."""
+        return bool(self.engines)
+
+    @property
+    def running(self) -> bool:
+        """Whether health checks are running."""
+        return self._task is not None
+
+    def pick(self) -> Engine | None:
+        """Next healthy replica in round-robin order, or None if all are out."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            if self._ejected_until[index] <= now:
+                return self.engines[index].sync_engine
+        return None
+
+    def eject(self, index: int, reason: str) -> None:
+        """Take a replica out of rotation for ``eject_seconds``."""
+        if self._ejected_until[index] <= time.monotonic():
+            logger.warning(
+                "Ejecting replica %d: %s",
+                index,
+                reason,
+                extra={"replica": index, "reason": reason},
+            )
+        self._ejected_until[index] = time.monotonic() + self.eject_seconds
+        self._reasons[index] = reason
+
+    def mark_write(self) -> None:
+        """Route the current client's reads to the primary for a while."""
+        key = read_your_writes_key.get()
+        if key is not None:
+            self._recent_writers.set(key, True)
+
+    def wrote_recently(self) -> bool:
+        """Whether the current client wrote within the stickiness window."""
+        key = read_your_writes_key.get()
+        return key is not None and self._recent_writers.get(key) is not None
+
+    async def check(self) -> None:
+        """Measure replication lag of every replica and eject unhealthy ones."""
+        for index, engine in enumerate(self.engines):
+            try:
+                async with engine.connect() as connection:
+                    lag = float(await connection.scalar(LAG_QUERY))
+            except Exception as e:
+                self._lags[index] = None
+                self.eject(index, f"health check failed: {str(e)}")
+                continue
+            self._lags[index] = lag
+            if lag > self.max_lag:
+                self.eject(index, f"lagging {lag:.1f}s behind")
+            elif self._ejected_until[index]:
+                logger.info(
+                    "Replica %d is back in rotation", index, extra={"replica": index}
+                )
+                self._ejected_until[index] = 0.0
+                self._reasons[index] = None
+
+    def status(self) -> list[dict[str, Any]]:
+        """Health of every replica."""
+        now = time.monotonic()
+        return [
+            {
+                "host": engine.url.host,
+                "healthy": self._ejected_until[index] <= now,
+                "lag_seconds": self._lags[index],
+                "ejected_reason": self._reasons[index],
+            }
+            for index, engine in enumerate(self.engines)
+        ]
+
+    async def start(self) -> None:
+        """Start checking replica health in the background."""
+        if self.running or not self.enabled:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Health checks started for %d replicas", len(self.engines))
+
+    async def stop(self) -> None:
+        """Stop health checks and close replica connections."""
+        if self.running:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def _on_error(self, index: int, context: ExceptionContext) -> None:
+        """Eject a replica whose connection broke or could not be opened."""
+        if context.is_disconnect or context.connection is None:
+            self.eject(index, str(context.original_exception))
+
+
+class RoutingSession(Session):
+    """Session that sends statements marked ``replica=True`` to a replica.
+
+    Everything else, including all writes, goes to the primary. Once a session
+    has written, or its client wrote recently, its reads stay on the primary;
+    a session keeps using the replica it first read from so its reads are
+    consistent with each other. Sessions with ``info["primary"]`` set, such as
+    those filling a cache, never use replicas.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        replicas = self.replicas
+        if replicas is not None and replicas.enabled:
+            if self._flushing or getattr(clause, "is_dml", False):
+                self.info["wrote"] = True
+                replicas.mark_write()
+            elif (
+                isinstance(clause, Executable)
+                and clause.get_execution_options().get("replica")
+                and not self.info.get("wrote")
+                and not self.info.get("primary")
+                and not replicas.wrote_recently()
+            ):
+                bind = self.info.get("replica") or replicas.pick()
+                if bind is not None:
+                    self.info["replica"] = bind
+                    return bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
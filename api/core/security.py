@@ -1,11 +1,27 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.core.admission import user_rate_limiter
+from api.core.cache import TTLCache
 from api.core.config import settings
+from api.core.database import get_session
+from api.core.exceptions import (
+    NotFoundException,
+    ServiceUnavailableException,
+    TooManyRequestsException,
+)
+from api.core.routing import read_your_writes_key
+from api.src.users.schemas import PasswordHashingStats
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -14,6 +30,25 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by request handlers."""
+
+    id: int
+    email: str
+
+
+# Principals of recently authenticated users, keyed by user ID
+principal_cache: TTLCache[int, Principal] = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL
+)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Forget the cached principal of a user whose row has changed."""
+    principal_cache.pop(user_id)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,18 +59,136 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt in a dedicated thread pool so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once and ``max_queue`` more may wait;
+    further calls are rejected with a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._hash_seconds_total = 0.0
+        self._max_hash_seconds = 0.0
+        self._wait_seconds_total = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash off the event loop."""
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Generate password hash off the event loop."""
+        return await self._submit(get_password_hash, password)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; they are recreated on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> PasswordHashingStats:
+        """Snapshot of pool saturation and hash latency."""
+        completed = self._completed
+        return PasswordHashingStats(
+            workers=self.workers,
+            max_queue=self.max_queue,
+            in_flight=self._in_flight,
+            queued=self._in_flight - self._running,
+            completed=completed,
+            rejected=self._rejected,
+            avg_hash_seconds=self._hash_seconds_total / completed if completed else 0,
+            max_hash_seconds=self._max_hash_seconds,
+            avg_wait_seconds=self._wait_seconds_total / completed if completed else 0,
+            max_wait_seconds=self._max_wait_seconds,
+        )
+
+    async def _submit(self, fn, *args):
+        """Run ``fn`` on the pool, or shed the call if the queue is full."""
+        if self._in_flight >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise ServiceUnavailableException("Too many concurrent logins, retry later")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            loop.call_soon_threadsafe(self._started, started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                loop.call_soon_threadsafe(self._finished, time.perf_counter() - started)
+
+        # Counters are released when the thread finishes, not when the caller
+        # gives up, so a cancelled request still occupies its slot until then
+        self._in_flight += 1
+        future = self._executor.submit(timed)
+        return await asyncio.wrap_future(future)
+
+    def _started(self, waited: float) -> None:
+        self._running += 1
+        self._wait_seconds_total += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+    def _finished(self, took: float) -> None:
+        self._running -= 1
+        self._in_flight -= 1
+        self._completed += 1
+        self._hash_seconds_total += took
+        self._max_hash_seconds = max(self._max_hash_seconds, took)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.AUTH_HASH_WORKERS, max_queue=settings.AUTH_HASH_MAX_QUEUE
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (
         expires_delta or timedelta(minutes=settings.JWT_EXPIRATION)
     )
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Dependency to get current authenticated user."""
+def _trusted_principal(payload: dict) -> Principal | None:
+    """Build a principal from the token claims if they are fresh enough."""
+    issued_at = payload.get("iat")
+    email = payload.get("email")
+    if settings.AUTH_TRUST_CLAIMS_SECONDS <= 0 or issued_at is None or not email:
+        return None
+    if time.time() - issued_at > settings.AUTH_TRUST_CLAIMS_SECONDS:
+        return None
+    return Principal(id=int(payload["sub"]), email=email)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_session),
+) -> Principal:
+    """Dependency to get current authenticated user.
+
+    Tokens issued within ``AUTH_TRUST_CLAIMS_SECONDS`` are trusted from their
+    claims alone. Otherwise the user is looked up once per
+    ``AUTH_CACHE_TTL`` using the request's own session.
+
+    Requests are rate-limited per token subject before the user is looked
+    up. The lookup's transaction is ended straight away, so that a route
+    that never uses the session does not pin a pool connection.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials",
@@ -46,18 +199,32 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
         raise credentials_exception
+    retry_after = user_rate_limiter.take(user_id)
+    if retry_after:
+        raise TooManyRequestsException(
+            "Rate limit exceeded", retry_after=math.ceil(retry_after)
+        )
+    read_your_writes_key.set(user_id)
+
+    principal = _trusted_principal(payload) or principal_cache.get(user_id)
+    if principal is not None:
+        return principal
 
     # Import here to avoid circular imports
-    from api.core.database import get_session
-    from api.src.users.service import UserService
-
-    async for session in get_session():
-        user = await UserService(session).get_user(int(user_id))
-        if user is None:
-            raise credentials_exception
-        return user
+    from api.src.users.repository import UserRepository
+
+    try:
+        user = await UserRepository(session).get_by_id(user_id)
+        principal = Principal(id=user.id, email=user.email)
+    except NotFoundException:
+        raise credentials_exception
+    finally:
+        # Hand the connection back to the pool rather than hold it, idle in
+        # transaction, for as long as the request lasts; streamed responses
+        # can outlive their dependencies by hours
+        await session.rollback()
+    principal_cache.set(user_id, principal)
+    return principal
@@ -0,0 +1,74 @@
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from api.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def process_uptime() -> float | None:
+    """Seconds since this process started, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Fields after the parenthesized command name; starttime is field 22
+            start_ticks = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as uptime:
+            system_uptime = float(uptime.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return system_uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+
+
+class StartupReport:
+    """Durations of the phases of application startup."""
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.notes: dict[str, str] = {}
+        self.ready_after: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    def begin(self) -> None:
+        """Record how long the process took to reach the lifespan."""
+        self.phases.clear()
+        self.notes.clear()
+        self.ready_after = None
+        uptime = process_uptime()
+        if uptime is not None:
+            self.phases["interpreter_and_imports"] = uptime
+
+    def finish(self) -> None:
+        """Record readiness and log the breakdown."""
+        self.ready_after = process_uptime()
+        breakdown = ", ".join(
+            f"{name} {seconds:.3f}s" for name, seconds in self.phases.items()
+        )
+        total = f"{self.ready_after:.3f}s" if self.ready_after is not None else "?"
+        logger.info(
+            "Ready %s after process start: %s",
+            total,
+            breakdown,
+            extra={"ready_after": self.ready_after, "phases": dict(self.phases)},
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Report for the health endpoint."""
+        return {
+            "ready_after_seconds": self.ready_after,
+            "phases": self.phases,
+            "notes": self.notes,
+        }
+
+
+startup_report = StartupReport()
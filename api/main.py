@@ -1,35 +1,185 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Response
+from prometheus_client import REGISTRY
+
+from api.core.admission import (
+    AdmissionMiddleware,
+    admission_limiters,
+    check_capacity,
+    user_rate_limiter,
+)
 from api.core.config import settings
-from api.core.logging import get_logger, setup_logging
+from api.core.database import engine, replicas
+from api.core.logging import RequestLoggingMiddleware, get_logger, setup_logging
+from api.core.metrics import MetricsMiddleware, PoolCollector, StatsCollector, render
+from api.core.pool import pool_metrics
+from api.core.security import password_hasher, principal_cache
+from api.core.startup import startup_report
+from api.src.events.buffer import ingest_buffer
+from api.src.events.cache import event_cache
+from api.src.events.dedup import dedup_key_expirer
+from api.src.events.live import event_broadcaster
+from api.src.events.partitions import partition_maintainer
+from api.src.events.rollups import rollup_compactor
 from api.src.events.routes import router as events_router
 from api.src.users.routes import router as auth_router
-from api.utils.migrations import run_migrations
+from api.utils.migrations import migrate
 
 # Set up logging configuration
 setup_logging()
 
-# Optional: Run migrations on startup
-run_migrations()
-
 # Set up logger for this module
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Migrate, start background workers, and flush them on shutdown."""
+    startup_report.begin()
+    if settings.ADMISSION_ENABLED:
+        check_capacity(admission_limiters)
+    if settings.MIGRATE_ON_STARTUP:
+        with startup_report.phase("migrations"):
+            startup_report.notes["migrations"] = await migrate()
+    with startup_report.phase("background_workers"):
+        await replicas.start()
+        await dedup_key_expirer.start()
+        if settings.EVENT_BUFFER_ENABLED:
+            await ingest_buffer.start()
+        if settings.EVENT_ROLLUPS_ENABLED:
+            await rollup_compactor.start()
+        if settings.EVENT_PARTITION_MAINTENANCE_ENABLED:
+            await partition_maintainer.start()
+        if settings.EVENT_STREAM_ENABLED:
+            await event_broadcaster.start()
+    startup_report.finish()
+    yield
+    await ingest_buffer.stop()
+    await rollup_compactor.stop()
+    await partition_maintainer.stop()
+    await dedup_key_expirer.stop()
+    await event_broadcaster.stop()
+    password_hasher.shutdown()
+    await replicas.stop()
+    await event_cache.close()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(events_router)
 
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiters=admission_limiters,
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(PoolCollector(engine))
+    REGISTRY.register(
+        StatsCollector(
+            "auth_principal_cache",
+            lambda: {
+                "hits": principal_cache.hits,
+                "misses": principal_cache.misses,
+                "entries": len(principal_cache),
+            },
+            counters=("hits", "misses"),
+        )
+    )
+    REGISTRY.register(
+        StatsCollector(
+            "password_hashing",
+            lambda: password_hasher.stats().model_dump(),
+            counters=("completed", "rejected"),
+        )
+    )
+    REGISTRY.register(
+        StatsCollector(
+            "ingest_buffer",
+            lambda: ingest_buffer.stats().model_dump(),
+            counters=("flushes", "flushed_events", "failed_events"),
+        )
+    )
+    REGISTRY.register(
+        StatsCollector(
+            "event_stream",
+            lambda: event_broadcaster.stats().model_dump(),
+            counters=("received", "delivered", "dropped_subscribers", "reconnects"),
+        )
+    )
+    for route, limiter in admission_limiters.items():
+        REGISTRY.register(
+            StatsCollector(
+                f"admission_{route}",
+                limiter.stats,
+                counters=("admitted", "rejected", "timed_out"),
+            )
+        )
+    REGISTRY.register(
+        StatsCollector(
+            "user_rate_limit",
+            user_rate_limiter.stats,
+            counters=("allowed", "limited"),
+        )
+    )
+    REGISTRY.register(
+        StatsCollector(
+            "event_cache",
+            event_cache.stats,
+            counters=("hits", "misses", "evictions", "invalidations", "errors"),
+        )
+    )
+
+# Outermost, so that everything else logs with the request's ID
+app.add_middleware(RequestLoggingMiddleware)
+
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/startup")
+async def startup_status():
+    """Breakdown of how long this worker took to start."""
+    return startup_report.as_dict()
+
+
+@app.get("/health/pool")
+async def pool_status():
+    """Database connection pool occupancy, checkout waits and churn."""
+    return {**pool_metrics.snapshot(engine), "replicas": replicas.status()}
+
+
+@app.get("/health/admission")
+async def admission_status():
+    """Occupancy and shed requests per route class, and user rate limits."""
+    return {
+        "enabled": settings.ADMISSION_ENABLED,
+        "classes": {
+            route: limiter.stats() for route, limiter in admission_limiters.items()
+        },
+        "user_rate_limit": user_rate_limiter.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metrics in Prometheus text format."""
+    body, content_type = render()
+    return Response(body, media_type=content_type)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
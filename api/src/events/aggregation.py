@@ -0,0 +1,91 @@
+import re
+from datetime import timedelta
+from typing import Literal
+
+from sqlalchemy import Float, String, bindparam, case, cast, func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+from api.core.exceptions import BadRequestException
+from api.src.events.models import Event
+
+Aggregate = Literal["count", "sum", "avg", "min", "max"]
+
+BUCKET_UNITS = {
+    "s": timedelta(seconds=1),
+    "m": timedelta(minutes=1),
+    "h": timedelta(hours=1),
+    "d": timedelta(days=1),
+    "w": timedelta(weeks=1),
+}
+
+_BUCKET_PATTERN = re.compile(r"^(\d+)([smhdw])$")
+
+
+def parse_bucket(spec: str) -> timedelta:
+    """Parse a bucket width such as ``30s``, ``5m``, ``1h`` or ``1d``.
+
+    Args:
+        spec: Bucket width
+
+    Returns:
+        timedelta: Parsed width
+
+    Raises:
+        BadRequestException: If the width is malformed or zero
+    """
+    match = _BUCKET_PATTERN.match(spec)
+    if not match or int(match.group(1)) == 0:
+        raise BadRequestException(f"Invalid bucket {spec!r}")
+    return int(match.group(1)) * BUCKET_UNITS[match.group(2)]
+
+
+def parse_path(field: str) -> tuple[str, ...]:
+    """Split a dotted path into ``Event.value`` such as ``cpu.load``.
+
+    Args:
+        field: Dotted path
+
+    Returns:
+        tuple[str, ...]: Path segments
+
+    Raises:
+        BadRequestException: If the path has empty segments
+    """
+    path = tuple(field.split("."))
+    if not all(path):
+        raise BadRequestException(f"Invalid field {field!r}")
+    return path
+
+
+def path_literal(path: tuple[str, ...]) -> str:
+    """Render path segments as a Postgres text array literal."""
+    quoted = (
+        '"' + part.replace("\\", "\\\\").replace('"', '\\"') + '"' for part in path
+    )
+    return "{" + ",".join(quoted) + "}"
+
+
+def numeric_value(path: tuple[str, ...]) -> ColumnElement[float]:
+    """SQL expression for a numeric path in ``Event.value``.
+
+    Evaluates to NULL where the path is missing or not a JSON number, so that
+    aggregates skip those events instead of failing on the cast. The path is
+    rendered inline rather than bound, so the expression matches the
+    expression indexes created for hot paths.
+
+    Args:
+        path: Path segments
+
+    Returns:
+        ColumnElement[float]: Numeric value or NULL
+    """
+    literal_path = bindparam(
+        None, path_literal(path), type_=String, literal_execute=True
+    )
+    return case(
+        (
+            func.jsonb_typeof(Event.value.op("#>")(literal_path))
+            == literal_column("'number'"),
+            cast(Event.value.op("#>>")(literal_path), Float),
+        )
+    )
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import settings
+from api.core.database import async_session
+from api.core.logging import get_logger
+from api.src.events.models import Event
+from api.src.events.repository import EventRepository
+from api.src.events.schemas import EventCreate, IngestBufferStats
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class IngestBuffer:
+    """Write-behind buffer that group-commits events from concurrent requests.
+
+    Submitted events are queued and written by a background task in a single
+    transaction once ``max_batch`` events are pending or ``max_delay_ms`` has
+    passed since the first of them arrived.
+    """
+
+    def __init__(
+        self,
+        max_batch: int,
+        max_delay_ms: int,
+        max_queue: int,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_queue = max_queue
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._flushes = 0
+        self._flushed_events = 0
+        self._failed_events = 0
+        self._last_flush_size = 0
+        self._flush_size_total = 0
+        self._flush_seconds_total = 0.0
+        self._last_flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the buffer accepts events."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start the background flush task."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Ingest buffer started")
+
+    async def stop(self) -> None:
+        """Flush pending events and stop the background task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        await self._queue.put(_STOP)
+        await task
+        logger.info("Ingest buffer stopped")
+
+    async def submit(self, event_data: EventCreate, wait: bool = True) -> Event | None:
+        """Queue an event for the next flush.
+
+        Args:
+            event_data: Event creation data
+            wait: Whether to wait until the event is committed
+
+        Returns:
+            Event | None: Created event, or None if not waiting for the flush
+
+        Raises:
+            RuntimeError: If the buffer is not running
+        """
+        if not self.running:
+            raise RuntimeError("Ingest buffer is not running")
+        future = asyncio.get_running_loop().create_future() if wait else None
+        await self._queue.put((event_data, future))
+        return await future if future is not None else None
+
+    def stats(self) -> IngestBufferStats:
+        """Snapshot of queue and flush metrics."""
+        return IngestBufferStats(
+            running=self.running,
+            queue_depth=self._queue.qsize() if self._queue else 0,
+            max_queue=self.max_queue,
+            max_batch=self.max_batch,
+            max_delay_ms=self.max_delay * 1000,
+            flushes=self._flushes,
+            flushed_events=self._flushed_events,
+            failed_events=self._failed_events,
+            last_flush_size=self._last_flush_size,
+            avg_flush_size=(
+                self._flush_size_total / self._flushes if self._flushes else 0
+            ),
+            last_flush_seconds=self._last_flush_seconds,
+            avg_flush_seconds=(
+                self._flush_seconds_total / self._flushes if self._flushes else 0
+            ),
+            max_flush_seconds=self._max_flush_seconds,
+        )
+
+    async def _run(self) -> None:
+        """Collect queued events into batches and flush them."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[EventCreate, asyncio.Future | None]]):
+        """Write a batch in one transaction and resolve waiting callers."""
+        futures = [future for _, future in batch]
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                created, failed = await EventRepository(session).create_many(
+                    [event_data for event_data, _ in batch]
+                )
+        except Exception as e:
+            logger.error(
+                "Failed to flush %d buffered events: %s",
+                len(batch),
+                e,
+                extra={"events": len(batch)},
+            )
+            self._failed_events += len(batch)
+            for future in futures:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+
+        elapsed = time.perf_counter() - start
+        self._flushes += 1
+        self._flushed_events += len(created)
+        self._failed_events += len(failed)
+        self._last_flush_size = len(batch)
+        self._flush_size_total += len(batch)
+        self._last_flush_seconds = elapsed
+        self._flush_seconds_total += elapsed
+        self._max_flush_seconds = max(self._max_flush_seconds, elapsed)
+
+        for position, event in created:
+            future = futures[position]
+            if future is not None and not future.done():
+                future.set_result(event)
+        for position, error in failed:
+            future = futures[position]
+            if future is not None and not future.done():
+                # The same error the event would get without the buffer
+                future.set_exception(error)
+            else:
+                logger.error("Dropped buffered event: %s", error.detail)
+
+
+ingest_buffer = IngestBuffer(
+    max_batch=settings.EVENT_BUFFER_MAX_BATCH,
+    max_delay_ms=settings.EVENT_BUFFER_MAX_DELAY_MS,
+    max_queue=settings.EVENT_BUFFER_MAX_QUEUE,
+)
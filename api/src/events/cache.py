@@ -0,0 +1,44 @@
+from api.core.cache import TTLCache
+from api.core.config import settings
+from api.core.response_cache import (
+    MemoryBackend,
+    RedisBackend,
+    ResponseCache,
+    ResponseCacheBackend,
+)
+
+# Tag of every cached response built from more than one event; any write
+# invalidates it
+ALL_EVENTS = "events"
+# Tag of every cached single-event response, for removals that do not know
+# which events they removed, such as dropping expired partitions
+SINGLE_EVENTS = "event:*"
+
+
+def event_tag(event_id: int) -> str:
+    """Tag of cached responses built from a single event."""
+    return f"event:{event_id}"
+
+
+def _backend() -> ResponseCacheBackend:
+    if settings.EVENT_CACHE_REDIS_URL:
+        return RedisBackend(settings.EVENT_CACHE_REDIS_URL, settings.EVENT_CACHE_TTL)
+    return MemoryBackend(settings.EVENT_CACHE_MAX_BYTES, settings.EVENT_CACHE_TTL)
+
+
+def _enabled() -> bool:
+    # Other workers' in-process caches would serve stale responses
+    if settings.EVENT_CACHE_ENABLED is None:
+        return settings.EVENT_CACHE_REDIS_URL is not None
+    return settings.EVENT_CACHE_ENABLED
+
+
+event_cache = ResponseCache(_backend(), enabled=_enabled())
+
+# Ids of events recently ingested or replayed through this worker, by dedup
+# key; retries of these keys read the event by id instead of claiming the key
+# again, and get the same answer as through the dedup key table
+recent_dedup_keys: TTLCache[str, int] = TTLCache(
+    maxsize=settings.EVENT_DEDUP_RECENT_KEYS,
+    ttl=settings.EVENT_DEDUP_WINDOW_HOURS * 3600,
+)
@@ -0,0 +1,127 @@
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from typing import Any, Literal
+
+from sqlalchemy import Text, cast
+from sqlalchemy.sql.elements import ColumnElement
+
+from api.core.exceptions import BadRequestException
+from api.src.events.aggregation import numeric_value, parse_path
+from api.src.events.models import Event
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the 'export' extra is not installed
+    pa = pq = None
+
+ColumnarFormat = Literal["arrow", "parquet"]
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def require() -> None:
+    """Fail early, before a response starts, if pyarrow is not installed.
+
+    Raises:
+        BadRequestException: If columnar formats are unavailable
+    """
+    if pa is None:
+        raise BadRequestException(
+            "Arrow and Parquet exports are not available on this server "
+            "(they need the 'export' extra)"
+        )
+
+
+def columns(fields: Sequence[str]) -> list[ColumnElement]:
+    """Columns to select for a columnar export.
+
+    Numeric paths are extracted in the database, so that rows arrive ready
+    to be laid out as columns. Without paths, the value is exported as JSON
+    text.
+
+    Args:
+        fields: Dotted numeric paths in the event value
+
+    Returns:
+        list: id, name, createdAt, then one column per path or the value
+    """
+    selected = [Event.id, Event.name, Event.createdAt]
+    if fields:
+        selected.extend(numeric_value(parse_path(field)) for field in fields)
+    else:
+        selected.append(cast(Event.value, Text))
+    return selected
+
+
+def schema(fields: Sequence[str]) -> "pa.Schema":
+    """Arrow schema matching ``columns(fields)``.
+
+    Numeric paths become nullable float64 columns named ``value.<path>``.
+    """
+    schema_fields = [
+        pa.field("id", pa.int64(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("createdAt", pa.timestamp("us"), nullable=False),
+    ]
+    if fields:
+        schema_fields.extend(
+            pa.field(f"value.{field}", pa.float64()) for field in fields
+        )
+    else:
+        schema_fields.append(pa.field("value", pa.string()))
+    return pa.schema(schema_fields)
+
+
+def record_batch(
+    batch_schema: "pa.Schema", rows: Sequence[Sequence[Any]]
+) -> "pa.RecordBatch":
+    """Lay out rows selected with ``columns`` as an Arrow record batch."""
+    arrays = [
+        pa.array(values, type=column.type)
+        for values, column in zip(zip(*rows), batch_schema)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=batch_schema)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+async def encode(
+    batches: AsyncIterable[Sequence[Sequence[Any]]],
+    fields: Sequence[str],
+    fmt: ColumnarFormat,
+) -> AsyncIterator[bytes]:
+    """Encode row batches as an Arrow IPC stream or a Parquet file.
+
+    Each batch read from the database cursor becomes one record batch, or
+    one Parquet row group, and is sent as soon as it is written.
+
+    Args:
+        batches: Rows selected with ``columns(fields)``
+        fields: Numeric paths exported as columns
+        fmt: Output format
+
+    Yields:
+        bytes: Encoded chunks
+    """
+    batch_schema = schema(fields)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, batch_schema)
+    else:
+        writer = pq.ParquetWriter(sink, batch_schema)
+    try:
+        async for rows in batches:
+            writer.write_batch(record_batch(batch_schema, rows))
+            yield _drain(sink)
+    finally:
+        writer.close()
+    yield _drain(sink)
@@ -0,0 +1,107 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import settings
+from api.core.database import async_session
+from api.core.logging import get_logger
+from api.src.events.models import EventDedupKey
+
+logger = get_logger(__name__)
+
+
+class DedupKeyExpirer:
+    """Background task that deletes dedup keys older than their window.
+
+    Runs in every worker whatever else is enabled; concurrent passes delete
+    disjoint batches.
+    """
+
+    def __init__(
+        self,
+        window_hours: float,
+        interval: float,
+        batch_size: int,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.window_hours = window_hours
+        self.interval = interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether expiry is running in the background."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start expiring dedup keys in the background."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Dedup key expiry started")
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Dedup key expiry stopped")
+
+    async def expire(self, now: datetime | None = None) -> int:
+        """Delete one batch of dedup keys first seen before the window.
+
+        Args:
+            now: Current time, naive UTC
+
+        Returns:
+            int: Number of keys deleted
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        cutoff = now - timedelta(hours=self.window_hours)
+        async with self.session_factory() as session:
+            expired = (
+                select(EventDedupKey.key)
+                .where(EventDedupKey.createdAt < cutoff)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.execute(
+                delete(EventDedupKey).where(EventDedupKey.key.in_(expired))
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def _run(self) -> None:
+        """Expire until no old keys remain, then wait for the interval."""
+        while True:
+            try:
+                expired = 0
+                while (deleted := await self.expire()) == self.batch_size:
+                    expired += deleted
+                expired += deleted
+                if expired:
+                    logger.info(
+                        "Deleted %d expired dedup keys",
+                        expired,
+                        extra={"expired_keys": expired},
+                    )
+            except Exception as e:
+                logger.error("Failed to expire dedup keys: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+dedup_key_expirer = DedupKeyExpirer(
+    window_hours=settings.EVENT_DEDUP_WINDOW_HOURS,
+    interval=settings.EVENT_DEDUP_EXPIRY_INTERVAL,
+    batch_size=settings.EVENT_DEDUP_EXPIRY_BATCH,
+)
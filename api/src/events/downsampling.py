@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Literal
+
+import numpy as np
+
+Method = Literal["lttb", "minmax", "avg"]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of ``threshold - 2`` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket.
+
+    Args:
+        x: Sorted x coordinates
+        y: y coordinates
+        threshold: Number of points to keep
+
+    Returns:
+        np.ndarray: Indexes of the kept points
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    counts = np.diff(edges)
+    # Averages of every bucket, with the last point standing in for the bucket
+    # after the final one
+    avg_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = avg_x[bucket + 1], avg_y[bucket + 1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Keep the minimum and maximum of each of ``threshold // 2`` buckets.
+
+    Args:
+        x: Sorted x coordinates
+        y: y coordinates
+        threshold: Maximum number of points to keep
+
+    Returns:
+        np.ndarray: Indexes of the kept points, in order
+    """
+    size = len(x)
+    buckets = threshold // 2
+    if threshold >= size or buckets < 1:
+        return np.arange(size)
+
+    edges = np.linspace(0, size, buckets + 1).astype(np.int64)
+    bucket_ids = np.repeat(np.arange(buckets), np.diff(edges))
+    # Sorting by (bucket, y) puts each bucket's minimum first and maximum last
+    order = np.lexsort((y, bucket_ids))
+    lowest = order[edges[:-1]]
+    highest = order[edges[1:] - 1]
+    return np.unique(np.concatenate([lowest, highest]))
+
+
+def average(
+    x: np.ndarray, y: np.ndarray, threshold: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Replace each of ``threshold`` buckets with its mean point.
+
+    Args:
+        x: Sorted x coordinates
+        y: y coordinates
+        threshold: Number of points to produce
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Mean x and y of each bucket
+    """
+    size = len(x)
+    if threshold >= size:
+        return x, y
+
+    edges = np.linspace(0, size, threshold + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.append(edges, size))
+    return np.add.reduceat(x, edges) / counts, np.add.reduceat(y, edges) / counts
+
+
+def downsample(
+    timestamps: list[datetime],
+    values: list[float | None],
+    threshold: int,
+    method: Method,
+) -> tuple[list[datetime], list[float]]:
+    """Reduce a time series to at most ``threshold`` points.
+
+    CPU-bound; call it from a worker thread in request handlers. Points
+    without a value are dropped.
+
+    Args:
+        timestamps: Sorted point timestamps
+        values: Point values
+        threshold: Maximum number of points
+        method: ``lttb``, ``minmax`` or ``avg``
+
+    Returns:
+        tuple: Timestamps and values of the reduced series
+    """
+    y = np.array(values, dtype=np.float64)
+    t = np.array(timestamps, dtype="datetime64[us]")
+    keep = ~np.isnan(y)
+    t, y = t[keep], y[keep]
+    x = t.astype(np.int64).astype(np.float64)
+
+    if method == "avg":
+        x, y = average(x, y, threshold)
+        t = x.round().astype(np.int64).astype("datetime64[us]")
+    else:
+        indexes = lttb(x, y, threshold) if method == "lttb" else minmax(x, y, threshold)
+        t, y = t[indexes], y[indexes]
+    return t.tolist(), y.tolist()
@@ -0,0 +1,78 @@
+import json
+import re
+from functools import reduce
+
+from sqlalchemy import not_
+from sqlalchemy.sql.elements import ColumnElement
+
+from api.core.exceptions import BadRequestException
+from api.src.events.aggregation import numeric_value, parse_path
+from api.src.events.models import Event
+from api.src.events.schemas import ValueFilter
+
+_FILTER_PATTERN = re.compile(r"^value\.([^=!<>]+?)\s*(!=|>=|<=|=|>|<)\s*(.*)$")
+
+_COMPARISONS = {
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+}
+
+
+def parse_value_filter(expression: str) -> ValueFilter:
+    """Parse a filter on the event value such as ``value.region=eu``.
+
+    The right-hand side is read as JSON when possible (``200``, ``true``,
+    ``"eu"``) and as a plain string otherwise.
+
+    Args:
+        expression: ``value.<dotted path><op><literal>`` with op one of
+            ``=``, ``!=``, ``>``, ``>=``, ``<``, ``<=``
+
+    Returns:
+        ValueFilter: Parsed filter
+
+    Raises:
+        BadRequestException: If the expression is malformed or compares a
+            non-numeric literal with an ordering operator
+    """
+    match = _FILTER_PATTERN.match(expression.strip())
+    if not match:
+        raise BadRequestException(f"Invalid filter {expression!r}")
+    field, op, raw = match.groups()
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    if op in _COMPARISONS and (
+        isinstance(value, bool) or not isinstance(value, int | float)
+    ):
+        raise BadRequestException(f"Filter {expression!r} needs a numeric value")
+    return ValueFilter(path=parse_path(field.strip()), op=op, value=value)
+
+
+def value_clause(value_filter: ValueFilter) -> ColumnElement[bool]:
+    """Compile a value filter to an indexable JSONB condition.
+
+    Equality uses containment (``@>``), served by the GIN index on
+    ``Event.value``; ordering comparisons use the numeric path expression,
+    served by the expression indexes of hot paths.
+
+    Args:
+        value_filter: Parsed filter
+
+    Returns:
+        ColumnElement[bool]: WHERE clause
+    """
+    if value_filter.op in _COMPARISONS:
+        return _COMPARISONS[value_filter.op](
+            numeric_value(value_filter.path), float(value_filter.value)
+        )
+    document = reduce(
+        lambda nested, key: {key: nested},
+        reversed(value_filter.path),
+        value_filter.value,
+    )
+    contains = Event.value.contains(document)
+    return contains if value_filter.op == "=" else not_(contains)
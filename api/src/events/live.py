@@ -0,0 +1,317 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+import asyncpg
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import settings
+from api.core.database import async_session
+from api.core.exceptions import ServiceUnavailableException
+from api.core.logging import get_logger
+from api.src.events.models import Event
+from api.src.events.schemas import EventStreamStats
+from api.src.events.serialization import dumps, event_dict
+
+logger = get_logger(__name__)
+
+CHANNEL = "events"
+# NOTIFY payloads must stay below 8000 bytes; larger events are announced by
+# id and name only and read back by the listener
+MAX_PAYLOAD_BYTES = 7_900
+
+# Queued for a subscriber that fell too far behind, in place of its backlog
+_DROPPED = object()
+# Queued for every subscriber when the broadcaster stops, after its backlog
+_CLOSED = object()
+
+
+async def notify_created(session: AsyncSession, rows: Sequence[Sequence[Any]]) -> None:
+    """Announce new events to live subscribers of every worker.
+
+    Notifications are delivered when the session's transaction commits, and
+    not at all if it rolls back.
+
+    Args:
+        session: Session of the writing transaction
+        rows: Created events in ``EVENT_COLUMNS`` order
+    """
+    if not settings.EVENT_STREAM_ENABLED or not rows:
+        return
+    payloads = []
+    for row in rows:
+        payload = dumps(event_dict(row))
+        if len(payload) > MAX_PAYLOAD_BYTES:
+            payload = dumps({"id": row[0], "name": row[1]})
+        payloads.append(payload.decode())
+    await session.execute(
+        text(
+            "SELECT pg_notify(:channel, payload) "
+            "FROM unnest(CAST(:payloads AS text[])) AS payload"
+        ),
+        {"channel": CHANNEL, "payloads": payloads},
+    )
+
+
+def sse_frame(event_id: int, payload: bytes) -> bytes:
+    """Encode one Server-Sent Events message carrying an event."""
+    return b"id: %d\ndata: %s\n\n" % (event_id, payload)
+
+
+class Subscription:
+    """One client's bounded queue of encoded messages.
+
+    A subscriber whose queue fills up is dropped: its backlog is discarded
+    and it is told to reconnect, so that it cannot hold up the others.
+    """
+
+    def __init__(self, name: str | None, max_queue: int):
+        self.name = name
+        self.dropped = False
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def close(self) -> None:
+        """End the stream once the messages already queued are sent.
+
+        If the queue is full, the oldest message makes room for the end.
+        """
+        if self.dropped or self.closed:
+            return
+        self.closed = True
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_CLOSED)
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue a message without waiting.
+
+        Returns:
+            bool: False if the subscriber was too slow and has been dropped
+        """
+        if self.dropped or self.closed:
+            return False
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(_DROPPED)
+            return False
+
+    async def messages(self, keepalive: float) -> AsyncIterator[bytes]:
+        """Yield SSE messages, with comments to keep idle connections open.
+
+        Ends after telling a dropped subscriber to reconnect, or when the
+        subscription is closed.
+        """
+        while True:
+            try:
+                frame = await asyncio.wait_for(self._queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if frame is _DROPPED:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            if frame is _CLOSED:
+                return
+            yield frame
+
+
+class EventBroadcaster:
+    """Fans event notifications out to the live subscribers of this worker.
+
+    A single connection per worker, outside the pool, listens for
+    notifications and reconnects after ``retry_interval`` if it is lost.
+    Each message is encoded once and queued for every subscriber to its
+    event name; events committed while the listener is disconnected are
+    not delivered.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        max_subscribers: int,
+        max_queue: int,
+        retry_interval: float = 1.0,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.dsn = dsn
+        self.max_subscribers = max_subscribers
+        self.max_queue = max_queue
+        self.retry_interval = retry_interval
+        self.session_factory = session_factory
+        self._subscribers: dict[str | None, set[Subscription]] = {}
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+        # Reads of events too large for their notification, kept referenced
+        # until they finish
+        self._reads: set[asyncio.Task] = set()
+        self._count = 0
+        self._received = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the broadcaster is listening or trying to."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start listening for notifications in the background."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Event broadcaster started")
+
+    async def stop(self) -> None:
+        """Stop listening, close the listener connection and cancel reads.
+
+        Open streams end, so that clients reconnect to another worker.
+        """
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        reads = list(self._reads)
+        for read in reads:
+            read.cancel()
+        await asyncio.gather(*reads, return_exceptions=True)
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.close()
+                self.unsubscribe(subscription)
+        logger.info("Event broadcaster stopped")
+
+    def subscribe(self, name: str | None = None) -> Subscription:
+        """Subscribe to new events.
+
+        Args:
+            name: Only receive events with this name; all events if None
+
+        Returns:
+            Subscription: Queue of encoded messages
+
+        Raises:
+            ServiceUnavailableException: If the worker has no room for more
+                subscribers
+        """
+        if self._count >= self.max_subscribers:
+            raise ServiceUnavailableException("Too many live subscribers")
+        subscription = Subscription(name, self.max_queue)
+        self._subscribers.setdefault(name, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering messages to a subscription."""
+        subscribers = self._subscribers.get(subscription.name)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.name]
+        self._count -= 1
+
+    def publish(self, event_id: int, name: str, payload: bytes) -> None:
+        """Queue an encoded event for its subscribers."""
+        frame = sse_frame(event_id, payload)
+        for key in (name, None):
+            for subscription in list(self._subscribers.get(key, ())):
+                if subscription.offer(frame):
+                    self._delivered += 1
+                else:
+                    self._dropped += 1
+                    self.unsubscribe(subscription)
+                    logger.warning("Dropped a live subscriber that fell behind")
+
+    def stats(self) -> EventStreamStats:
+        """Get subscriber and delivery counters."""
+        return EventStreamStats(
+            listening=self._connection is not None,
+            subscribers=self._count,
+            max_subscribers=self.max_subscribers,
+            received=self._received,
+            delivered=self._delivered,
+            dropped_subscribers=self._dropped,
+            reconnects=self._reconnects,
+        )
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self._received += 1
+        event = orjson.loads(payload)
+        if not self._subscribers.get(event["name"]) and not self._subscribers.get(None):
+            return
+        if "value" not in event:
+            task = asyncio.create_task(self._publish_stored(event["id"]))
+            self._reads.add(task)
+            task.add_done_callback(self._reads.discard)
+            return
+        self.publish(event["id"], event["name"], payload.encode())
+
+    async def _publish_stored(self, event_id: int) -> None:
+        """Publish an event too large for its notification."""
+        query = select(Event.id, Event.name, Event.value, Event.createdAt).where(
+            Event.id == event_id
+        )
+        try:
+            async with self.session_factory() as session:
+                row = (await session.execute(query)).one_or_none()
+        except Exception as e:
+            logger.error(
+                "Failed to read event %d for streaming: %s",
+                event_id,
+                e,
+                extra={"event_id": event_id},
+            )
+            return
+        if row is not None:
+            self.publish(row.id, row.name, dumps(event_dict(row)))
+
+    async def _run(self) -> None:
+        """Keep a listening connection open, reconnecting when it is lost."""
+        connected_before = False
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                self._connection.add_termination_listener(lambda _: lost.set())
+                await self._connection.add_listener(CHANNEL, self._on_notification)
+                if connected_before:
+                    self._reconnects += 1
+                    logger.info("Event listener reconnected")
+                connected_before = True
+                await lost.wait()
+                logger.warning("Event listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to listen for events: %s", e)
+            finally:
+                connection, self._connection = self._connection, None
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(self.retry_interval)
+
+
+def _listener_dsn() -> str:
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+event_broadcaster = EventBroadcaster(
+    dsn=_listener_dsn(),
+    max_subscribers=settings.EVENT_STREAM_MAX_SUBSCRIBERS,
+    max_queue=settings.EVENT_STREAM_QUEUE_SIZE,
+)
@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 
 from api.core.database import Base
 
@@ -6,6 +16,9 @@ from api.core.database import Base
 class Event(Base):
     """Event model for database.
 
+    The table is range-partitioned on createdAt (see ``partitions``), so the
+    primary key includes createdAt; ids are still unique.
+
     Attributes:
         id: Unique identifier
         name: Event name
@@ -14,8 +27,81 @@ class Event(Base):
     """
 
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_createdAt_id", "createdAt", "id"),
+        Index("ix_events_name_createdAt_id", "name", "createdAt", "id"),
+        Index(
+            "ix_events_value_gin",
+            "value",
+            postgresql_using="gin",
+            postgresql_ops={"value": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": 'RANGE ("createdAt")'},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     name = Column(String(100), nullable=False)
-    value = Column(JSON, nullable=True)
-    createdAt = Column(DateTime)
+    value = Column(JSONB, nullable=True)
+    createdAt = Column(
+        DateTime, primary_key=True, nullable=False, server_default=func.now()
+    )
+
+
+class EventRollup(Base):
+    """Pre-aggregated event statistics per time bucket.
+
+    Attributes:
+        resolution: Bucket width, one of minute, hour or day
+        name: Event name
+        field: Dotted numeric path in the event value, or "" for event counts
+        bucket: Bucket start
+        count: Number of events (with a numeric value at ``field``)
+        sum: Sum of the values
+        min: Smallest value
+        max: Largest value
+    """
+
+    __tablename__ = "event_rollups"
+
+    resolution = Column(String(10), primary_key=True)
+    name = Column(String(100), primary_key=True)
+    field = Column(String(200), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    sum = Column(Float, nullable=True)
+    min = Column(Float, nullable=True)
+    max = Column(Float, nullable=True)
+
+
+class EventRollupDirty(Base):
+    """Minute buckets whose rollups must be recomputed.
+
+    Attributes:
+        name: Event name
+        bucket: Minute bucket start
+    """
+
+    __tablename__ = "event_rollup_dirty"
+
+    name = Column(String(100), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+
+
+class EventDedupKey(Base):
+    """Deduplication key of an ingested event.
+
+    Kept apart from the partitioned events table, where a unique index would
+    have to include createdAt.
+
+    Attributes:
+        key: Client-chosen deduplication key
+        event_id: ID of the event ingested with the key
+        createdAt: When the key was first seen
+    """
+
+    __tablename__ = "event_dedup_keys"
+
+    key = Column(String(200), primary_key=True)
+    # Only NULL inside the transaction that claims the key
+    event_id = Column(Integer, nullable=True)
+    createdAt = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from api.core.exceptions import BadRequestException
+
+
+def encode_cursor(created_at: datetime, event_id: int) -> str:
+    """Encode the keyset position after an event as an opaque token.
+
+    Args:
+        created_at: createdAt of the last event on the page
+        event_id: ID of the last event on the page
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = json.dumps([created_at.isoformat(), event_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor token produced by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor token
+
+    Returns:
+        tuple[datetime, int]: createdAt and ID to continue after
+
+    Raises:
+        BadRequestException: If the token is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, event_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(event_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise BadRequestException("Invalid cursor")
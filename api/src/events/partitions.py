@@ -0,0 +1,632 @@
+import asyncio
+import re
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from api.core.config import settings
+from api.core.database import engine as primary_engine
+from api.core.logging import get_logger
+from api.src.events.cache import ALL_EVENTS, SINGLE_EVENTS, event_cache
+from api.src.events.models import Event
+
+logger = get_logger(__name__)
+
+Interval = Literal["day", "month"]
+
+PARENT = Event.__tablename__
+# Catches rows outside every range partition, e.g. imported history; holds
+# the rows of the table from before it was partitioned until they are
+# backfilled
+DEFAULT_PARTITION = f"{PARENT}_default"
+COLUMNS = ", ".join(f'"{column.name}"' for column in Event.__table__.columns)
+# Columns an event update can change
+MUTABLE_COLUMNS = ("name", "value")
+
+# Key of the Postgres advisory lock held during maintenance, so that only one
+# worker at a time changes partitions
+MAINTENANCE_LOCK_ID = 0x65766E7470617274
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A partition of the events table.
+
+    Attributes:
+        name: Table name
+        start: First createdAt in the partition, None for the default one
+        end: createdAt after the partition, None for the default one
+    """
+
+    name: str
+    start: datetime | None = None
+    end: datetime | None = None
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Whether the partition shares any time with ``[start, end)``."""
+        return self.start is not None and self.start < end and start < self.end
+
+
+@dataclass
+class MaintenanceReport:
+    """What one maintenance pass changed.
+
+    Attributes:
+        created: Partitions created
+        moved: Rows moved out of the default partition
+        pending: Periods whose rows are still in the default partition and
+            need a backfill before they get a partition
+        dropped: Expired partitions dropped
+        expired: Expired rows deleted from the default partition
+        skipped: Whether another worker was already running maintenance
+    """
+
+    created: list[str] = field(default_factory=list)
+    moved: int = 0
+    pending: list[datetime] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    expired: int = 0
+    skipped: bool = False
+
+
+def utcnow() -> datetime:
+    """Current time as a naive UTC datetime, like stored createdAt values."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def period_start(moment: datetime, interval: Interval) -> datetime:
+    """Start of the partition period containing ``moment``."""
+    if interval == "day":
+        return datetime(moment.year, moment.month, moment.day)
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_period(start: datetime, interval: Interval) -> datetime:
+    """Start of the partition period after the one starting at ``start``."""
+    if interval == "day":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime, interval: Interval) -> str:
+    """Table name of the partition period starting at ``start``."""
+    suffix = f"{start:%Y%m%d}" if interval == "day" else f"{start:%Y%m}"
+    return f"{PARENT}_p{suffix}"
+
+
+def in_range(start: datetime, end: datetime) -> str:
+    """SQL condition for a createdAt in ``[start, end)``, for use in DDL."""
+    # DDL takes no parameters; the bounds are datetimes, not user input
+    lower, upper = f"'{start.isoformat(' ')}'", f"'{end.isoformat(' ')}'"
+    return f'"createdAt" >= {lower} AND "createdAt" < {upper}'
+
+
+def bounds_check(name: str, start: datetime, end: datetime) -> str:
+    """Check constraint ``{name}_bounds`` limiting createdAt to ``[start, end)``.
+
+    Declared on a table before it is attached, it lets the attach skip
+    scanning the table for rows outside the range.
+    """
+    return f'CONSTRAINT "{name}_bounds" CHECK ({in_range(start, end)})'
+
+
+async def list_partitions(connection: AsyncConnection) -> list[Partition]:
+    """Partitions of the events table, range partitions by start first."""
+    result = await connection.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits JOIN pg_class child ON child.oid = inhrelid "
+            "WHERE inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT},
+    )
+    partitions = []
+    for name, bounds in result.all():
+        match = _BOUNDS.search(bounds)
+        if match is None:
+            partitions.append(Partition(name))
+            continue
+        start, end = map(datetime.fromisoformat, match.groups())
+        partitions.append(Partition(name, start, end))
+    return sorted(partitions, key=lambda p: (p.start is None, p.start or 0))
+
+
+class PartitionMaintainer:
+    """Keeps the partitions of the events table in step with time.
+
+    Each pass creates the partition for the current period and
+    ``premake`` upcoming ones and, with a retention period, drops partitions
+    whose whole range has expired. Events are therefore kept for up to one
+    partition interval longer than ``retention_days``.
+
+    Periods that still have rows in the default partition, e.g. from before
+    the table was partitioned, are left alone by these passes, since moving
+    their rows is slow; ``backfill`` moves them and is run on demand with
+    ``python -m api.utils.partitions backfill``.
+
+    Attaching a partition has to prove that the default partition holds no
+    rows of its range, which takes a full scan of the default partition.
+    That proof is made beforehand by validating a check constraint on the
+    default partition, a scan that neither reads nor writes wait for, so the
+    attach itself holds its lock on the default partition only briefly.
+    While the constraint is being validated, writes of rows in the range to
+    the default partition fail; the pass creates partitions ``premake``
+    periods ahead, before the range gets any. Dropping a partition briefly
+    locks the whole table. Locks give up after ``lock_timeout`` rather than
+    queueing behind long queries, and are retried on the next pass. Only one
+    process at a time maintains partitions; the others skip their pass.
+    """
+
+    def __init__(
+        self,
+        interval: Interval,
+        premake: int,
+        retention_days: int | None,
+        run_interval: float,
+        engine: AsyncEngine = primary_engine,
+        lock_timeout: float = 5.0,
+        batch_size: int = 10_000,
+    ):
+        self.interval = interval
+        self.premake = premake
+        self.retention_days = retention_days
+        self.run_interval = run_interval
+        self.engine = engine
+        self.lock_timeout = lock_timeout
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether maintenance is running in the background."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start maintaining partitions in the background."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Partition maintenance started")
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Partition maintenance stopped")
+
+    async def maintain(self, now: datetime | None = None) -> MaintenanceReport:
+        """Run one maintenance pass.
+
+        Args:
+            now: Current time, naive UTC
+
+        Returns:
+            MaintenanceReport: What was changed
+        """
+        now = now or utcnow()
+        cutoff = self._cutoff(now)
+        report = MaintenanceReport()
+        async with self._exclusive() as connection:
+            if connection is None:
+                report.skipped = True
+                return report
+            report.pending = await self._pending_periods(connection, cutoff)
+            for start in await self._missing_periods(connection, now):
+                if start in report.pending:
+                    continue
+                await self._create(connection, start, next_period(start, self.interval))
+                report.created.append(partition_name(start, self.interval))
+            if cutoff is not None:
+                await self._expire(connection, cutoff, report)
+
+        if report.pending:
+            logger.warning(
+                "%d periods still have rows in the default partition; run "
+                "python -m api.utils.partitions backfill to move them",
+                len(report.pending),
+                extra={"pending": report.pending},
+            )
+        if report.dropped or report.expired:
+            await event_cache.invalidate(ALL_EVENTS, SINGLE_EVENTS)
+        if report.created or report.dropped or report.expired:
+            logger.info(
+                "Partitions created: %s, dropped: %s; deleted %d expired rows "
+                "from the default partition",
+                report.created,
+                report.dropped,
+                report.expired,
+                extra={
+                    "partitions_created": report.created,
+                    "partitions_dropped": report.dropped,
+                    "rows_expired": report.expired,
+                },
+            )
+        return report
+
+    async def backfill(self, now: datetime | None = None) -> MaintenanceReport:
+        """Move rows out of the default partition into partitions of their own.
+
+        Each period's rows are copied into its new partition in batches of
+        ``batch_size``, without blocking writers. Only the final catch-up,
+        which applies changes made since the copy and empties the range in
+        the default partition, holds a lock that blocks writes to it.
+
+        Args:
+            now: Current time, naive UTC
+
+        Returns:
+            MaintenanceReport: Partitions created and rows moved
+        """
+        now = now or utcnow()
+        cutoff = self._cutoff(now)
+        report = MaintenanceReport()
+        async with self._exclusive() as connection:
+            if connection is None:
+                report.skipped = True
+                return report
+            for start in await self._pending_periods(connection, cutoff):
+                end = next_period(start, self.interval)
+                staging = await self._stage(connection, start, end)
+                report.moved += await self._swap(connection, staging, start, end)
+                report.created.append(partition_name(start, self.interval))
+
+        if report.created:
+            logger.info(
+                "Backfilled partitions %s with %d rows from the default partition",
+                report.created,
+                report.moved,
+                extra={
+                    "partitions_created": report.created,
+                    "rows_moved": report.moved,
+                },
+            )
+        return report
+
+    def _cutoff(self, now: datetime) -> datetime | None:
+        """createdAt before which events have expired, None to keep them."""
+        if self.retention_days is None:
+            return None
+        return now - timedelta(days=self.retention_days)
+
+    @asynccontextmanager
+    async def _exclusive(self) -> AsyncIterator[AsyncConnection | None]:
+        """Connection holding the maintenance advisory lock.
+
+        Yields None when another process holds the lock.
+        """
+        async with self.engine.connect() as connection:
+            locked = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+            )
+            await connection.commit()
+            if not locked:
+                yield None
+                return
+            try:
+                yield connection
+            finally:
+                await connection.rollback()
+                await connection.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID}
+                )
+                await connection.commit()
+
+    async def _missing_periods(
+        self, connection: AsyncConnection, now: datetime
+    ) -> list[datetime]:
+        """Starts of the current and upcoming periods that need a partition.
+
+        Periods that overlap an existing partition, e.g. after ``interval``
+        was changed, are skipped.
+        """
+        starts = []
+        start = period_start(now, self.interval)
+        for _ in range(self.premake + 1):
+            starts.append(start)
+            start = next_period(start, self.interval)
+        return await self._without_partition(connection, starts)
+
+    async def _pending_periods(
+        self, connection: AsyncConnection, cutoff: datetime | None
+    ) -> list[datetime]:
+        """Starts of periods with unexpired rows in the default partition."""
+        query = (
+            f'SELECT DISTINCT date_trunc(:unit, "createdAt") FROM {DEFAULT_PARTITION}'
+        )
+        if cutoff is not None:
+            query += ' WHERE "createdAt" >= :cutoff'
+        result = await connection.execute(
+            text(query), {"unit": self.interval, "cutoff": cutoff}
+        )
+        await connection.commit()
+        return await self._without_partition(
+            connection, sorted(row[0] for row in result.all())
+        )
+
+    async def _without_partition(
+        self, connection: AsyncConnection, starts: list[datetime]
+    ) -> list[datetime]:
+        """Those of ``starts`` whose period overlaps no partition."""
+        partitions = await list_partitions(connection)
+        await connection.commit()
+        return [
+            start
+            for start in starts
+            if not any(
+                partition.overlaps(start, next_period(start, self.interval))
+                for partition in partitions
+            )
+        ]
+
+    async def _create(
+        self, connection: AsyncConnection, start: datetime, end: datetime
+    ) -> None:
+        """Create and attach the empty partition for ``[start, end)``.
+
+        The range has no rows in the default partition; should a writer add
+        one before it is excluded from the default partition, the validation
+        fails, nothing is left behind and the period is left to ``backfill``.
+        """
+        name = partition_name(start, self.interval)
+        await self._set_lock_timeout(connection)
+        await connection.execute(
+            text(
+                f'CREATE TABLE "{name}" (LIKE {PARENT} INCLUDING DEFAULTS, '
+                f"{bounds_check(name, start, end)})"
+            )
+        )
+        await self._exclude_from_default(connection, name, start, end)
+        await connection.commit()
+        try:
+            await connection.execute(
+                text(
+                    f"ALTER TABLE {DEFAULT_PARTITION} "
+                    f'VALIDATE CONSTRAINT "{name}_excluded"'
+                )
+            )
+            await connection.commit()
+            await self._attach(connection, name, name, start, end)
+            await connection.commit()
+        except Exception:
+            await connection.rollback()
+            await self._undo_exclusion(connection, name)
+            await connection.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            await connection.commit()
+            raise
+
+    async def _stage(
+        self, connection: AsyncConnection, start: datetime, end: datetime
+    ) -> str:
+        """Copy the default partition's rows of ``[start, end)`` into a new table.
+
+        The table gets the parent's indexes up front, so the attach adopts
+        them instead of building them under its lock. Rows are copied in
+        batches by id, each in its own transaction. A staging table left by
+        an interrupted backfill is resumed.
+
+        Returns:
+            str: Name of the staging table
+        """
+        partition = partition_name(start, self.interval)
+        name = f"{partition}_backfill"
+        params = {"start": start, "end": end}
+        in_range = '"createdAt" >= :start AND "createdAt" < :end'
+        await connection.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" '
+                f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING INDEXES, "
+                f"{bounds_check(partition, start, end)})"
+            )
+        )
+        after = await connection.scalar(
+            text(f'SELECT coalesce(max(id), 0) FROM "{name}"')
+        )
+        await connection.commit()
+        while True:
+            copied = await connection.execute(
+                text(
+                    f'INSERT INTO "{name}" ({COLUMNS}) '
+                    f"SELECT {COLUMNS} FROM {DEFAULT_PARTITION} "
+                    f"WHERE {in_range} AND id > :after ORDER BY id LIMIT :limit "
+                    "RETURNING id"
+                ),
+                {**params, "after": after, "limit": self.batch_size},
+            )
+            ids = copied.scalars().all()
+            await connection.commit()
+            if len(ids) < self.batch_size:
+                return name
+            after = max(ids)
+
+    async def _swap(
+        self, connection: AsyncConnection, staging: str, start: datetime, end: datetime
+    ) -> int:
+        """Catch ``staging`` up with the default partition and attach it.
+
+        Under a lock that keeps writers out of the default partition, the
+        range is deleted from it, and the staging table drops rows deleted
+        since the copy, gains rows added since, and takes the new values of
+        updated ones. Validating that the range is excluded from the default
+        partition then scans it under that lock, which readers do not wait
+        for, rather than under the attach's exclusive one.
+
+        Returns:
+            int: Rows moved out of the default partition
+        """
+        name = partition_name(start, self.interval)
+        await self._exclude_from_default(connection, name, start, end)
+        await connection.commit()
+        try:
+            moved = await self._catch_up(connection, staging, name, start, end)
+        except Exception:
+            await connection.rollback()
+            await self._undo_exclusion(connection, name)
+            await connection.commit()
+            raise
+        return moved
+
+    async def _catch_up(
+        self,
+        connection: AsyncConnection,
+        staging: str,
+        name: str,
+        start: datetime,
+        end: datetime,
+    ) -> int:
+        """Final, locked step of ``_swap``; see there."""
+        params = {"start": start, "end": end}
+        changed = ", ".join(
+            f"{column} = excluded.{column}" for column in MUTABLE_COLUMNS
+        )
+        current = ", ".join(f'"{staging}".{column}' for column in MUTABLE_COLUMNS)
+        incoming = ", ".join(f"excluded.{column}" for column in MUTABLE_COLUMNS)
+
+        await self._set_lock_timeout(connection)
+        await connection.execute(
+            text(f"LOCK TABLE {DEFAULT_PARTITION} IN EXCLUSIVE MODE")
+        )
+        moved = await connection.scalar(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f'WHERE "createdAt" >= :start AND "createdAt" < :end '
+                f"RETURNING {COLUMNS}), "
+                f'gone AS (DELETE FROM "{staging}" '
+                "WHERE id NOT IN (SELECT id FROM moved)), "
+                f'merged AS (INSERT INTO "{staging}" ({COLUMNS}) '
+                f"SELECT {COLUMNS} FROM moved "
+                f'ON CONFLICT (id, "createdAt") DO UPDATE SET {changed} '
+                f"WHERE ({current}) IS DISTINCT FROM ({incoming})) "
+                "SELECT count(*) FROM moved"
+            ),
+            params,
+        )
+        await connection.execute(
+            text(
+                f'ALTER TABLE {DEFAULT_PARTITION} VALIDATE CONSTRAINT "{name}_excluded"'
+            )
+        )
+        await self._attach(connection, staging, name, start, end)
+        await connection.execute(text(f'ALTER TABLE "{staging}" RENAME TO "{name}"'))
+        await connection.commit()
+        return moved
+
+    async def _attach(
+        self,
+        connection: AsyncConnection,
+        table: str,
+        name: str,
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """Attach ``table`` as partition ``name`` for ``[start, end)``.
+
+        The table must have been created with ``bounds_check(name, start, end)``
+        and the range excluded from the default partition by a validated
+        ``_exclude_from_default`` constraint, so that neither is scanned.
+        Both constraints are dropped again.
+        """
+        lower, upper = f"'{start.isoformat(' ')}'", f"'{end.isoformat(' ')}'"
+        await self._set_lock_timeout(connection)
+        await connection.execute(
+            text(
+                f'ALTER TABLE {PARENT} ATTACH PARTITION "{table}" '
+                f"FOR VALUES FROM ({lower}) TO ({upper})"
+            )
+        )
+        await connection.execute(
+            text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}_bounds"')
+        )
+        await connection.execute(
+            text(f'ALTER TABLE {DEFAULT_PARTITION} DROP CONSTRAINT "{name}_excluded"')
+        )
+
+    async def _exclude_from_default(
+        self, connection: AsyncConnection, name: str, start: datetime, end: datetime
+    ) -> None:
+        """Forbid rows of ``[start, end)`` in the default partition.
+
+        The constraint ``{name}_excluded`` is added without checking existing
+        rows, which only briefly locks the default partition; it has to be
+        validated before the attach can rely on it.
+        """
+        await self._set_lock_timeout(connection)
+        await connection.execute(
+            text(
+                f"ALTER TABLE {DEFAULT_PARTITION} "
+                f'ADD CONSTRAINT "{name}_excluded" '
+                f"CHECK (NOT ({in_range(start, end)})) NOT VALID"
+            )
+        )
+
+    async def _undo_exclusion(self, connection: AsyncConnection, name: str) -> None:
+        """Drop the constraint of a failed ``_exclude_from_default``."""
+        await self._set_lock_timeout(connection)
+        await connection.execute(
+            text(
+                f"ALTER TABLE {DEFAULT_PARTITION} "
+                f'DROP CONSTRAINT IF EXISTS "{name}_excluded"'
+            )
+        )
+
+    async def _expire(
+        self, connection: AsyncConnection, cutoff: datetime, report: MaintenanceReport
+    ) -> None:
+        """Drop partitions ending before ``cutoff`` and expired default rows."""
+        for partition in await list_partitions(connection):
+            if partition.end is None or partition.end > cutoff:
+                continue
+            await self._set_lock_timeout(connection)
+            await connection.execute(text(f'DROP TABLE "{partition.name}"'))
+            await connection.commit()
+            report.dropped.append(partition.name)
+
+        # In batches, so a large backlog of expired rows does not make for one
+        # long transaction
+        while True:
+            expired = await connection.execute(
+                text(
+                    f"DELETE FROM {DEFAULT_PARTITION} WHERE ctid IN ("
+                    f"SELECT ctid FROM {DEFAULT_PARTITION} "
+                    'WHERE "createdAt" < :cutoff LIMIT :limit)'
+                ),
+                {"cutoff": cutoff, "limit": self.batch_size},
+            )
+            await connection.commit()
+            report.expired += expired.rowcount
+            if expired.rowcount < self.batch_size:
+                return
+
+    async def _set_lock_timeout(self, connection: AsyncConnection) -> None:
+        await connection.execute(
+            text(f"SET LOCAL lock_timeout = '{int(self.lock_timeout * 1000)}ms'")
+        )
+
+    async def _run(self) -> None:
+        """Run a pass, then wait for the interval."""
+        while True:
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.error("Failed to maintain event partitions: %s", e)
+            await asyncio.sleep(self.run_interval)
+
+
+partition_maintainer = PartitionMaintainer(
+    interval=settings.EVENT_PARTITION_INTERVAL,
+    premake=settings.EVENT_PARTITION_PREMAKE,
+    retention_days=settings.EVENT_RETENTION_DAYS,
+    run_interval=settings.EVENT_PARTITION_MAINTENANCE_INTERVAL,
+)
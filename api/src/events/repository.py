@@ -1,14 +1,65 @@
-from sqlalchemy import delete, select, update
-from sqlalchemy.exc import IntegrityError
+import json
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime, timedelta
+
+from asyncpg import PostgresError
+from fastapi import HTTPException
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    Row,
+    String,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.core.exceptions import AlreadyExistsException, NotFoundException
-from api.src.events.models import Event
-from api.src.events.schemas import EventCreate, EventUpdate
+from api.core.config import settings
+from api.core.exceptions import (
+    AlreadyExistsException,
+    BadRequestException,
+    NotFoundException,
+)
+from api.src.events import live, rollups
+from api.src.events.aggregation import Aggregate, numeric_value
+from api.src.events.cache import (
+    ALL_EVENTS,
+    SINGLE_EVENTS,
+    event_cache,
+    event_tag,
+    recent_dedup_keys,
+)
+from api.src.events.filters import parse_value_filter, value_clause
+from api.src.events.models import Event, EventDedupKey
+from api.src.events.schemas import (
+    EventBulkFilter,
+    EventCreate,
+    EventFilter,
+    EventUpdate,
+)
+from api.src.events.serialization import event_row
+
+COPY_COLUMNS = ["id", "name", "value", "createdAt"]
+# SQLSTATE classes of rows the database refuses to store: data exceptions,
+# e.g. a NUL character in JSONB, and integrity constraint violations
+REJECTED_ROW_CLASSES = ("22", "23")
+EVENT_ID_SEQUENCE = "events_id_seq"
+# Columns read for responses, as plain rows instead of ORM objects
+EVENT_COLUMNS = (Event.id, Event.name, Event.value, Event.createdAt)
 
 
 class EventRepository:
-    """Repository for handling event database operations."""
+    """Repository for handling event database operations.
+
+    Writes invalidate the cached event responses once they are committed.
+    """
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -16,27 +67,325 @@ class EventRepository:
     async def create(self, event_data: EventCreate) -> Event:
         """Create a new event.
 
+        An event sent again with the dedup key of an ingested event is not
+        stored twice; the original event is returned instead, as it is now.
+        If this worker has seen the key recently, it is read by id without
+        claiming the key.
+
         Args:
             event_data: Event creation data
 
         Returns:
-            Event: Created event
+            Event: Created event, or the original one for a repeated key
 
         Raises:
-            AlreadyExistsException: If event with same alias already exists
+            BadRequestException: If the database refuses the event
+            AlreadyExistsException: If the event first ingested with the dedup
+                key has since been deleted
         """
-        event = Event(**event_data.model_dump())
+        key = event_data.dedup_key
+        if key is not None:
+            recent = recent_dedup_keys.get(key)
+            if recent is not None:
+                originals = await self._events_by_id([recent])
+                await self.session.commit()
+                return self._replayed(key, originals.get(recent))
+            if not await self._claim([key]):
+                originals = await self._originals([key])
+                await self.session.commit()
+                return self._replayed(key, originals.get(key))
+
+        event = Event(**event_data.model_dump(exclude={"dedup_key"}))
+        self.session.add(event)
         try:
-            self.session.add(event)
-            await self.session.commit()
-            await self.session.refresh(event)
-            return event
-        except IntegrityError:
+            await self.session.flush()
+        except DBAPIError as e:
+            if not is_rejected_row(e):
+                raise
             await self.session.rollback()
-            raise AlreadyExistsException(
-                f"Event with alias {event_data.alias} already exists"
+            raise BadRequestException(str(e.orig))
+        if key is not None:
+            await self._bind({key: event.id})
+        await rollups.mark_dirty_ids(self.session, [event.id])
+        await live.notify_created(self.session, [event_row(event)])
+        await self.session.commit()
+        await event_cache.invalidate(ALL_EVENTS)
+        await self.session.refresh(event)
+        if key is not None:
+            recent_dedup_keys.set(key, event.id)
+        return event
+
+    async def create_many(
+        self, events: list[EventCreate], chunk_size: int | None = None
+    ) -> tuple[list[tuple[int, Event]], list[tuple[int, HTTPException]]]:
+        """Create events in chunks of multi-row inserts.
+
+        Each chunk is written with a single ``INSERT ... RETURNING`` inside a
+        savepoint. If a chunk is rejected by the database, its rows are retried
+        one by one so that only the offending rows fail. All chunks are
+        committed together at the end.
+
+        Events with the dedup key of an ingested event, or of an earlier item
+        of the batch, are not inserted; the original event is reported as
+        created for them.
+
+        Args:
+            events: Event creation data
+            chunk_size: Rows per insert statement
+
+        Returns:
+            tuple: Created events and failures, each paired with the position
+                of the item in ``events``; failures are the errors ``create``
+                would raise for the item
+        """
+        chunk_size = chunk_size or settings.EVENT_BATCH_CHUNK_SIZE
+        rows = [event.model_dump(exclude={"dedup_key"}) for event in events]
+        created: list[tuple[int, Event]] = []
+        failed: list[tuple[int, HTTPException]] = []
+
+        # The first item with a key inserts the event; the others replay it
+        positions_by_key: dict[str, list[int]] = {}
+        for position, event in enumerate(events):
+            if event.dedup_key is not None:
+                positions_by_key.setdefault(event.dedup_key, []).append(position)
+        recent = {
+            key: event_id
+            for key in positions_by_key
+            if (event_id := recent_dedup_keys.get(key)) is not None
+        }
+        recent_events = await self._events_by_id(recent.values())
+        originals: dict[str, Event | None] = {
+            key: recent_events.get(event_id) for key, event_id in recent.items()
+        }
+        # Sorted, so that concurrent batches claim shared keys in the same
+        # order instead of deadlocking
+        new_keys = sorted(positions_by_key.keys() - originals.keys())
+        claimed = await self._claim(new_keys)
+        originals.update(await self._originals(set(new_keys) - claimed))
+
+        pending: list[int] = []
+        replays: list[tuple[int, str]] = []
+        for position, event in enumerate(events):
+            key = event.dedup_key
+            if key is None or (key in claimed and positions_by_key[key][0] == position):
+                pending.append(position)
+            else:
+                replays.append((position, key))
+
+        for start in range(0, len(pending), chunk_size):
+            positions = pending[start : start + chunk_size]
+            try:
+                async with self.session.begin_nested():
+                    inserted = await self._insert_rows([rows[i] for i in positions])
+                created.extend(zip(positions, inserted))
+            except DBAPIError:
+                for position in positions:
+                    try:
+                        async with self.session.begin_nested():
+                            inserted = await self._insert_rows([rows[position]])
+                        created.append((position, inserted[0]))
+                    except DBAPIError as e:
+                        if not is_rejected_row(e):
+                            raise
+                        failed.append((position, BadRequestException(str(e.orig))))
+
+        inserted_ids = {
+            events[position].dedup_key: event.id
+            for position, event in created
+            if events[position].dedup_key is not None
+        }
+        failed_keys = {
+            events[position].dedup_key: error
+            for position, error in failed
+            if events[position].dedup_key is not None
+        }
+        await self._bind(inserted_ids)
+        await self._release(list(failed_keys))
+
+        await rollups.mark_dirty(
+            self.session, ((event.name, event.createdAt) for _, event in created)
+        )
+        await live.notify_created(
+            self.session, [event_row(event) for _, event in created]
+        )
+        await self.session.commit()
+        if created:
+            await event_cache.invalidate(ALL_EVENTS)
+
+        events_by_key = {
+            events[position].dedup_key: event
+            for position, event in created
+            if events[position].dedup_key is not None
+        }
+        events_by_key.update(
+            (key, event) for key, event in originals.items() if event is not None
+        )
+        for key, event in events_by_key.items():
+            recent_dedup_keys.set(key, event.id)
+        for position, key in replays:
+            if key in events_by_key:
+                created.append((position, events_by_key[key]))
+            elif key in failed_keys:
+                failed.append((position, failed_keys[key]))
+            else:
+                failed.append((position, _deleted_original(key)))
+        created.sort(key=lambda item: item[0])
+        failed.sort(key=lambda item: item[0])
+        return created, failed
+
+    async def copy_rows(
+        self, rows: list[tuple[str, dict | None, datetime]]
+    ) -> list[tuple[int, HTTPException]]:
+        """Write rows with the binary ``COPY`` protocol in one transaction.
+
+        If the database rejects the chunk, its rows are copied one by one so
+        that only the offending rows fail, as in ``create_many``. Ids are
+        drawn from the sequence up front, since ``COPY`` returns none, so
+        that live subscribers are told about the written events.
+
+        Args:
+            rows: ``(name, value, createdAt)`` tuples
+
+        Returns:
+            list: Failures, each paired with the position of the row in
+                ``rows``; all other rows were written
+        """
+        ids = await self.session.scalars(
+            select(func.nextval(EVENT_ID_SEQUENCE)).select_from(
+                func.generate_series(1, len(rows))
+            )
+        )
+        records = [
+            # An omitted value is SQL NULL, as for created events, not JSON null
+            (event_id, name, None if value is None else json.dumps(value), created_at)
+            for event_id, (name, value, created_at) in zip(ids.all(), rows)
+        ]
+        failed: list[tuple[int, HTTPException]] = []
+        try:
+            async with self.session.begin_nested():
+                await self._copy(records)
+            written = list(zip(records, rows))
+        except PostgresError:
+            written = []
+            for position, (record, row) in enumerate(zip(records, rows)):
+                try:
+                    async with self.session.begin_nested():
+                        await self._copy([record])
+                    written.append((record, row))
+                except PostgresError as e:
+                    if not is_rejected_row(e):
+                        raise
+                    failed.append((position, BadRequestException(str(e))))
+
+        await rollups.mark_dirty(
+            self.session, ((name, created_at) for _, (name, _, created_at) in written)
+        )
+        await live.notify_created(
+            self.session, [(record[0], *row) for record, row in written]
+        )
+        await self.session.commit()
+        if written:
+            await event_cache.invalidate(ALL_EVENTS)
+        return failed
+
+    async def _copy(self, rows: list[tuple]) -> None:
+        """Send rows to the events table with ``COPY`` in the session's transaction."""
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Event.__tablename__, records=rows, columns=COPY_COLUMNS
+        )
+
+    async def _insert_rows(self, rows: list[dict]) -> list[Event]:
+        """Insert rows with one multi-row ``INSERT ... RETURNING`` statement."""
+        query = (
+            insert(Event)
+            .returning(Event, sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=len(rows))
+        )
+        result = await self.session.scalars(query, rows)
+        return list(result.all())
+
+    async def _claim(self, keys: list[str]) -> set[str]:
+        """Insert dedup keys that are not taken yet.
+
+        A key claimed by a concurrent transaction is waited for, and is only
+        claimed here if that transaction rolls back.
+
+        Returns:
+            set: Keys claimed by this transaction
+        """
+        if not keys:
+            return set()
+        query = (
+            pg_insert(EventDedupKey)
+            .from_select(
+                ["key"],
+                select(func.unnest(bindparam("keys", keys, type_=ARRAY(String)))),
+            )
+            .on_conflict_do_nothing()
+            .returning(EventDedupKey.key)
+        )
+        return set((await self.session.scalars(query)).all())
+
+    async def _bind(self, ids: dict[str, int]) -> None:
+        """Record the events inserted for claimed dedup keys."""
+        if not ids:
+            return
+        table = EventDedupKey.__table__
+        query = (
+            update(table)
+            .where(table.c.key == bindparam("claimed_key"))
+            .values(event_id=bindparam("inserted_id"))
+        )
+        await self.session.execute(
+            query,
+            [
+                {"claimed_key": key, "inserted_id": event_id}
+                for key, event_id in ids.items()
+            ],
+        )
+
+    async def _release(self, keys: list[str]) -> None:
+        """Give up claimed dedup keys whose events could not be inserted."""
+        if keys:
+            await self.session.execute(
+                delete(EventDedupKey).where(EventDedupKey.key.in_(keys))
             )
 
+    async def _originals(self, keys: Iterable[str]) -> dict[str, Event | None]:
+        """Get the events ingested with dedup keys.
+
+        Returns:
+            dict: Event of each known key, None if it has since been deleted
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        query = (
+            select(EventDedupKey.key, Event)
+            .outerjoin(Event, Event.id == EventDedupKey.event_id)
+            .where(EventDedupKey.key.in_(keys))
+        )
+        result = await self.session.execute(query)
+        return {key: event for key, event in result.all()}
+
+    async def _events_by_id(self, ids: Iterable[int]) -> dict[int, Event]:
+        """Get the events that still exist among ``ids``."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        result = await self.session.scalars(select(Event).where(Event.id.in_(ids)))
+        return {event.id: event for event in result.all()}
+
+    @staticmethod
+    def _replayed(key: str, event: Event | None) -> Event:
+        """Answer a repeated dedup key with the original event."""
+        if event is None:
+            raise _deleted_original(key)
+        recent_dedup_keys.set(key, event.id)
+        return event
+
     async def get_by_id(self, event_id: int) -> Event:
         """Get event by ID.
 
@@ -50,22 +399,166 @@ class EventRepository:
             NotFoundException: If event not found
         """
         query = select(Event).where(Event.id == event_id)
-        result = await self.session.execute(query)
+        result = await self.session.execute(query.execution_options(replica=True))
         event = result.scalar_one_or_none()
+        if event is None and "replica" in self.session.info:
+            # The replica may not have replayed a very recent insert yet
+            event = (await self.session.execute(query)).scalar_one_or_none()
 
         if not event:
             raise NotFoundException(f"Event with id {event_id} not found")
         return event
 
-    async def get_all(self) -> list[Event]:
-        """Get all events.
+    async def get_page(
+        self,
+        filters: EventFilter,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> Sequence[Row]:
+        """Get a page of events in (createdAt, id) order.
+
+        Uses keyset pagination so that the cost of a page depends on its size
+        rather than on its position in the table. Rows are ``EVENT_COLUMNS``
+        tuples, which skips ORM instantiation.
+
+        Args:
+            filters: Event filters
+            limit: Maximum number of events
+            after: (createdAt, id) of the last event of the previous page
 
         Returns:
-            List[Event]: List of all events
+            Sequence[Row]: Events following ``after``
         """
-        query = select(Event)
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
+        query = select(*EVENT_COLUMNS).where(*filter_clauses(filters))
+        if after is not None:
+            # The plain createdAt bound lets the planner skip the partitions
+            # of earlier pages, which the row comparison alone does not
+            query = query.where(
+                Event.createdAt >= after[0],
+                tuple_(Event.createdAt, Event.id) > tuple_(*after),
+            )
+        query = query.order_by(Event.createdAt, Event.id).limit(limit)
+        result = await self.session.execute(query.execution_options(replica=True))
+        return result.all()
+
+    async def stream_rows(
+        self,
+        filters: EventFilter,
+        batch_size: int,
+        columns: Sequence[ColumnElement] = EVENT_COLUMNS,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Stream matching events through a server-side cursor.
+
+        Rows are plain ``(id, name, value, createdAt)`` tuples rather than ORM
+        objects, so nothing is kept in the session's identity map.
+
+        Args:
+            filters: Event filters
+            batch_size: Rows fetched from the cursor at a time
+            columns: Columns to read instead of ``EVENT_COLUMNS``
+
+        Yields:
+            Sequence[Row]: Up to ``batch_size`` rows in (createdAt, id) order
+        """
+        query = (
+            select(*columns)
+            .where(*filter_clauses(filters))
+            .order_by(Event.createdAt, Event.id)
+            .execution_options(yield_per=batch_size, replica=True)
+        )
+        result = await self.session.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+    async def aggregate(
+        self,
+        filters: EventFilter,
+        bucket: timedelta,
+        agg: Aggregate,
+        path: tuple[str, ...] | None = None,
+    ) -> list[tuple[datetime, float | None]]:
+        """Aggregate events into fixed-width time buckets.
+
+        Buckets are aligned to ``filters.created_from`` with ``date_bin``.
+
+        Args:
+            filters: Event filters, with ``created_from`` set
+            bucket: Bucket width
+            agg: Aggregate function
+            path: Numeric path in the event value; counts events if omitted
+
+        Returns:
+            list: (bucket start, value) pairs for non-empty buckets
+        """
+        bucket_start = func.date_bin(
+            bucket, Event.createdAt, filters.created_from
+        ).label("bucket")
+        value = numeric_value(path) if path else None
+        if agg == "count":
+            aggregate = func.count(value) if value is not None else func.count()
+        else:
+            aggregate = getattr(func, agg)(value)
+
+        query = (
+            select(bucket_start, aggregate)
+            .where(*filter_clauses(filters))
+            .group_by(bucket_start)
+            .order_by(bucket_start)
+        )
+        result = await self.session.execute(query.execution_options(replica=True))
+        return [(start, value) for start, value in result.all()]
+
+    async def series(
+        self, filters: EventFilter, path: tuple[str, ...], limit: int
+    ) -> tuple[list[datetime], list[float]]:
+        """Get the numeric values at a path as parallel columns.
+
+        Args:
+            filters: Event filters
+            path: Numeric path in the event value
+            limit: Maximum number of points
+
+        Returns:
+            tuple: createdAt and value columns in createdAt order, skipping
+                events without a numeric value at ``path``
+        """
+        value = numeric_value(path)
+        query = (
+            select(Event.createdAt, value)
+            .where(*filter_clauses(filters), value.is_not(None))
+            .order_by(Event.createdAt, Event.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query.execution_options(replica=True))
+        rows = result.all()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    async def aggregate_rollup(
+        self,
+        filters: EventFilter,
+        bucket: timedelta,
+        agg: Aggregate,
+        field: str,
+        resolution: str,
+    ) -> list[tuple[datetime, float | None]]:
+        """Aggregate events from a rollup table.
+
+        Buckets awaiting recomputation, and the end of the range after the
+        last whole rollup bucket, are aggregated from raw events instead.
+
+        Args:
+            filters: Event filters, with the createdAt range set
+            bucket: Bucket width, a multiple of ``resolution``
+            agg: Aggregate function
+            field: Rollup field
+            resolution: Rollup resolution, to which the range start is aligned
+
+        Returns:
+            list: (bucket start, value) pairs
+        """
+        return await rollups.aggregate(
+            self.session, resolution, filters, bucket, agg, field
+        )
 
     async def update(self, event_id: int, event_data: EventUpdate) -> Event:
         """Update event by ID.
@@ -84,13 +577,16 @@ class EventRepository:
         if not update_data:
             raise ValueError("No fields to update")
 
+        await rollups.mark_dirty_ids(self.session, [event_id])
         query = update(Event).where(Event.id == event_id).values(**update_data)
         result = await self.session.execute(query)
 
         if result.rowcount == 0:
             raise NotFoundException(f"Event with id {event_id} not found")
 
+        await rollups.mark_dirty_ids(self.session, [event_id])
         await self.session.commit()
+        await event_cache.invalidate(ALL_EVENTS, event_tag(event_id))
         return await self.get_by_id(event_id)
 
     async def delete(self, event_id: int) -> None:
@@ -102,6 +598,7 @@ class EventRepository:
         Raises:
             NotFoundException: If event not found
         """
+        await rollups.mark_dirty_ids(self.session, [event_id])
         query = delete(Event).where(Event.id == event_id)
         result = await self.session.execute(query)
 
@@ -109,3 +606,147 @@ class EventRepository:
             raise NotFoundException(f"Event with id {event_id} not found")
 
         await self.session.commit()
+        await event_cache.invalidate(ALL_EVENTS, event_tag(event_id))
+
+    async def count_where(self, filters: EventBulkFilter) -> int:
+        """Count the events matching a bulk filter.
+
+        Args:
+            filters: Bulk filter
+
+        Returns:
+            int: Number of matching events
+        """
+        query = select(func.count()).select_from(Event)
+        return await self.session.scalar(query.where(*bulk_filter_clauses(filters)))
+
+    async def update_where(
+        self, filters: EventBulkFilter, event_data: EventUpdate, chunk_size: int
+    ) -> tuple[int, int]:
+        """Update the events matching a bulk filter, a chunk at a time.
+
+        Args:
+            filters: Bulk filter
+            event_data: Fields to set
+            chunk_size: Events updated per transaction
+
+        Returns:
+            tuple: Events updated and transactions committed
+        """
+        statement = update(Event).values(**event_data.model_dump(exclude_unset=True))
+        return await self._in_chunks(filters, statement, chunk_size)
+
+    async def delete_where(
+        self, filters: EventBulkFilter, chunk_size: int
+    ) -> tuple[int, int]:
+        """Delete the events matching a bulk filter, a chunk at a time.
+
+        Args:
+            filters: Bulk filter
+            chunk_size: Events deleted per transaction
+
+        Returns:
+            tuple: Events deleted and transactions committed
+        """
+        return await self._in_chunks(filters, delete(Event), chunk_size)
+
+    async def _in_chunks(
+        self, filters: EventBulkFilter, statement, chunk_size: int
+    ) -> tuple[int, int]:
+        """Apply an UPDATE or DELETE to matching events in ID order.
+
+        Each chunk of IDs is written and committed in its own transaction, so
+        that row locks are held briefly and a failure keeps the chunks
+        already committed. Chunks are found by keyset on the ID, so updated
+        events that still match are not visited twice. The filter is checked
+        again by the write itself, for events changed in the meantime.
+        """
+        clauses = bulk_filter_clauses(filters)
+        affected = chunks = 0
+        last_id = None
+        while True:
+            query = select(Event.id).where(*clauses)
+            if last_id is not None:
+                query = query.where(Event.id > last_id)
+            query = query.order_by(Event.id).limit(chunk_size)
+            ids = list((await self.session.scalars(query)).all())
+            if not ids:
+                break
+
+            await rollups.mark_dirty_ids(self.session, ids)
+            result = await self.session.execute(
+                statement.where(Event.id.in_(ids), *clauses)
+            )
+            # Updated events may have moved to other buckets
+            await rollups.mark_dirty_ids(self.session, ids)
+            await self.session.commit()
+            await event_cache.invalidate(ALL_EVENTS, SINGLE_EVENTS)
+            affected += result.rowcount
+            chunks += 1
+            last_id = ids[-1]
+            if len(ids) < chunk_size:
+                break
+        return affected, chunks
+
+
+def bulk_filter_clauses(filters: EventBulkFilter) -> list[ColumnElement[bool]]:
+    """Build WHERE clauses for a bulk filter.
+
+    Args:
+        filters: Bulk filter
+
+    Returns:
+        list: Clauses to combine with AND
+
+    Raises:
+        BadRequestException: If a value condition is malformed
+    """
+    clauses = filter_clauses(
+        EventFilter(
+            name=filters.name,
+            created_from=filters.created_from,
+            created_to=filters.created_to,
+            value=[parse_value_filter(expression) for expression in filters.where],
+        )
+    )
+    if filters.ids is not None:
+        clauses.append(Event.id.in_(filters.ids))
+    if filters.id_from is not None:
+        clauses.append(Event.id >= filters.id_from)
+    if filters.id_to is not None:
+        clauses.append(Event.id < filters.id_to)
+    return clauses
+
+
+def is_rejected_row(error: DBAPIError | PostgresError) -> bool:
+    """Whether the database refused a row for its data, not for a failure.
+
+    Accepts errors raised through SQLAlchemy and by the driver directly, as
+    ``COPY`` does.
+    """
+    sqlstate = getattr(getattr(error, "orig", error), "sqlstate", None) or ""
+    return sqlstate.startswith(REJECTED_ROW_CLASSES)
+
+
+def _deleted_original(key: str) -> AlreadyExistsException:
+    return AlreadyExistsException(f"Event with dedup key {key} was deleted")
+
+
+def filter_clauses(filters: EventFilter) -> list[ColumnElement[bool]]:
+    """Build WHERE clauses for event filters.
+
+    Args:
+        filters: Event filters
+
+    Returns:
+        list: Clauses to combine with AND
+    """
+    clauses = []
+    if filters.name is not None:
+        clauses.append(Event.name == filters.name)
+    if filters.created_from is not None:
+        clauses.append(Event.createdAt >= filters.created_from)
+    if filters.created_to is not None:
+        clauses.append(Event.createdAt < filters.created_to)
+    clauses.extend(value_clause(value_filter) for value_filter in filters.value)
+    return clauses
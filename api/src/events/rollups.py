@@ -0,0 +1,561 @@
+import asyncio
+import math
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Float,
+    Select,
+    and_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import settings
+from api.core.database import async_session
+from api.core.logging import get_logger
+from api.src.events.aggregation import Aggregate, numeric_value, parse_path
+from api.src.events.models import Event, EventRollup, EventRollupDirty
+from api.src.events.schemas import EventFilter
+
+logger = get_logger(__name__)
+
+# Finest first: each resolution is rolled up from the one before it
+RESOLUTIONS: dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Rollup field holding plain event counts
+COUNT_FIELD = ""
+
+_EPOCH = datetime(1970, 1, 1)
+_ROLLUP_COLUMNS = [
+    "resolution",
+    "name",
+    "field",
+    "bucket",
+    "count",
+    "sum",
+    "min",
+    "max",
+]
+
+
+@dataclass
+class RollupMismatch:
+    """A rollup row that disagrees with the raw events it summarizes."""
+
+    resolution: str
+    name: str
+    field: str
+    bucket: datetime
+    expected: tuple | None
+    actual: tuple | None
+
+
+def truncate(value: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket."""
+    return value - (value - _EPOCH) % RESOLUTIONS[resolution]
+
+
+def rollup_fields() -> list[str]:
+    """Fields maintained in the rollup tables."""
+    return [COUNT_FIELD, *settings.EVENT_ROLLUP_FIELDS]
+
+
+def choose_resolution(bucket: timedelta, start: datetime, end: datetime) -> str | None:
+    """Pick the coarsest rollup that can serve a bucketed query.
+
+    The bucket width must be a multiple of the resolution and the start,
+    which is the bucket origin, aligned to it. The end need not be: the part
+    of the range after the last whole rollup bucket is read from raw events.
+
+    Args:
+        bucket: Requested bucket width
+        start: Query start, used as the bucket origin
+        end: Query end
+
+    Returns:
+        str | None: Rollup resolution, or None if only raw events will do
+    """
+    for resolution, width in reversed(RESOLUTIONS.items()):
+        if (
+            bucket % width == timedelta(0)
+            and truncate(start, resolution) == start
+            and truncate(end, resolution) > start
+        ):
+            return resolution
+    return None
+
+
+def _upsert_dirty(query):
+    # Locking existing rows on conflict, rather than DO NOTHING, makes the
+    # compactor skip buckets whose writers have not committed yet
+    return query.on_conflict_do_update(
+        index_elements=["name", "bucket"], set_={"bucket": query.excluded.bucket}
+    )
+
+
+async def mark_dirty(
+    session: AsyncSession, keys: Iterable[tuple[str, datetime]]
+) -> None:
+    """Flag the minute buckets of written events for recomputation.
+
+    Args:
+        session: Session of the writing transaction
+        keys: (name, createdAt) of each written event
+    """
+    if not settings.EVENT_ROLLUPS_ENABLED:
+        return
+    buckets = {(name, truncate(created_at, "minute")) for name, created_at in keys}
+    if not buckets:
+        return
+    rows = [{"name": name, "bucket": bucket} for name, bucket in buckets]
+    await session.execute(_upsert_dirty(pg_insert(EventRollupDirty).values(rows)))
+
+
+async def mark_dirty_ids(session: AsyncSession, event_ids: Iterable[int]) -> None:
+    """Flag the minute buckets of stored events for recomputation.
+
+    Args:
+        session: Session of the writing transaction
+        event_ids: IDs of events about to change or just written
+    """
+    event_ids = list(event_ids)
+    if not settings.EVENT_ROLLUPS_ENABLED or not event_ids:
+        return
+    minute = func.date_trunc("minute", Event.createdAt)
+    query = pg_insert(EventRollupDirty).from_select(
+        ["name", "bucket"],
+        select(Event.name, minute).where(Event.id.in_(event_ids)).distinct(),
+    )
+    await session.execute(_upsert_dirty(query))
+
+
+def _from_events(
+    resolution: str,
+    field: str,
+    start: datetime,
+    end: datetime,
+    names: set[str] | None = None,
+    keys: set[tuple[str, datetime]] | None = None,
+) -> Select:
+    """Select rollup rows of one field computed directly from raw events."""
+    bucket = func.date_trunc(resolution, Event.createdAt)
+    clauses = [Event.createdAt >= start, Event.createdAt < end]
+    if names:
+        clauses.append(Event.name.in_(names))
+    if keys:
+        clauses.append(tuple_(Event.name, bucket).in_(keys))
+    if field == COUNT_FIELD:
+        empty = cast(null(), Float)
+        aggregates = [func.count(), empty, empty, empty]
+    else:
+        value = numeric_value(parse_path(field))
+        clauses.append(value.is_not(None))
+        aggregates = [
+            func.count(value),
+            func.sum(value),
+            func.min(value),
+            func.max(value),
+        ]
+    return (
+        select(literal(resolution), Event.name, literal(field), bucket, *aggregates)
+        .where(*clauses)
+        .group_by(Event.name, bucket)
+    )
+
+
+def _source(
+    resolution: str,
+    field: str | None,
+    start: datetime,
+    end: datetime,
+    names: set[str] | None,
+    keys: set[tuple[str, datetime]] | None,
+) -> Select:
+    """Select rollup rows for a resolution from its source.
+
+    Minute rollups are computed from raw events, coarser ones from the
+    previous resolution. ``field`` is only used for minute rollups.
+    """
+    if resolution == "minute":
+        return _from_events(resolution, field, start, end, names, keys)
+
+    finer = list(RESOLUTIONS)[list(RESOLUTIONS).index(resolution) - 1]
+    bucket = func.date_trunc(resolution, EventRollup.bucket)
+    clauses = [
+        EventRollup.resolution == finer,
+        EventRollup.bucket >= start,
+        EventRollup.bucket < end,
+    ]
+    if names:
+        clauses.append(EventRollup.name.in_(names))
+    if keys:
+        clauses.append(tuple_(EventRollup.name, bucket).in_(keys))
+    return (
+        select(
+            literal(resolution),
+            EventRollup.name,
+            EventRollup.field,
+            bucket,
+            func.sum(EventRollup.count),
+            func.sum(EventRollup.sum),
+            func.min(EventRollup.min),
+            func.max(EventRollup.max),
+        )
+        .where(*clauses)
+        .group_by(EventRollup.name, EventRollup.field, bucket)
+    )
+
+
+async def _rebuild_resolution(
+    session: AsyncSession,
+    resolution: str,
+    start: datetime,
+    end: datetime,
+    names: set[str] | None = None,
+    keys: set[tuple[str, datetime]] | None = None,
+) -> None:
+    """Replace the rollups of one resolution within a range."""
+    clauses = [
+        EventRollup.resolution == resolution,
+        EventRollup.bucket >= start,
+        EventRollup.bucket < end,
+    ]
+    if names:
+        clauses.append(EventRollup.name.in_(names))
+    if keys:
+        clauses.append(tuple_(EventRollup.name, EventRollup.bucket).in_(keys))
+    await session.execute(delete(EventRollup).where(*clauses))
+
+    fields = rollup_fields() if resolution == "minute" else [None]
+    for field in fields:
+        query = _source(resolution, field, start, end, names, keys)
+        await session.execute(insert(EventRollup).from_select(_ROLLUP_COLUMNS, query))
+
+
+async def recompute(session: AsyncSession, keys: Iterable[tuple[str, datetime]]):
+    """Recompute every resolution covering the given minute buckets.
+
+    Args:
+        session: Database session; the caller commits
+        keys: (name, minute bucket) pairs
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    names = {name for name, _ in keys}
+    for resolution, width in RESOLUTIONS.items():
+        buckets = {(name, truncate(bucket, resolution)) for name, bucket in keys}
+        start = min(bucket for _, bucket in buckets)
+        end = max(bucket for _, bucket in buckets) + width
+        await _rebuild_resolution(session, resolution, start, end, names, buckets)
+
+
+async def rebuild(
+    session: AsyncSession, start: datetime, end: datetime, name: str | None = None
+) -> int:
+    """Rebuild all rollups from raw events, one day per transaction.
+
+    Args:
+        session: Database session
+        start: Range start, widened to a day boundary
+        end: Range end, widened to a day boundary
+        name: Only rebuild rollups of this event name
+
+    Returns:
+        int: Number of days rebuilt
+    """
+    names = {name} if name else None
+    day = truncate(start, "day")
+    days = 0
+    while day < end:
+        next_day = day + RESOLUTIONS["day"]
+        clauses = [EventRollupDirty.bucket >= day, EventRollupDirty.bucket < next_day]
+        if name:
+            clauses.append(EventRollupDirty.name == name)
+        await session.execute(delete(EventRollupDirty).where(*clauses))
+        for resolution in RESOLUTIONS:
+            await _rebuild_resolution(session, resolution, day, next_day, names)
+        await session.commit()
+        logger.info("Rebuilt rollups for %s", day.date(), extra={"day": day.date()})
+        day = next_day
+        days += 1
+    return days
+
+
+async def check(
+    session: AsyncSession, start: datetime, end: datetime, name: str | None = None
+) -> list[RollupMismatch]:
+    """Compare rollups with aggregates computed from raw events.
+
+    Args:
+        session: Database session
+        start: Range start, widened to a day boundary
+        end: Range end, widened to a day boundary
+        name: Only check rollups of this event name
+
+    Returns:
+        list[RollupMismatch]: Buckets whose rollup is missing, extra or wrong
+    """
+    start = truncate(start, "day")
+    end = truncate(end - timedelta(microseconds=1), "day") + RESOLUTIONS["day"]
+    names = {name} if name else None
+    mismatches = []
+    for resolution in RESOLUTIONS:
+        for field in rollup_fields():
+            raw = _from_events(resolution, field, start, end, names)
+            expected = {
+                (row[1], row[3]): tuple(row[4:])
+                for row in (await session.execute(raw)).all()
+            }
+            clauses = [
+                EventRollup.resolution == resolution,
+                EventRollup.field == field,
+                EventRollup.bucket >= start,
+                EventRollup.bucket < end,
+            ]
+            if name:
+                clauses.append(EventRollup.name == name)
+            stored = select(
+                EventRollup.name,
+                EventRollup.bucket,
+                EventRollup.count,
+                EventRollup.sum,
+                EventRollup.min,
+                EventRollup.max,
+            ).where(*clauses)
+            actual = {
+                (row[0], row[1]): tuple(row[2:])
+                for row in (await session.execute(stored)).all()
+            }
+            for key in expected.keys() | actual.keys():
+                if not _same(expected.get(key), actual.get(key)):
+                    mismatches.append(
+                        RollupMismatch(
+                            resolution=resolution,
+                            name=key[0],
+                            field=field,
+                            bucket=key[1],
+                            expected=expected.get(key),
+                            actual=actual.get(key),
+                        )
+                    )
+    return mismatches
+
+
+def _same(expected: tuple | None, actual: tuple | None) -> bool:
+    """Compare rollup statistics, allowing for float rounding in sums."""
+    if expected is None or actual is None:
+        return expected == actual
+    return all(
+        a == b or (a is not None and b is not None and math.isclose(a, b))
+        for a, b in zip(expected, actual)
+    )
+
+
+async def aggregate(
+    session: AsyncSession,
+    resolution: str,
+    filters: EventFilter,
+    bucket: timedelta,
+    agg: Aggregate,
+    field: str,
+) -> list[tuple[datetime, float | None]]:
+    """Aggregate into fixed-width buckets aligned to the range start.
+
+    Rollup buckets wholly inside the range are read from the rollup table,
+    except those with a minute awaiting recomputation; these, and the part
+    of the range after the last whole rollup bucket, such as the current
+    minute of a range ending now, are aggregated from raw events. All parts
+    are read in one statement, and so from one snapshot.
+
+    Args:
+        session: Database session
+        resolution: Rollup resolution that divides ``bucket``, with the range
+            start aligned to it
+        filters: Event filters with the createdAt range set
+        bucket: Bucket width
+        agg: Aggregate function
+        field: Rollup field
+
+    Returns:
+        list: (bucket start, value) pairs for non-empty buckets
+    """
+    start, end = filters.created_from, filters.created_to
+    rollup_end = truncate(end, resolution)
+    width = RESOLUTIONS[resolution]
+
+    dirty = [EventRollupDirty.bucket >= start, EventRollupDirty.bucket < rollup_end]
+    if filters.name is not None:
+        dirty.append(EventRollupDirty.name == filters.name)
+    stale = (
+        select(
+            EventRollupDirty.name,
+            func.date_trunc(resolution, EventRollupDirty.bucket).label("bucket"),
+        )
+        .where(*dirty)
+        .distinct()
+        .cte("stale")
+    )
+
+    rollup_clauses = [
+        EventRollup.resolution == resolution,
+        EventRollup.field == field,
+        EventRollup.bucket >= start,
+        EventRollup.bucket < rollup_end,
+        ~exists().where(
+            stale.c.name == EventRollup.name, stale.c.bucket == EventRollup.bucket
+        ),
+    ]
+    if filters.name is not None:
+        rollup_clauses.append(EventRollup.name == filters.name)
+    from_rollups = select(
+        EventRollup.bucket.label("at"),
+        EventRollup.count,
+        EventRollup.sum,
+        EventRollup.min,
+        EventRollup.max,
+    ).where(*rollup_clauses)
+
+    # Raw events as single-event partial aggregates
+    raw_clauses = []
+    if filters.name is not None:
+        raw_clauses.append(Event.name == filters.name)
+    if field == COUNT_FIELD:
+        value = cast(null(), Float)
+    else:
+        value = numeric_value(parse_path(field))
+        raw_clauses.append(value.is_not(None))
+    raw = select(
+        Event.createdAt,
+        literal(1, BigInteger),
+        value.label("sum"),
+        value.label("min"),
+        value.label("max"),
+    )
+    from_stale = raw.join(
+        stale,
+        and_(
+            Event.name == stale.c.name,
+            Event.createdAt >= stale.c.bucket,
+            Event.createdAt < stale.c.bucket + width,
+        ),
+    ).where(*raw_clauses)
+    from_tail = raw.where(
+        *raw_clauses, Event.createdAt >= rollup_end, Event.createdAt < end
+    )
+
+    parts = union_all(from_rollups, from_stale, from_tail).subquery()
+    bucket_start = func.date_bin(bucket, parts.c.at, start).label("bucket")
+    aggregates: dict[str, ColumnElement] = {
+        "count": func.sum(parts.c.count),
+        "sum": func.sum(parts.c.sum),
+        "avg": func.sum(parts.c.sum) / func.sum(parts.c.count),
+        "min": func.min(parts.c.min),
+        "max": func.max(parts.c.max),
+    }
+    query = (
+        select(bucket_start, cast(aggregates[agg], Float))
+        .group_by(bucket_start)
+        .order_by(bucket_start)
+    )
+    result = await session.execute(query.execution_options(replica=True))
+    return [(start, value) for start, value in result.all()]
+
+
+class RollupCompactor:
+    """Background task that recomputes rollups for dirty buckets."""
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        session_factory: Callable[[], AsyncSession] = async_session,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the compactor is running."""
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start compacting in the background."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Rollup compactor started")
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Rollup compactor stopped")
+
+    async def compact(self) -> int:
+        """Recompute one batch of dirty buckets.
+
+        Returns:
+            int: Number of minute buckets recomputed
+        """
+        async with self.session_factory() as session:
+            claimable = (
+                select(EventRollupDirty.name, EventRollupDirty.bucket)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            query = (
+                delete(EventRollupDirty)
+                .where(
+                    tuple_(EventRollupDirty.name, EventRollupDirty.bucket).in_(
+                        claimable
+                    )
+                )
+                .returning(EventRollupDirty.name, EventRollupDirty.bucket)
+            )
+            keys = [tuple(row) for row in (await session.execute(query)).all()]
+            await recompute(session, keys)
+            await session.commit()
+            return len(keys)
+
+    async def _run(self) -> None:
+        """Compact until no dirty buckets remain, then wait for the interval."""
+        while True:
+            try:
+                while await self.compact() == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error("Failed to compact rollups: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+rollup_compactor = RollupCompactor(
+    interval=settings.EVENT_ROLLUP_COMPACT_INTERVAL,
+    batch_size=settings.EVENT_ROLLUP_COMPACT_BATCH,
+)
@@ -1,13 +1,44 @@
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+from typing import Any, Literal
+
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.core.database import get_session
+from api.core.config import settings
+from api.core.database import async_session, get_session
+from api.core.exceptions import ServiceUnavailableException
 from api.core.logging import get_logger
-from api.core.security import get_current_user
+from api.core.response_cache import conditional_response
+from api.core.security import Principal, get_current_user
+from api.src.events import columnar
+from api.src.events.aggregation import Aggregate, parse_path
+from api.src.events.buffer import ingest_buffer
+from api.src.events.cache import event_cache
+from api.src.events.downsampling import Method
+from api.src.events.filters import parse_value_filter
+from api.src.events.live import event_broadcaster
 from api.src.events.repository import EventRepository
-from api.src.events.schemas import EventCreate, EventResponse, EventUpdate
+from api.src.events.schemas import (
+    EventAggregateResponse,
+    EventBatchResponse,
+    EventBulkFilter,
+    EventBulkResponse,
+    EventBulkUpdate,
+    EventCacheStats,
+    EventCreate,
+    EventFilter,
+    EventImportResponse,
+    EventPage,
+    EventResponse,
+    EventSeriesResponse,
+    EventStreamStats,
+    EventUpdate,
+    IngestBufferStats,
+)
+from api.src.events.serialization import JSONBytesResponse
 from api.src.events.service import EventService
-from api.src.users.models import User
+from api.utils.streaming import iter_lines
 
 # Set up logger for this module
 logger = get_logger(__name__)
@@ -18,56 +49,367 @@ router = APIRouter(prefix="/events", tags=["events"])
 def get_event_service(session: AsyncSession = Depends(get_session)) -> EventService:
     """Dependency for getting event service instance."""
     repository = EventRepository(session)
-    return EventService(repository)
+    buffer = ingest_buffer if ingest_buffer.running else None
+    return EventService(repository, buffer)
+
+
+def get_event_filter(
+    name: str | None = Query(None, description="Exact event name"),
+    created_from: datetime | None = Query(
+        None, alias="from", description="Inclusive lower bound on createdAt"
+    ),
+    created_to: datetime | None = Query(
+        None, alias="to", description="Exclusive upper bound on createdAt"
+    ),
+    where: list[str] = Query(
+        [],
+        description="Conditions on the event value, e.g. value.region=eu or "
+        "value.latency>200",
+    ),
+) -> EventFilter:
+    """Dependency for getting event query filters."""
+    return EventFilter(
+        name=name,
+        created_from=created_from,
+        created_to=created_to,
+        value=[parse_value_filter(expression) for expression in where],
+    )
+
+
+@router.get(
+    "/",
+    response_model=EventPage,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Page unchanged"}},
+)
+async def get_events(
+    request: Request,
+    limit: int = Query(
+        settings.EVENT_PAGE_DEFAULT_LIMIT, ge=1, le=settings.EVENT_PAGE_MAX_LIMIT
+    ),
+    after: str | None = Query(None, description="Cursor from a previous page"),
+    filters: EventFilter = Depends(get_event_filter),
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventPage | Response:
+    """Get a page of events ordered by createdAt.
+
+    Responses carry an ETag; send it back in ``If-None-Match`` to get
+    304 Not Modified while the page is unchanged.
+    """
+    logger.debug("Fetching events page")
+    try:
+        if event_cache.enabled:
+            entry = await service.get_events_page_cached(filters, limit, after)
+            logger.info("Retrieved events page of %d bytes", len(entry.body))
+            return conditional_response(entry, request)
+        if settings.EVENT_FAST_JSON:
+            body = await service.get_events_page_json(filters, limit, after)
+            logger.info("Retrieved events page of %d bytes", len(body))
+            return JSONBytesResponse(body)
+        page = await service.get_events_page(filters, limit, after)
+        logger.info("Retrieved %d events", len(page.items))
+        return page
+    except Exception as e:
+        logger.error("Failed to fetch events: %s", e)
+        raise
+
+
+@router.get("/aggregate", response_model=EventAggregateResponse)
+async def aggregate_events(
+    bucket: str = Query(..., description="Bucket width, e.g. 30s, 1m, 1h, 1d"),
+    agg: Aggregate = Query("count"),
+    field: str | None = Query(None, description="Dotted numeric path in value"),
+    downsample: int | None = Query(None, ge=3, le=settings.EVENT_DOWNSAMPLE_MAX_POINTS),
+    method: Method = Query("lttb", description="Downsampling method"),
+    filters: EventFilter = Depends(get_event_filter),
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventAggregateResponse:
+    """Aggregate events into time buckets for charting."""
+    logger.debug("Aggregating events: %s(%s) per %s", agg, field, bucket)
+    try:
+        result = await service.aggregate_events(
+            filters, bucket, agg, field, downsample, method
+        )
+        logger.info("Aggregated events into %d buckets", len(result.timestamps))
+        return result
+    except Exception as e:
+        logger.error("Failed to aggregate events: %s", e)
+        raise
 
 
-@router.get("/", response_model=list[EventResponse])
-async def get_all_events(
+@router.get("/series", response_model=EventSeriesResponse)
+async def get_series(
+    field: str = Query(..., description="Dotted numeric path in value"),
+    downsample: int | None = Query(None, ge=3, le=settings.EVENT_DOWNSAMPLE_MAX_POINTS),
+    method: Method = Query("lttb", description="Downsampling method"),
+    filters: EventFilter = Depends(get_event_filter),
     service: EventService = Depends(get_event_service),
-    current_user: User = Depends(get_current_user),
-) -> list[EventResponse]:
-    """Get all events."""
-    logger.debug("Fetching all events")
+    current_user: Principal = Depends(get_current_user),
+) -> EventSeriesResponse:
+    """Get a numeric series from event values, optionally downsampled."""
+    logger.debug("Fetching series %s", field)
     try:
-        events = await service.get_all_events()
-        logger.info(f"Retrieved {len(events)} events")
-        return events
+        result = await service.get_series(filters, field, downsample, method)
+        logger.info(
+            "Retrieved series %s: %d of %d points",
+            field,
+            len(result.values),
+            result.source_points,
+        )
+        return result
     except Exception as e:
-        logger.error(f"Failed to fetch events: {str(e)}")
+        logger.error("Failed to fetch series %s: %s", field, e, extra={"field": field})
         raise
 
 
-@router.get("/{event_id}", response_model=EventResponse)
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    **columnar.MEDIA_TYPES,
+}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_events(
+    fmt: Literal["ndjson", "csv", "arrow", "parquet"] = Query("ndjson", alias="format"),
+    fields: list[str] = Query(
+        [],
+        alias="field",
+        description="Numeric paths in value exported as float columns by the "
+        "arrow and parquet formats, e.g. cpu.load; the value is exported as "
+        "JSON text if none are given",
+    ),
+    filters: EventFilter = Depends(get_event_filter),
+    current_user: Principal = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream all matching events as NDJSON, CSV, an Arrow IPC stream or Parquet."""
+    logger.debug("Exporting events as %s", fmt)
+    if fmt in columnar.MEDIA_TYPES:
+        # Errors must be raised before the response starts
+        columnar.require()
+        for field in fields:
+            parse_path(field)
+
+    async def body():
+        # The export outlives the request's dependencies, so it owns its session
+        async with async_session() as session:
+            service = EventService(EventRepository(session))
+            async for chunk in service.export_events(filters, fmt, fields):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="events.{fmt}"'},
+    )
+
+
+@router.get("/ingest/stats", response_model=IngestBufferStats)
+async def get_ingest_stats(
+    current_user: Principal = Depends(get_current_user),
+) -> IngestBufferStats:
+    """Get ingest buffer queue and flush metrics."""
+    return ingest_buffer.stats()
+
+
+@router.get("/cache/stats", response_model=EventCacheStats)
+async def get_cache_stats(
+    current_user: Principal = Depends(get_current_user),
+) -> EventCacheStats:
+    """Get response cache hit, miss and eviction counters."""
+    return EventCacheStats(**event_cache.stats())
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_events(
+    name: str | None = Query(None, description="Only stream events with this name"),
+    current_user: Principal = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream newly created events as Server-Sent Events.
+
+    Each message carries one event as JSON, with the event's id as the message
+    id. A client that falls too far behind receives a ``dropped`` event and
+    should reconnect, catching up through ``GET /events/``.
+    """
+    if not event_broadcaster.running:
+        raise ServiceUnavailableException("Live event streaming is disabled")
+    subscription = event_broadcaster.subscribe(name)
+    logger.debug("Live subscriber joined for %s", name or "all events")
+
+    async def body():
+        try:
+            async for message in subscription.messages(settings.EVENT_STREAM_KEEPALIVE):
+                yield message
+        finally:
+            event_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        # Proxies must pass messages on as they come rather than buffer them
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream/stats", response_model=EventStreamStats)
+async def get_stream_stats(
+    current_user: Principal = Depends(get_current_user),
+) -> EventStreamStats:
+    """Get live subscriber and delivery counters of this worker."""
+    return event_broadcaster.stats()
+
+
+@router.get(
+    "/{event_id}",
+    response_model=EventResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Event unchanged"}},
+)
 async def get_event(
     event_id: int,
+    request: Request,
     service: EventService = Depends(get_event_service),
-    current_user: User = Depends(get_current_user),
-) -> EventResponse:
-    """Get event by ID."""
-    logger.debug(f"Fetching event {event_id}")
+    current_user: Principal = Depends(get_current_user),
+) -> EventResponse | Response:
+    """Get event by ID, with an ETag for conditional requests."""
+    logger.debug("Fetching event %d", event_id, extra={"event_id": event_id})
     try:
+        if event_cache.enabled:
+            entry = await service.get_event_cached(event_id)
+            logger.info("Retrieved event %d", event_id, extra={"event_id": event_id})
+            return conditional_response(entry, request)
+        if settings.EVENT_FAST_JSON:
+            body = await service.get_event_json(event_id)
+            logger.info("Retrieved event %d", event_id, extra={"event_id": event_id})
+            return JSONBytesResponse(body)
         event = await service.get_event(event_id)
-        logger.info(f"Retrieved event {event_id}")
+        logger.info("Retrieved event %d", event_id, extra={"event_id": event_id})
         return event
     except Exception as e:
-        logger.error(f"Failed to fetch event {event_id}: {str(e)}")
+        logger.error(
+            "Failed to fetch event %d: %s", event_id, e, extra={"event_id": event_id}
+        )
         raise
 
 
-@router.post("/", response_model=EventResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=EventResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"description": "Event queued"}},
+)
 async def create_event(
     event_data: EventCreate,
+    ack: Literal["durable", "enqueue"] | None = Query(
+        None, description="When the ingest buffer is enabled, when to respond"
+    ),
     service: EventService = Depends(get_event_service),
-    current_user: User = Depends(get_current_user),
-) -> EventResponse:
+    current_user: Principal = Depends(get_current_user),
+) -> EventResponse | Response:
     """Create a new event."""
     logger.debug("Creating new event")
     try:
-        event = await service.create_event(event_data)
-        logger.info(f"Created event {event.id}")
+        event = await service.create_event(event_data, ack)
+        if event is None:
+            logger.info("Queued event")
+            return Response(status_code=status.HTTP_202_ACCEPTED)
+        logger.info("Created event %d", event.id, extra={"event_id": event.id})
         return event
     except Exception as e:
-        logger.error(f"Failed to create event: {str(e)}")
+        logger.error("Failed to create event: %s", e)
+        raise
+
+
+@router.post(
+    "/batch",
+    response_model=EventBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_events_batch(
+    items: list[dict[str, Any]] = Body(..., max_length=settings.EVENT_BATCH_MAX_SIZE),
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventBatchResponse:
+    """Create a batch of events, reporting failures per item."""
+    logger.debug("Creating batch of %d events", len(items))
+    try:
+        result = await service.create_events(items)
+        logger.info(
+            "Created %d events, %d rejected", len(result.created), len(result.errors)
+        )
+        return result
+    except Exception as e:
+        logger.error("Failed to create event batch: %s", e)
+        raise
+
+
+@router.post(
+    "/upload",
+    response_model=EventImportResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def upload_events(
+    request: Request,
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventImportResponse:
+    """Bulk load events from a newline-delimited JSON request body."""
+    logger.debug("Importing events from NDJSON upload")
+    try:
+        lines = iter_lines(request.stream(), settings.EVENT_UPLOAD_MAX_LINE_BYTES)
+        result = await service.import_events(lines)
+        logger.info(
+            "Imported %d events, %d lines rejected", result.accepted, result.rejected
+        )
+        return result
+    except Exception as e:
+        logger.error("Failed to import events: %s", e)
+        raise
+
+
+@router.patch("/bulk", response_model=EventBulkResponse)
+async def bulk_update_events(
+    request: EventBulkUpdate,
+    dry_run: bool = Query(False, description="Only count the matching events"),
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventBulkResponse:
+    """Update all events matching a filter, committed in chunks."""
+    logger.debug("Bulk updating events")
+    try:
+        result = await service.bulk_update(request, dry_run)
+        logger.info(
+            "Bulk update matched %s, updated %d events in %d chunks",
+            result.matched,
+            result.affected,
+            result.chunks,
+        )
+        return result
+    except Exception as e:
+        logger.error("Failed to bulk update events: %s", e)
+        raise
+
+
+@router.delete("/bulk", response_model=EventBulkResponse)
+async def bulk_delete_events(
+    filters: EventBulkFilter = Body(...),
+    dry_run: bool = Query(False, description="Only count the matching events"),
+    service: EventService = Depends(get_event_service),
+    current_user: Principal = Depends(get_current_user),
+) -> EventBulkResponse:
+    """Delete all events matching a filter, committed in chunks."""
+    logger.debug("Bulk deleting events")
+    try:
+        result = await service.bulk_delete(filters, dry_run)
+        logger.info(
+            "Bulk delete matched %s, deleted %d events in %d chunks",
+            result.matched,
+            result.affected,
+            result.chunks,
+        )
+        return result
+    except Exception as e:
+        logger.error("Failed to bulk delete events: %s", e)
         raise
 
 
@@ -76,16 +418,18 @@ async def update_event(
     event_id: int,
     event_data: EventUpdate,
     service: EventService = Depends(get_event_service),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> EventResponse:
     """Update event by ID."""
-    logger.debug(f"Updating event {event_id}")
+    logger.debug("Updating event %d", event_id, extra={"event_id": event_id})
     try:
         event = await service.update_event(event_id, event_data)
-        logger.info(f"Updated event {event_id}")
+        logger.info("Updated event %d", event_id, extra={"event_id": event_id})
         return event
     except Exception as e:
-        logger.error(f"Failed to update event {event_id}: {str(e)}")
+        logger.error(
+            "Failed to update event %d: %s", event_id, e, extra={"event_id": event_id}
+        )
         raise
 
 
@@ -93,13 +437,15 @@ async def update_event(
 async def delete_event(
     event_id: int,
     service: EventService = Depends(get_event_service),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> None:
     """Delete event by ID."""
-    logger.debug(f"Deleting event {event_id}")
+    logger.debug("Deleting event %d", event_id, extra={"event_id": event_id})
     try:
         await service.delete_event(event_id)
-        logger.info(f"Deleted event {event_id}")
+        logger.info("Deleted event %d", event_id, extra={"event_id": event_id})
     except Exception as e:
-        logger.error(f"Failed to delete event {event_id}: {str(e)}")
+        logger.error(
+            "Failed to delete event %d: %s", event_id, e, extra={"event_id": event_id}
+        )
         raise
@@ -1,4 +1,14 @@
-from pydantic import BaseModel, ConfigDict, Field, Json
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    Json,
+    field_validator,
+    model_validator,
+)
 
 
 class EventBase(BaseModel):
@@ -14,7 +24,32 @@ class EventBase(BaseModel):
 
 
 class EventCreate(EventBase):
-    """Schema for creating a new event."""
+    """Schema for creating a new event.
+
+    Attributes:
+        dedup_key: Client-chosen key identifying the event across retries
+    """
+
+    dedup_key: str | None = Field(
+        None,
+        min_length=1,
+        max_length=200,
+        description="Events sent again with a key that was already ingested "
+        "are not stored twice; the original event is returned instead",
+    )
+
+
+class EventImport(EventBase):
+    """Schema for a line of a bulk NDJSON upload.
+
+    Unlike regular creation, imported events may carry their original
+    timestamp so that historical data can be backfilled. Other fields, such
+    as ``dedup_key``, are not supported and reject the line.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    createdAt: datetime | None = None
 
 
 class EventUpdate(BaseModel):
@@ -24,7 +59,7 @@ class EventUpdate(BaseModel):
     """
 
     name: str | None = Field(None, min_length=1, max_length=100)
-    powers: str | None = None
+    value: dict | None = None
 
 
 class EventResponse(EventBase):
@@ -35,3 +70,279 @@ class EventResponse(EventBase):
 
     model_config = ConfigDict(from_attributes=True)
     id: int
+    createdAt: datetime | None = None
+
+
+class ValueFilter(BaseModel):
+    """Schema for a condition on a path of the event value.
+
+    Attributes:
+        path: Path segments into the value
+        op: Comparison operator
+        value: JSON value to compare with
+    """
+
+    path: tuple[str, ...]
+    op: Literal["=", "!=", ">", ">=", "<", "<="]
+    value: Any
+
+
+class EventFilter(BaseModel):
+    """Schema for filtering event queries.
+
+    Attributes:
+        name: Exact event name
+        created_from: Inclusive lower bound on createdAt
+        created_to: Exclusive upper bound on createdAt
+        value: Conditions on the event value, combined with AND
+    """
+
+    name: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    value: list[ValueFilter] = []
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        """Match the naive UTC timestamps stored in createdAt."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class EventBulkFilter(BaseModel):
+    """Schema selecting the events changed by a bulk request.
+
+    Conditions are combined with AND. At least one is required, so that a
+    bulk request cannot apply to every event by accident.
+
+    Attributes:
+        name: Exact event name
+        created_from: Inclusive lower bound on createdAt
+        created_to: Exclusive upper bound on createdAt
+        ids: Event IDs
+        id_from: Inclusive lower bound on the ID
+        id_to: Exclusive upper bound on the ID
+        where: Conditions on the event value, e.g. value.region=eu
+    """
+
+    name: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    ids: list[int] | None = Field(None, min_length=1, max_length=10_000)
+    id_from: int | None = None
+    id_to: int | None = None
+    where: list[str] = []
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        """Match the naive UTC timestamps stored in createdAt."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @model_validator(mode="after")
+    def require_condition(self) -> "EventBulkFilter":
+        """Reject filters that would match every event."""
+        conditions = [
+            self.name,
+            self.created_from,
+            self.created_to,
+            self.ids,
+            self.id_from,
+            self.id_to,
+        ]
+        if all(condition is None for condition in conditions) and not self.where:
+            raise ValueError("At least one filter condition is required")
+        return self
+
+
+class EventBulkUpdate(BaseModel):
+    """Schema for a bulk update.
+
+    Attributes:
+        filter: Events to update
+        set: Fields to set on each of them
+    """
+
+    filter: EventBulkFilter
+    set: EventUpdate
+
+
+class EventBulkResponse(BaseModel):
+    """Schema for the outcome of a bulk update or delete.
+
+    Attributes:
+        matched: Events matching the filter, for dry runs
+        affected: Events changed
+        chunks: Transactions the change was committed in
+        dry_run: Whether nothing was changed
+    """
+
+    matched: int | None = None
+    affected: int
+    chunks: int
+    dry_run: bool
+
+
+class EventPage(BaseModel):
+    """Schema for a page of events ordered by (createdAt, id).
+
+    Attributes:
+        items: Events on this page
+        next_cursor: Token for the following page, or None on the last page
+    """
+
+    items: list[EventResponse]
+    next_cursor: str | None
+
+
+class EventAggregateResponse(BaseModel):
+    """Schema for a time-bucketed aggregate series.
+
+    Buckets without matching events are omitted, so ``timestamps`` and
+    ``values`` are parallel arrays of equal length.
+
+    Attributes:
+        bucket: Bucket width as requested, e.g. ``1m``
+        agg: Aggregate function
+        field: Dotted path into the event value, if any
+        timestamps: Start of each bucket
+        values: Aggregate value of each bucket
+        resolution: Rollup resolution the result was read from, or None if
+            it was computed from raw events
+    """
+
+    bucket: str
+    agg: str
+    field: str | None
+    resolution: str | None = None
+    timestamps: list[datetime]
+    values: list[float | None]
+
+
+class EventSeriesResponse(BaseModel):
+    """Schema for a raw numeric series read from event values.
+
+    Attributes:
+        field: Dotted path into the event value
+        timestamps: createdAt of each point
+        values: Value of each point
+        source_points: Number of points before downsampling
+    """
+
+    field: str
+    timestamps: list[datetime]
+    values: list[float]
+    source_points: int
+
+
+class EventBatchError(BaseModel):
+    """Schema for a batch item that could not be created.
+
+    Attributes:
+        index: Position of the item in the submitted batch
+        detail: Validation errors or database error message
+    """
+
+    index: int
+    detail: list[dict[str, Any]] | str
+
+
+class EventBatchResponse(BaseModel):
+    """Schema for batch creation results.
+
+    Created events keep the order of the submitted batch; failed items are
+    reported by their index and do not abort the rest of the batch.
+    """
+
+    created: list[EventResponse]
+    errors: list[EventBatchError]
+
+
+class EventImportError(BaseModel):
+    """Schema for a rejected line of a bulk upload.
+
+    Attributes:
+        line: 1-based line number in the upload
+        detail: Reason the line was rejected
+    """
+
+    line: int
+    detail: list[dict[str, Any]] | str
+
+
+class EventImportResponse(BaseModel):
+    """Schema for bulk upload results.
+
+    Attributes:
+        accepted: Number of events written
+        rejected: Number of lines rejected
+        chunks: Number of COPY chunks written
+        errors: Rejected lines, capped to a fixed number of entries
+        errors_truncated: Whether more lines were rejected than reported
+    """
+
+    accepted: int
+    rejected: int
+    chunks: int
+    errors: list[EventImportError]
+    errors_truncated: bool
+
+
+class IngestBufferStats(BaseModel):
+    """Schema for ingest buffer metrics.
+
+    Flush sizes count the events of each group commit, including those the
+    database rejected; flush durations are in seconds.
+    """
+
+    running: bool
+    queue_depth: int
+    max_queue: int
+    max_batch: int
+    max_delay_ms: float
+    flushes: int
+    flushed_events: int
+    failed_events: int
+    last_flush_size: int
+    avg_flush_size: float
+    last_flush_seconds: float
+    avg_flush_seconds: float
+    max_flush_seconds: float
+
+
+class EventStreamStats(BaseModel):
+    """Schema for live event stream metrics of one worker.
+
+    Received counts notifications, delivered counts messages queued for
+    subscribers.
+    """
+
+    listening: bool
+    subscribers: int
+    max_subscribers: int
+    received: int
+    delivered: int
+    dropped_subscribers: int
+    reconnects: int
+
+
+class EventCacheStats(BaseModel):
+    """Schema for response cache metrics.
+
+    Entries and bytes are only known for the in-process backend.
+    """
+
+    enabled: bool
+    backend: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+    errors: int
+    entries: int | None
+    bytes: int | None
@@ -0,0 +1,76 @@
+import json
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from api.src.events.models import Event
+
+
+class JSONBytesResponse(Response):
+    """Response whose body is already encoded JSON.
+
+    Returning a ``Response`` from a route makes FastAPI skip validating and
+    re-serializing the result against the route's ``response_model``.
+    """
+
+    media_type = "application/json"
+
+
+def event_dict(row: Sequence[Any]) -> dict[str, Any]:
+    """Build the ``EventResponse`` shape from an ``(id, name, value, createdAt)`` row.
+
+    Args:
+        row: Core row or tuple in ``EVENT_COLUMNS`` order
+
+    Returns:
+        dict: Event fields ready for encoding
+    """
+    event_id, name, value, created_at = row
+    return {"id": event_id, "name": name, "value": value, "createdAt": created_at}
+
+
+def event_row(event: Event) -> tuple:
+    """Read an ORM event as an ``EVENT_COLUMNS`` tuple."""
+    return event.id, event.name, event.value, event.createdAt
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload of dicts, lists, scalars and datetimes as JSON.
+
+    Falls back to the standard library for integers outside the 64-bit range,
+    which JSONB values may hold but orjson refuses.
+    """
+    try:
+        return orjson.dumps(payload)
+    except orjson.JSONEncodeError:
+        return json.dumps(payload, default=datetime.isoformat).encode()
+
+
+def dumps_page(rows: Iterable[Sequence[Any]], next_cursor: str | None) -> bytes:
+    """Encode rows as an ``EventPage`` body.
+
+    Args:
+        rows: Rows in ``EVENT_COLUMNS`` order
+        next_cursor: Cursor for the following page
+
+    Returns:
+        bytes: JSON document
+    """
+    return dumps(
+        {"items": [event_dict(row) for row in rows], "next_cursor": next_cursor}
+    )
+
+
+def dumps_lines(rows: Iterable[Sequence[Any]]) -> bytes:
+    """Encode rows as newline-delimited JSON.
+
+    Args:
+        rows: Rows in ``EVENT_COLUMNS`` order
+
+    Returns:
+        bytes: One JSON document per row, each followed by a newline
+    """
+    return b"".join(dumps(event_dict(row)) + b"\n" for row in rows)
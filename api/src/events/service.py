@@ -1,25 +1,214 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Sequence
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Literal
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import Row
+
+from api.core.config import settings
+from api.core.exceptions import BadRequestException
+from api.core.logging import get_logger
+from api.core.response_cache import CachedResponse
+from api.src.events import columnar
+from api.src.events.aggregation import Aggregate, parse_bucket, parse_path
+from api.src.events.cache import ALL_EVENTS, SINGLE_EVENTS, event_cache, event_tag
+from api.src.events.downsampling import Method, downsample
+from api.src.events.pagination import decode_cursor, encode_cursor
 from api.src.events.repository import EventRepository
-from api.src.events.schemas import EventCreate, EventResponse, EventUpdate
+from api.src.events.rollups import COUNT_FIELD, choose_resolution
+from api.src.events.schemas import (
+    EventAggregateResponse,
+    EventBatchError,
+    EventBatchResponse,
+    EventBulkFilter,
+    EventBulkResponse,
+    EventBulkUpdate,
+    EventCreate,
+    EventFilter,
+    EventImport,
+    EventImportError,
+    EventImportResponse,
+    EventPage,
+    EventResponse,
+    EventSeriesResponse,
+    EventUpdate,
+)
+from api.src.events.serialization import (
+    dumps,
+    dumps_lines,
+    dumps_page,
+    event_dict,
+    event_row,
+)
+
+if TYPE_CHECKING:
+    from api.src.events.buffer import IngestBuffer
+
+logger = get_logger(__name__)
 
 
 class EventService:
     """Service layer for event operations."""
 
-    def __init__(self, repository: EventRepository):
+    def __init__(
+        self, repository: EventRepository, buffer: "IngestBuffer | None" = None
+    ):
         self.repository = repository
+        self.buffer = buffer
 
-    async def create_event(self, event_data: EventCreate) -> EventResponse:
+    async def create_event(
+        self,
+        event_data: EventCreate,
+        ack: Literal["durable", "enqueue"] | None = None,
+    ) -> EventResponse | None:
         """Create a new event.
 
+        When an ingest buffer is configured the event is group-committed with
+        events from concurrent requests instead of in its own transaction.
+
         Args:
             event_data: Event creation data
+            ack: Acknowledge after the buffered event is committed ("durable")
+                or as soon as it is queued ("enqueue")
 
         Returns:
-            EventResponse: Created event data
+            EventResponse | None: Created event data, or None if the event was
+                only queued
         """
-        event = await self.repository.create(event_data)
+        if self.buffer is None:
+            event = await self.repository.create(event_data)
+            return EventResponse.model_validate(event)
+
+        ack = ack or settings.EVENT_BUFFER_DEFAULT_ACK
+        event = await self.buffer.submit(event_data, wait=ack == "durable")
+        if event is None:
+            return None
         return EventResponse.model_validate(event)
 
+    async def create_events(self, items: list[dict[str, Any]]) -> EventBatchResponse:
+        """Create a batch of events.
+
+        Items are validated individually so that one invalid item does not
+        reject the whole batch.
+
+        Args:
+            items: Raw event payloads
+
+        Returns:
+            EventBatchResponse: Created events and per-item errors
+        """
+        indexes: list[int] = []
+        valid: list[EventCreate] = []
+        errors: list[EventBatchError] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append(EventCreate.model_validate(item))
+                indexes.append(index)
+            except ValidationError as e:
+                errors.append(
+                    EventBatchError(
+                        index=index,
+                        detail=e.errors(include_url=False, include_context=False),
+                    )
+                )
+
+        created, failed = await self.repository.create_many(valid)
+        errors.extend(
+            EventBatchError(index=indexes[position], detail=error.detail)
+            for position, error in failed
+        )
+        errors.sort(key=lambda error: error.index)
+        return EventBatchResponse(
+            created=[EventResponse.model_validate(event) for _, event in created],
+            errors=errors,
+        )
+
+    async def import_events(
+        self, lines: AsyncIterable[bytes | None]
+    ) -> EventImportResponse:
+        """Import newline-delimited JSON events in bounded chunks.
+
+        Each line is validated as an ``EventImport``; valid rows are buffered
+        and written with ``COPY`` whenever a chunk fills up, so memory use does
+        not depend on the size of the upload. Lines the database rejects are
+        reported like invalid ones; the rest of their chunk is still written.
+
+        Args:
+            lines: NDJSON lines, ``None`` marking a line that was too long
+
+        Returns:
+            EventImportResponse: Row counts and rejected lines
+        """
+        chunk_size = settings.EVENT_UPLOAD_CHUNK_SIZE
+        max_errors = settings.EVENT_UPLOAD_MAX_REPORTED_ERRORS
+        rows: list[tuple[str, dict | None, datetime]] = []
+        numbers: list[int] = []
+        errors: list[EventImportError] = []
+        accepted = rejected = chunks = 0
+
+        def reject(number: int, detail: list[dict[str, Any]] | str) -> None:
+            nonlocal rejected
+            rejected += 1
+            if len(errors) < max_errors:
+                errors.append(EventImportError(line=number, detail=detail))
+
+        async def flush() -> None:
+            nonlocal accepted, chunks
+            failed = await self.repository.copy_rows(rows)
+            for position, error in failed:
+                reject(numbers[position], error.detail)
+            accepted += len(rows) - len(failed)
+            chunks += 1
+            rows.clear()
+            numbers.clear()
+            logger.debug(
+                "Imported chunk %d, %d events so far",
+                chunks,
+                accepted,
+                extra={"chunk": chunks, "accepted": accepted},
+            )
+
+        number = 0
+        async for line in lines:
+            number += 1
+            if line is not None and not line.strip():
+                continue
+            try:
+                if line is None:
+                    raise ValueError("Line exceeds maximum length")
+                event = EventImport.model_validate_json(line)
+            except (ValueError, ValidationError) as e:
+                reject(
+                    number,
+                    (
+                        e.errors(include_url=False, include_context=False)
+                        if isinstance(e, ValidationError)
+                        else str(e)
+                    ),
+                )
+                continue
+
+            rows.append((event.name, event.value, _naive_utc(event.createdAt)))
+            numbers.append(number)
+            if len(rows) >= chunk_size:
+                await flush()
+
+        if rows:
+            await flush()
+
+        errors.sort(key=lambda error: error.line)
+        return EventImportResponse(
+            accepted=accepted,
+            rejected=rejected,
+            chunks=chunks,
+            errors=errors,
+            errors_truncated=rejected > len(errors),
+        )
+
     async def get_event(self, event_id: int) -> EventResponse:
         """Get event by ID.
 
@@ -32,16 +221,273 @@ class EventService:
         event = await self.repository.get_by_id(event_id)
         return EventResponse.model_validate(event)
 
-    async def get_all_events(self) -> list[EventResponse]:
-        """Get all events.
+    async def get_event_json(self, event_id: int) -> bytes:
+        """Get event by ID as an encoded ``EventResponse``.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            bytes: JSON document
+        """
+        event = await self.repository.get_by_id(event_id)
+        return dumps(event_dict(event_row(event)))
+
+    async def get_event_cached(self, event_id: int) -> CachedResponse:
+        """Get event by ID as an encoded ``EventResponse`` through the cache.
+
+        Args:
+            event_id: Event ID
+
+        Returns:
+            CachedResponse: JSON document and its ETag
+        """
+        tag = event_tag(event_id)
+        return await event_cache.get_or_set(
+            tag,
+            (tag, SINGLE_EVENTS),
+            lambda: self._from_primary(self.get_event_json(event_id)),
+        )
+
+    async def get_events_page(
+        self, filters: EventFilter, limit: int, cursor: str | None = None
+    ) -> EventPage:
+        """Get a page of events.
+
+        Args:
+            filters: Event filters
+            limit: Maximum number of events
+            cursor: Token returned as ``next_cursor`` by the previous page
+
+        Returns:
+            EventPage: Events and the cursor for the next page
+        """
+        rows, next_cursor = await self._fetch_page(filters, limit, cursor)
+        return EventPage(
+            items=[EventResponse.model_validate(row) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    async def get_events_page_json(
+        self, filters: EventFilter, limit: int, cursor: str | None = None
+    ) -> bytes:
+        """Get a page of events as an encoded ``EventPage``.
+
+        Rows go straight from the database to JSON, without building ORM
+        objects or response models.
+
+        Args:
+            filters: Event filters
+            limit: Maximum number of events
+            cursor: Token returned as ``next_cursor`` by the previous page
+
+        Returns:
+            bytes: JSON document
+        """
+        rows, next_cursor = await self._fetch_page(filters, limit, cursor)
+        return dumps_page(rows, next_cursor)
+
+    async def get_events_page_cached(
+        self, filters: EventFilter, limit: int, cursor: str | None = None
+    ) -> CachedResponse:
+        """Get a page of events as an encoded ``EventPage`` through the cache.
+
+        Args:
+            filters: Event filters
+            limit: Maximum number of events
+            cursor: Token returned as ``next_cursor`` by the previous page
+
+        Returns:
+            CachedResponse: JSON document and its ETag
+        """
+        key = f"page:{limit}:{cursor}:{filters.model_dump_json()}"
+        return await event_cache.get_or_set(
+            key,
+            (ALL_EVENTS,),
+            lambda: self._from_primary(
+                self.get_events_page_json(filters, limit, cursor)
+            ),
+        )
+
+    async def _from_primary(self, read: Awaitable[bytes]) -> bytes:
+        """Run a read for the cache on the primary.
+
+        A response read from a lagging replica would otherwise stay cached
+        after the replica caught up.
+        """
+        self.repository.session.info["primary"] = True
+        return await read
+
+    async def _fetch_page(
+        self, filters: EventFilter, limit: int, cursor: str | None
+    ) -> tuple[Sequence[Row], str | None]:
+        """Read one page of rows and the cursor following it."""
+        after = decode_cursor(cursor) if cursor else None
+        rows = await self.repository.get_page(filters, limit + 1, after)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].createdAt, rows[-1].id)
+        return rows, next_cursor
+
+    async def aggregate_events(
+        self,
+        filters: EventFilter,
+        bucket: str,
+        agg: Aggregate,
+        field: str | None,
+        points: int | None = None,
+        method: Method = "lttb",
+    ) -> EventAggregateResponse:
+        """Aggregate events into time buckets.
+
+        Args:
+            filters: Event filters; the createdAt range is required
+            bucket: Bucket width, e.g. ``1m``
+            agg: Aggregate function
+            field: Dotted numeric path in the event value
+            points: Downsample the buckets to at most this many points
+            method: Downsampling method
+
+        Returns:
+            EventAggregateResponse: Bucket timestamps and values
+
+        Raises:
+            BadRequestException: If the range, bucket or field is invalid
+        """
+        if filters.created_from is None or filters.created_to is None:
+            raise BadRequestException("Both from and to are required")
+        if filters.created_to <= filters.created_from:
+            raise BadRequestException("from must be before to")
+        width = parse_bucket(bucket)
+        if (
+            filters.created_to - filters.created_from
+        ) / width > settings.EVENT_AGGREGATE_MAX_BUCKETS:
+            raise BadRequestException("Too many buckets, use a wider bucket")
+        if field is None and agg != "count":
+            raise BadRequestException(f"field is required for {agg}")
+        path = parse_path(field) if field else None
+
+        resolution = None
+        if (
+            settings.EVENT_ROLLUPS_ENABLED
+            and not filters.value
+            and (field is None or field in settings.EVENT_ROLLUP_FIELDS)
+        ):
+            resolution = choose_resolution(
+                width, filters.created_from, filters.created_to
+            )
+        if resolution is not None:
+            rows = await self.repository.aggregate_rollup(
+                filters, width, agg, field or COUNT_FIELD, resolution
+            )
+        else:
+            rows = await self.repository.aggregate(filters, width, agg, path)
+
+        timestamps = [start for start, _ in rows]
+        values = [value for _, value in rows]
+        if points is not None:
+            timestamps, values = await run_in_threadpool(
+                downsample, timestamps, values, points, method
+            )
+        return EventAggregateResponse(
+            bucket=bucket,
+            agg=agg,
+            field=field,
+            resolution=resolution,
+            timestamps=timestamps,
+            values=values,
+        )
+
+    async def get_series(
+        self,
+        filters: EventFilter,
+        field: str,
+        points: int | None = None,
+        method: Method = "lttb",
+    ) -> EventSeriesResponse:
+        """Get the raw numeric series at a path of the event values.
+
+        Args:
+            filters: Event filters
+            field: Dotted numeric path in the event value
+            points: Downsample the series to at most this many points
+            method: Downsampling method
 
         Returns:
-            List[EventResponse]: List of all events
+            EventSeriesResponse: Series points
+
+        Raises:
+            BadRequestException: If the series has too many points
+        """
+        limit = settings.EVENT_SERIES_MAX_POINTS
+        timestamps, values = await self.repository.series(
+            filters, parse_path(field), limit + 1
+        )
+        if len(timestamps) > limit:
+            raise BadRequestException(
+                "Series too large, narrow the range or use /events/aggregate"
+            )
+        source_points = len(timestamps)
+        if points is not None:
+            timestamps, values = await run_in_threadpool(
+                downsample, timestamps, values, points, method
+            )
+        return EventSeriesResponse(
+            field=field,
+            timestamps=timestamps,
+            values=values,
+            source_points=source_points,
+        )
+
+    async def export_events(
+        self,
+        filters: EventFilter,
+        fmt: Literal["ndjson", "csv", "arrow", "parquet"],
+        fields: Sequence[str] = (),
+    ) -> AsyncIterator[bytes]:
+        """Serialize matching events as they are read from the database.
+
+        Args:
+            filters: Event filters
+            fmt: Output format
+            fields: Numeric paths of the value exported as columns, for the
+                arrow and parquet formats
+
+        Yields:
+            bytes: Encoded chunk of rows
         """
-        events = await self.repository.get_all()
-        return [EventResponse.model_validate(event) for event in events]
+        if fmt in columnar.MEDIA_TYPES:
+            batches = self.repository.stream_rows(
+                filters, settings.EVENT_EXPORT_BATCH_SIZE, columnar.columns(fields)
+            )
+            async for chunk in columnar.encode(batches, fields, fmt):
+                yield chunk
+            return
 
-    async def update_event(self, event_id: int, event_data: EventUpdate) -> EventResponse:
+        batches = self.repository.stream_rows(filters, settings.EVENT_EXPORT_BATCH_SIZE)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["id", "name", "value", "createdAt"])
+            async for rows in batches:
+                writer.writerows(
+                    (event_id, name, json.dumps(value), created_at.isoformat())
+                    for event_id, name, value, created_at in rows
+                )
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+            return
+
+        async for rows in batches:
+            yield dumps_lines(rows)
+
+    async def update_event(
+        self, event_id: int, event_data: EventUpdate
+    ) -> EventResponse:
         """Update event by ID.
 
         Args:
@@ -61,3 +507,59 @@ class EventService:
             event_id: Event ID
         """
         await self.repository.delete(event_id)
+
+    async def bulk_update(
+        self, request: EventBulkUpdate, dry_run: bool = False
+    ) -> EventBulkResponse:
+        """Update all events matching a filter.
+
+        Args:
+            request: Filter and fields to set
+            dry_run: Only count the matching events
+
+        Returns:
+            EventBulkResponse: Counts of matched or updated events
+
+        Raises:
+            BadRequestException: If no fields are set
+        """
+        if not request.set.model_fields_set:
+            raise BadRequestException("No fields to update")
+        if dry_run:
+            return await self._dry_run(request.filter)
+        affected, chunks = await self.repository.update_where(
+            request.filter, request.set, settings.EVENT_BULK_CHUNK_SIZE
+        )
+        return EventBulkResponse(affected=affected, chunks=chunks, dry_run=False)
+
+    async def bulk_delete(
+        self, filters: EventBulkFilter, dry_run: bool = False
+    ) -> EventBulkResponse:
+        """Delete all events matching a filter.
+
+        Args:
+            filters: Events to delete
+            dry_run: Only count the matching events
+
+        Returns:
+            EventBulkResponse: Counts of matched or deleted events
+        """
+        if dry_run:
+            return await self._dry_run(filters)
+        affected, chunks = await self.repository.delete_where(
+            filters, settings.EVENT_BULK_CHUNK_SIZE
+        )
+        return EventBulkResponse(affected=affected, chunks=chunks, dry_run=False)
+
+    async def _dry_run(self, filters: EventBulkFilter) -> EventBulkResponse:
+        matched = await self.repository.count_where(filters)
+        return EventBulkResponse(matched=matched, affected=0, chunks=0, dry_run=True)
+
+
+def _naive_utc(value: datetime | None) -> datetime:
+    """Normalize a timestamp to naive UTC, defaulting to now."""
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -1,9 +1,9 @@
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.exceptions import AlreadyExistsException, NotFoundException
 from api.core.logging import get_logger
-from api.core.security import get_password_hash
+from api.core.security import invalidate_principal, password_hasher
 from api.src.users.models import User
 from api.src.users.schemas import UserCreate
 
@@ -16,6 +16,17 @@ class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    def invalidate(self, user_id: int) -> None:
+        """Drop cached authentication state for a user.
+
+        Every method that changes or removes a user row must call this once
+        the change is committed, so the next request re-reads the user.
+
+        Args:
+            user_id: User ID
+        """
+        invalidate_principal(user_id)
+
     async def create(self, user_data: UserCreate) -> User:
         """Create a new user.
 
@@ -35,13 +46,15 @@ class UserRepository:
 
         # Create user
         user = User(
-            email=user_data.email, hashed_password=get_password_hash(user_data.password)
+            email=user_data.email,
+            hashed_password=await password_hasher.hash(user_data.password),
         )
         self.session.add(user)
         await self.session.commit()
         await self.session.refresh(user)
+        self.invalidate(user.id)
 
-        logger.info(f"Created user: {user.email}")
+        logger.info("Created user: %s", user.email)
         return user
 
     async def get_by_id(self, user_id: int) -> User:
@@ -57,8 +70,7 @@ class UserRepository:
             NotFoundException: If user not found
         """
         query = select(User).where(User.id == user_id)
-        result = await self.session.execute(query)
-        user = result.scalar_one_or_none()
+        user = await self._read(query)
 
         if not user:
             raise NotFoundException("User not found")
@@ -75,5 +87,21 @@ class UserRepository:
             Optional[User]: Found user or None if not found
         """
         query = select(User).where(User.email == email)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        return await self._read(query)
+
+    async def _read(self, query: Select) -> User | None:
+        """Look a user up on a replica, falling back to the primary.
+
+        Args:
+            query: Query for at most one user
+
+        Returns:
+            Optional[User]: Found user or None if not found
+        """
+        result = await self.session.execute(query.execution_options(replica=True))
+        user = result.scalar_one_or_none()
+        if user is None and "replica" in self.session.info:
+            # The replica may not have replayed a very recent insert yet
+            result = await self.session.execute(query)
+            user = result.scalar_one_or_none()
+        return user
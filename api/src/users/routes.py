@@ -6,9 +6,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.core.database import get_session
 from api.core.logging import get_logger
-from api.core.security import get_current_user
-from api.src.users.models import User
-from api.src.users.schemas import LoginData, Token, UserCreate, UserResponse
+from api.core.security import Principal, get_current_user, password_hasher
+from api.src.users.schemas import (
+    LoginData,
+    PasswordHashingStats,
+    Token,
+    UserCreate,
+    UserResponse,
+)
 from api.src.users.service import UserService
 
 logger = get_logger(__name__)
@@ -23,7 +28,7 @@ async def register(
     user_data: UserCreate, session: AsyncSession = Depends(get_session)
 ) -> UserResponse:
     """Register a new user."""
-    logger.debug(f"Registering user: {user_data.email}")
+    logger.debug("Registering user: %s", user_data.email)
     return await UserService(session).create_user(user_data)
 
 
@@ -34,11 +39,19 @@ async def login(
 ) -> Token:
     """Authenticate user and return token."""
     login_data = LoginData(email=form_data.username, password=form_data.password)
-    logger.debug(f"Login attempt: {login_data.email}")
+    logger.debug("Login attempt: %s", login_data.email)
     return await UserService(session).authenticate(login_data)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(user: User = Depends(get_current_user)) -> UserResponse:
+async def get_me(user: Principal = Depends(get_current_user)) -> UserResponse:
     """Get current authenticated user."""
     return user
+
+
+@router.get("/hashing/stats", response_model=PasswordHashingStats)
+async def get_hashing_stats(
+    user: Principal = Depends(get_current_user),
+) -> PasswordHashingStats:
+    """Get password hashing pool saturation and latency metrics."""
+    return password_hasher.stats()
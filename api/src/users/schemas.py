@@ -32,3 +32,21 @@ class LoginData(BaseModel):
 
     email: EmailStr
     password: str
+
+
+class PasswordHashingStats(BaseModel):
+    """Schema for password hashing pool metrics.
+
+    Durations are in seconds; wait is the time spent queued for a worker.
+    """
+
+    workers: int
+    max_queue: int
+    in_flight: int
+    queued: int
+    completed: int
+    rejected: int
+    avg_hash_seconds: float
+    max_hash_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
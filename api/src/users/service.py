@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from api.core.config import settings
 from api.core.exceptions import UnauthorizedException
 from api.core.logging import get_logger
-from api.core.security import create_access_token, verify_password
+from api.core.security import create_access_token, password_hasher
 from api.src.users.models import User
 from api.src.users.repository import UserRepository
 from api.src.users.schemas import LoginData, Token, UserCreate
@@ -30,18 +30,18 @@ class UserService:
         user = await self.repository.get_by_email(login_data.email)
 
         # Verify credentials
-        if not user or not verify_password(
+        if not user or not await password_hasher.verify(
             login_data.password, str(user.hashed_password)
         ):
             raise UnauthorizedException(detail="Incorrect email or password")
 
         # Create access token
         access_token = create_access_token(
-            data={"sub": str(user.id)},
+            data={"sub": str(user.id), "email": user.email},
             expires_delta=timedelta(minutes=settings.JWT_EXPIRATION),
         )
 
-        logger.info(f"User authenticated: {user.email}")
+        logger.info("User authenticated: %s", user.email)
         return Token(access_token=access_token)
 
     async def get_user(self, user_id: int) -> User:
@@ -0,0 +1,94 @@
+import asyncio
+import re
+import sys
+
+from sqlalchemy import Index
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.sql.elements import Grouping
+
+from api.core.config import settings
+from api.core.database import engine
+from api.core.logging import get_logger
+from api.src.events.aggregation import numeric_value, parse_path
+from api.src.events.models import Event
+from api.src.events.partitions import list_partitions
+
+logger = get_logger(__name__)
+
+
+def hot_path_index(field: str) -> Index:
+    """Expression index for comparisons on a numeric path of the event value.
+
+    Args:
+        field: Dotted path into the event value
+
+    Returns:
+        Index: Index on the same expression that value filters compile to
+    """
+    suffix = re.sub(r"\W+", "_", field).strip("_").lower()
+    return Index(
+        f"ix_events_value_{suffix}"[:63],
+        # PostgreSQL only accepts bare function calls without parentheses
+        Grouping(numeric_value(parse_path(field))),
+        _table=Event.__table__,
+    )
+
+
+async def create_hot_path_indexes() -> list[str]:
+    """Create missing expression indexes for ``EVENT_VALUE_INDEXED_PATHS``.
+
+    Indexes cannot be built concurrently on a partitioned table, so each is
+    created on the parent alone, built concurrently on every partition and
+    attached; the parent's index is valid once all partitions have theirs.
+    Partitions created later get the index automatically.
+
+    Returns:
+        list: Names of the indexes now in place
+    """
+    names = []
+    autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    async with autocommit_engine.connect() as connection:
+        partitions = await list_partitions(connection)
+        for field in settings.EVENT_VALUE_INDEXED_PATHS:
+            index = hot_path_index(field)
+            ddl = CreateIndex(index, if_not_exists=True).compile(
+                dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+            )
+            head, expression = str(ddl).split(f" ON {Event.__tablename__} ", 1)
+            await connection.exec_driver_sql(
+                f"{head} ON ONLY {Event.__tablename__} {expression}"
+            )
+            for partition in partitions:
+                child = f"{partition.name}_{index.name.removeprefix('ix_events_')}"
+                child = child[:63]
+                await connection.exec_driver_sql(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{child}" '
+                    f'ON "{partition.name}" {expression}'
+                )
+                await connection.exec_driver_sql(
+                    f'ALTER INDEX "{index.name}" ATTACH PARTITION "{child}"'
+                )
+            logger.info(
+                "Index %s on value.%s is in place",
+                index.name,
+                field,
+                extra={"index": index.name, "field": field},
+            )
+            names.append(index.name)
+    return names
+
+
+async def main() -> int:
+    """Command line entry point.
+
+    Usage:
+        python -m api.utils.indexes
+    """
+    names = await create_hot_path_indexes()
+    await engine.dispose()
+    print(f"{len(names)} value indexes in place: {', '.join(names)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
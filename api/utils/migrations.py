@@ -1,39 +1,75 @@
-import os
-import subprocess
-import sys
+import asyncio
+from pathlib import Path
 
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from api.core.config import settings
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Key of the Postgres advisory lock held while migrating, so that only one of
+# several starting workers runs the upgrade
+MIGRATION_LOCK_ID = 0x65766E746D696772
+
+
+def alembic_config() -> Config:
+    """Alembic configuration that works from any working directory."""
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    return config
+
+
+def _current_heads(connection: Connection) -> set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
 
-def run_migrations():
-    """
-    Runs Alembic database migrations using sys.executable and module execution.
 
-    This method is more compatible with environments like Vercel where direct
-    command execution might be restricted.
+def _upgrade(connection: Connection, config: Config, revision: str = "head") -> None:
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
+
+async def migrate(url: str = settings.DATABASE_URL) -> str:
+    """Upgrade the database to the latest revision in-process.
+
+    The common case, a database already at head, costs one query against
+    ``alembic_version``. Otherwise the upgrade runs under an advisory lock;
+    workers that lose the race wait for it and then find nothing to do.
+
+    Args:
+        url: Database URL
+
+    Returns:
+        str: What was done, for the startup report
     """
+    config = alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    engine = create_async_engine(url, poolclass=NullPool)
     try:
-        # Ensure the current directory is in the Python path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        sys.path.insert(0, current_dir)
-
-        # Use sys.executable to run the Alembic module
-        result = subprocess.run(
-            [sys.executable, "-m", "alembic", "upgrade", "head"],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-
-        # Print the output if there's any
-        if result.stdout:
-            print("Migration output:", result.stdout)
-
-        print("Migrations completed successfully!")
-
-    except subprocess.CalledProcessError as e:
-        print(f"Migration failed. Error: {e}")
-        print("Standard output:", e.stdout)
-        print("Standard error:", e.stderr)
-        raise
-    except Exception as e:
-        print(f"An error occurred while running migrations: {e}")
-        raise
+        async with engine.connect() as connection:
+            current = await connection.run_sync(_current_heads)
+            if current == heads:
+                return "up to date"
+
+            await connection.execute(
+                text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+            current = await connection.run_sync(_current_heads)
+            if current == heads:
+                await connection.rollback()
+                return "upgraded by another worker"
+            await connection.run_sync(_upgrade, config)
+            await connection.commit()
+            previous = ", ".join(sorted(current)) or "empty database"
+            return f"upgraded from {previous} to {', '.join(sorted(heads))}"
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    print(f"Migrations: {asyncio.run(migrate())}")
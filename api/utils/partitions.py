@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import sys
+
+from api.core.database import engine
+from api.src.events.partitions import list_partitions, partition_maintainer
+
+
+async def maintain() -> int:
+    """Create upcoming partitions and drop expired ones now."""
+    report = await partition_maintainer.maintain()
+    await engine.dispose()
+    if report.skipped:
+        print("Maintenance is already running in another process")
+        return 1
+    print(f"Created {len(report.created)} partitions: {', '.join(report.created)}")
+    print(f"Dropped {len(report.dropped)} partitions: {', '.join(report.dropped)}")
+    print(f"Deleted {report.expired} expired rows from the default partition")
+    if report.pending:
+        print(
+            f"{len(report.pending)} periods still have rows in the default "
+            "partition; run the backfill command to move them"
+        )
+    return 0
+
+
+async def backfill(batch_size: int) -> int:
+    """Move rows out of the default partition into partitions of their own."""
+    partition_maintainer.batch_size = batch_size
+    report = await partition_maintainer.backfill()
+    await engine.dispose()
+    if report.skipped:
+        print("Maintenance is already running in another process")
+        return 1
+    print(f"Created {len(report.created)} partitions: {', '.join(report.created)}")
+    print(f"Moved {report.moved} rows out of the default partition")
+    return 0
+
+
+async def show() -> int:
+    """List the partitions of the events table."""
+    async with engine.connect() as connection:
+        partitions = await list_partitions(connection)
+    await engine.dispose()
+    for partition in partitions:
+        if partition.start is None:
+            print(f"{partition.name}: default")
+        else:
+            print(
+                f"{partition.name}: "
+                f"{partition.start.isoformat()} to {partition.end.isoformat()}"
+            )
+    return 0
+
+
+def main() -> int:
+    """Command line entry point.
+
+    Usage:
+        python -m api.utils.partitions maintain
+        python -m api.utils.partitions backfill [--batch-size 10000]
+        python -m api.utils.partitions list
+    """
+    parser = argparse.ArgumentParser(description="Maintain event partitions")
+    parser.add_argument("command", choices=["maintain", "backfill", "list"])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=partition_maintainer.batch_size,
+        help="Rows copied per transaction by backfill",
+    )
+    args = parser.parse_args()
+    if args.command == "maintain":
+        return asyncio.run(maintain())
+    if args.command == "backfill":
+        return asyncio.run(backfill(args.batch_size))
+    return asyncio.run(show())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+
+from api.core.database import async_session
+from api.src.events import rollups
+
+
+async def rebuild(start: datetime, end: datetime, name: str | None) -> None:
+    """Rebuild rollups from raw events."""
+    async with async_session() as session:
+        days = await rollups.rebuild(session, start, end, name)
+    print(f"Rebuilt rollups for {days} days")
+
+
+async def check(start: datetime, end: datetime, name: str | None) -> int:
+    """Report rollups that disagree with raw events."""
+    async with async_session() as session:
+        mismatches = await rollups.check(session, start, end, name)
+    for mismatch in mismatches:
+        print(
+            f"{mismatch.resolution} {mismatch.name!r} {mismatch.field!r} "
+            f"{mismatch.bucket.isoformat()}: "
+            f"expected {mismatch.expected}, found {mismatch.actual}"
+        )
+    print(f"{len(mismatches)} inconsistent rollup buckets")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    """Command line entry point.
+
+    Usage:
+        python -m api.utils.rollups rebuild --from 2024-01-01 --to 2024-02-01
+        python -m api.utils.rollups check --from 2024-01-01 --to 2024-02-01
+    """
+    parser = argparse.ArgumentParser(description="Maintain event rollup tables")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat)
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat)
+    parser.add_argument("--name", help="Only process events with this name")
+    args = parser.parse_args()
+    if args.start is None or args.end is None:
+        parser.error("--from and --to are required")
+
+    if args.command == "rebuild":
+        asyncio.run(rebuild(args.start, args.end, args.name))
+        return 0
+    return asyncio.run(check(args.start, args.end, args.name))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
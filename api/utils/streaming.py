@@ -0,0 +1,44 @@
+from collections.abc import AsyncIterable, AsyncIterator
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int
+) -> AsyncIterator[bytes | None]:
+    """Split a byte stream into lines without buffering the whole stream.
+
+    Args:
+        chunks: Incoming byte chunks, e.g. ``Request.stream()``
+        max_line_bytes: Longest line that will be buffered
+
+    Yields:
+        bytes | None: Each line without its terminator, or ``None`` in place of
+            a line longer than ``max_line_bytes``, which is skipped
+    """
+    buffer = bytearray()
+    skipping = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                break
+            if skipping:
+                skipping = False
+            elif len(buffer) + end - start > max_line_bytes:
+                yield None
+            else:
+                buffer += chunk[start:end]
+                yield bytes(buffer)
+            buffer.clear()
+            start = end + 1
+
+        if skipping:
+            continue
+        buffer += chunk[start:]
+        if len(buffer) > max_line_bytes:
+            buffer.clear()
+            skipping = True
+            yield None
+
+    if buffer:
+        yield bytes(buffer)
@@ -0,0 +1,155 @@
+"""Rows per second served by ``GET /events/`` in each serialization mode.
+
+Drives the real app in-process over ASGI against ``DATABASE_URL``, which
+should point at a disposable database; the benchmark seeds and removes its
+own events. Authentication is bypassed so that only the listing is measured.
+
+Usage:
+    python -m benchmarks.serialization --rows 1000 --pages 50
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.core.config import settings
+from api.core.database import async_session, get_session
+from api.core.security import Principal, get_current_user
+from api.main import app
+from api.src.events.models import Event, EventRollupDirty
+from api.src.events.repository import EventRepository, filter_clauses
+from api.src.events.routes import get_event_service
+from api.src.events.schemas import EventFilter
+from api.src.events.serialization import dumps
+from api.src.events.service import EventService
+
+
+class OrmEventRepository(EventRepository):
+    """Loads listing pages as ORM objects, as the listing did originally."""
+
+    async def get_page(
+        self,
+        filters: EventFilter,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Event]:
+        query = select(Event).where(*filter_clauses(filters))
+        if after is not None:
+            query = query.where(tuple_(Event.createdAt, Event.id) > tuple_(*after))
+        query = query.order_by(Event.createdAt, Event.id).limit(limit)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+
+# name: (repository class, EVENT_FAST_JSON)
+MODES = {
+    "orm + response_model": (OrmEventRepository, False),
+    "rows + response_model": (EventRepository, False),
+    "rows + orjson": (EventRepository, True),
+}
+
+
+async def seed(name: str, count: int) -> None:
+    """Insert ``count`` events named ``name``."""
+    start = datetime.utcnow() - timedelta(days=1)
+    rows = [
+        (
+            name,
+            dumps(
+                {
+                    "region": "eu" if n % 3 else "us",
+                    "latency": n * 0.37,
+                    "ok": n % 7 != 0,
+                    "tags": ["web", f"host-{n % 16}"],
+                }
+            ).decode(),
+            start + timedelta(milliseconds=n),
+        )
+        for n in range(count)
+    ]
+    async with async_session() as session:
+        await EventRepository(session).copy_rows(rows)
+
+
+async def cleanup(name: str) -> None:
+    """Remove the seeded events."""
+    async with async_session() as session:
+        await session.execute(delete(Event).where(Event.name == name))
+        await session.execute(
+            delete(EventRollupDirty).where(EventRollupDirty.name == name)
+        )
+        await session.commit()
+
+
+def service_factory(repository_class: type[EventRepository]):
+    """Build a ``get_event_service`` override using ``repository_class``."""
+
+    def get_service(session: AsyncSession = Depends(get_session)) -> EventService:
+        return EventService(repository_class(session))
+
+    return get_service
+
+
+async def measure(
+    client: httpx.AsyncClient, name: str, rows: int, pages: int
+) -> list[float]:
+    """Time ``pages`` identical listing requests, after a short warm-up."""
+    params = {"name": name, "limit": rows}
+    for _ in range(3):
+        (await client.get("/events/", params=params)).raise_for_status()
+    durations = []
+    for _ in range(pages):
+        started = time.perf_counter()
+        response = await client.get("/events/", params=params)
+        durations.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return durations
+
+
+async def main(rows: int, pages: int) -> None:
+    logging.disable(logging.INFO)
+    name = f"bench-{uuid.uuid4().hex[:8]}"
+    await seed(name, rows)
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=0, email="")
+    fast_json = settings.EVENT_FAST_JSON
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            print(f"{rows} rows per page, {pages} pages per mode")
+            baseline = None
+            for mode, (repository_class, fast) in MODES.items():
+                app.dependency_overrides[get_event_service] = service_factory(
+                    repository_class
+                )
+                settings.EVENT_FAST_JSON = fast
+                durations = await measure(client, name, rows, pages)
+                rate = rows * pages / sum(durations)
+                baseline = baseline or rate
+                print(
+                    f"{mode:<24}{rate:>12,.0f} rows/s"
+                    f"{statistics.median(durations) * 1000:>10.2f} ms p50"
+                    f"{rate / baseline:>8.2f}x"
+                )
+    finally:
+        settings.EVENT_FAST_JSON = fast_json
+        app.dependency_overrides.clear()
+        await cleanup(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000, help="Events per page")
+    parser.add_argument("--pages", type=int, default=50, help="Requests per mode")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.pages))
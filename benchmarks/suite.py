@@ -0,0 +1,550 @@
+"""Throughput, latency percentiles and allocations of the main API paths.
+
+Drives the real app, in-process over ASGI or through a local uvicorn, with
+concurrent clients. Every scenario reports requests per second, p50/p95/p99
+latency and, in-process, the memory allocated per request. Results are saved
+as JSON under ``benchmarks/results`` (named after the commit) so that runs
+can be compared across commits.
+
+Point ``DATABASE_URL`` at a disposable database, or pass ``--scratch-db`` to
+create a fresh database on the same server for the run and drop it after.
+
+Usage:
+    python -m benchmarks.suite run --requests 500 --concurrency 16
+    python -m benchmarks.suite run --transport uvicorn --scratch-db
+    python -m benchmarks.suite compare OLD.json NEW.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import asyncpg
+import httpx
+from sqlalchemy.engine import make_url
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+# Settings that change what the scenarios measure, recorded with each run
+RECORDED_SETTINGS = [
+    "EVENT_FAST_JSON",
+    "EVENT_CACHE_ENABLED",
+    "EVENT_BUFFER_ENABLED",
+    "EVENT_ROLLUPS_ENABLED",
+    "DB_POOL_SIZE",
+    "DB_MAX_OVERFLOW",
+    "AUTH_HASH_WORKERS",
+    "AUTH_TRUST_CLAIMS_SECONDS",
+    "METRICS_ENABLED",
+]
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Scenario:
+    """A request pattern to measure.
+
+    Attributes:
+        name: Scenario name, the key of its results
+        description: What is measured
+        request: Sends the ``i``-th request of the scenario
+        max_concurrency: Cap on concurrent clients
+        max_requests: Cap on requests measured, for slow requests like logins
+    """
+
+    name: str
+    description: str
+    request: Request
+    max_concurrency: int | None = None
+    max_requests: int | None = None
+
+
+@dataclass
+class Fixture:
+    """Data the scenarios work on, created through the API."""
+
+    run_name: str
+    email: str
+    password: str
+    event_ids: list[int]
+
+
+def scenarios(fixture: Fixture, batch_size: int) -> list[Scenario]:
+    """The measured request patterns."""
+    name = fixture.run_name
+    ids = fixture.event_ids
+    batch = [
+        {"name": name, "value": {"n": n, "region": "eu", "tags": ["bench"]}}
+        for n in range(batch_size)
+    ]
+
+    async def health(client, i):
+        return await client.get("/health")
+
+    async def auth_me(client, i):
+        return await client.get("/auth/me")
+
+    async def login(client, i):
+        data = {"username": fixture.email, "password": fixture.password}
+        return await client.post("/auth/login", data=data)
+
+    async def ingest_single(client, i):
+        return await client.post(
+            "/events/", json={"name": name, "value": {"n": i, "region": "eu"}}
+        )
+
+    async def ingest_batch(client, i):
+        return await client.post("/events/batch", json=batch)
+
+    async def get_by_id(client, i):
+        return await client.get(f"/events/{ids[i % len(ids)]}")
+
+    async def list_page(client, i):
+        return await client.get("/events/", params={"name": name, "limit": 100})
+
+    async def list_filtered(client, i):
+        return await client.get(
+            "/events/",
+            params={"name": name, "limit": 100, "where": f"value.n>={i % 500}"},
+        )
+
+    return [
+        Scenario("health", "unauthenticated baseline, GET /health", health),
+        Scenario("auth_me", "get_current_user overhead, GET /auth/me", auth_me),
+        Scenario(
+            "login",
+            "bcrypt verification, POST /auth/login",
+            login,
+            max_concurrency=4,
+            max_requests=40,
+        ),
+        Scenario("ingest_single", "POST /events/", ingest_single),
+        Scenario(
+            "ingest_batch",
+            f"POST /events/batch of {batch_size} events",
+            ingest_batch,
+        ),
+        Scenario("get_by_id", "GET /events/{id} over seeded events", get_by_id),
+        Scenario("list", "GET /events/ first page of 100", list_page),
+        Scenario("list_filtered", "GET /events/ with a value filter", list_filtered),
+    ]
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int
+) -> dict[str, Any]:
+    """Send ``requests`` requests from concurrent clients and time each."""
+    concurrency = min(concurrency, scenario.max_concurrency or concurrency)
+    requests = min(requests, scenario.max_requests or requests)
+    durations: list[float] = []
+    errors = 0
+    sent = 0
+
+    async def worker():
+        nonlocal sent, errors
+        while sent < requests:
+            i = sent
+            sent += 1
+            started = time.perf_counter()
+            response = await scenario.request(client, i)
+            durations.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    durations.sort()
+    return {
+        "description": scenario.description,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "mean_ms": sum(durations) / len(durations) * 1000,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "max_ms": durations[-1] * 1000,
+    }
+
+
+async def measure_allocations(
+    client: httpx.AsyncClient, scenario: Scenario, samples: int
+) -> dict[str, float]:
+    """Memory allocated per request, sent one at a time under tracemalloc.
+
+    Kept apart from the timed pass because tracing slows allocation down
+    several times. ``peak`` is the most memory a request had allocated at
+    once; ``retained`` is what was still allocated after it completed.
+    """
+    samples = min(samples, scenario.max_requests or samples)
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await scenario.request(client, i)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_peak_kib": sum(peaks) / samples / 1024,
+        "alloc_retained_kib": sum(retained) / samples / 1024,
+    }
+
+
+async def prepare(client: httpx.AsyncClient, seed_events: int) -> Fixture:
+    """Register a user, log in and seed events to read."""
+    run_name = f"bench-{uuid.uuid4().hex[:8]}"
+    email, password = f"{run_name}@example.com", "bench-password"
+    credentials = {"email": email, "password": password}
+    (await client.post("/auth/register", json=credentials)).raise_for_status()
+    response = await client.post(
+        "/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    event_ids = []
+    for start in range(0, seed_events, 1_000):
+        items = [
+            {"name": run_name, "value": {"n": n, "region": "eu" if n % 3 else "us"}}
+            for n in range(start, min(start + 1_000, seed_events))
+        ]
+        response = await client.post("/events/batch", json=items)
+        response.raise_for_status()
+        event_ids.extend(event["id"] for event in response.json()["created"])
+    return Fixture(run_name, email, password, event_ids)
+
+
+async def cleanup(fixture: Fixture) -> None:
+    """Remove the events and user created by the run."""
+    from sqlalchemy import delete
+
+    from api.core.database import async_session
+    from api.src.events.models import Event, EventRollupDirty
+    from api.src.users.models import User
+
+    async with async_session() as session:
+        await session.execute(delete(Event).where(Event.name == fixture.run_name))
+        await session.execute(
+            delete(EventRollupDirty).where(EventRollupDirty.name == fixture.run_name)
+        )
+        await session.execute(delete(User).where(User.email == fixture.email))
+        await session.commit()
+
+
+def admin_dsn(url: str, database: str) -> str:
+    """asyncpg DSN for another database on the server of ``url``."""
+    return (
+        make_url(url)
+        .set(drivername="postgresql", database=database)
+        .render_as_string(hide_password=False)
+    )
+
+
+@asynccontextmanager
+async def scratch_database(url: str):
+    """Create an empty database next to ``url`` and drop it on exit."""
+    name = f"visi_bench_{uuid.uuid4().hex[:8]}"
+    admin = await asyncpg.connect(admin_dsn(url, "postgres"))
+    try:
+        await admin.execute(f'CREATE DATABASE "{name}"')
+        try:
+            yield make_url(url).set(database=name).render_as_string(hide_password=False)
+        finally:
+            await admin.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await admin.close()
+
+
+@asynccontextmanager
+async def asgi_client():
+    """Client calling the app in this process, with its lifespan running."""
+    from api.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(workers: int):
+    """Client calling the app served by a uvicorn subprocess."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=ROOT,
+        # The app logs every request to stdout, which would flood the report
+        stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not become ready")
+            yield client
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_revision() -> tuple[str, bool]:
+    """Current commit and whether the working tree has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(dirty)
+
+
+async def run(args: argparse.Namespace) -> Path:
+    logging.disable(logging.WARNING)
+    async with AsyncExitStack() as stack:
+        if args.scratch_db:
+            url = await stack.enter_async_context(
+                scratch_database(os.environ["DATABASE_URL"])
+            )
+            os.environ["DATABASE_URL"] = url
+            os.environ["MIGRATE_ON_STARTUP"] = "true"
+
+        # Imported only now so that settings see the scratch database
+        from api.core.config import settings
+
+        if args.transport == "asgi":
+            client = await stack.enter_async_context(asgi_client())
+        else:
+            client = await stack.enter_async_context(uvicorn_client(args.workers))
+
+        fixture = await prepare(client, args.seed_events)
+        if not args.scratch_db:
+            stack.push_async_callback(cleanup, fixture)
+
+        selected = [
+            scenario
+            for scenario in scenarios(fixture, args.batch_size)
+            if not args.only or scenario.name in args.only
+        ]
+        results = {}
+        for scenario in selected:
+            warmup = args.warmup
+            if scenario.max_requests:
+                warmup = min(warmup, max(1, scenario.max_requests // 10))
+            for i in range(warmup):
+                await scenario.request(client, i)
+            result = await measure(client, scenario, args.requests, args.concurrency)
+            if args.transport == "asgi" and args.alloc_samples:
+                result.update(
+                    await measure_allocations(client, scenario, args.alloc_samples)
+                )
+            results[scenario.name] = result
+            print(format_result(scenario.name, result), flush=True)
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "transport": args.transport,
+        "workers": args.workers if args.transport == "uvicorn" else 1,
+        "settings": {name: getattr(settings, name) for name in RECORDED_SETTINGS},
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed_events": args.seed_events,
+            "batch_size": args.batch_size,
+        },
+        "scenarios": results,
+    }
+    output = args.output or RESULTS_DIR / (
+        f"{report['timestamp'][:19].replace(':', '')}-{commit}"
+        f"{'-dirty' if dirty else ''}-{args.transport}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    if "health" in results and "auth_me" in results:
+        # From throughput rather than latency: in-process, a request that never
+        # waits on I/O runs to completion without letting others interleave
+        overhead = 1000 * (
+            1 / results["auth_me"]["throughput_rps"]
+            - 1 / results["health"]["throughput_rps"]
+        )
+        print(f"get_current_user overhead: {overhead:.3f} ms of server time")
+    print(f"Results written to {output}")
+    return output
+
+
+def format_result(name: str, result: dict[str, Any]) -> str:
+    line = (
+        f"{name:<16}{result['throughput_rps']:>10,.0f} req/s"
+        f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+        " ms p50/p95/p99"
+    )
+    if "alloc_peak_kib" in result:
+        line += f"{result['alloc_peak_kib']:>10.1f} KiB/req"
+    if result["errors"]:
+        line += f"  {result['errors']} errors"
+    return line
+
+
+def compare(old_path: Path, new_path: Path, threshold: float) -> bool:
+    """Print the change of every scenario between two runs.
+
+    Returns:
+        bool: Whether any scenario regressed by more than ``threshold`` percent
+            in throughput or p95 latency
+    """
+    old = json.loads(old_path.read_text())
+    new = json.loads(new_path.read_text())
+    print(f"{old['commit']} -> {new['commit']}")
+    for key in ("transport", "settings", "parameters"):
+        if old.get(key) != new.get(key):
+            print(f"  warning: {key} differ, results may not be comparable")
+
+    regressed = False
+    print(f"{'scenario':<16}{'req/s':>22}{'p95 ms':>24}{'KiB/req':>22}")
+    for name, after in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None:
+            continue
+        throughput = _change(before["throughput_rps"], after["throughput_rps"])
+        p95 = _change(before["p95_ms"], after["p95_ms"])
+        alloc = (
+            _change(before["alloc_peak_kib"], after["alloc_peak_kib"])
+            if "alloc_peak_kib" in before and "alloc_peak_kib" in after
+            else None
+        )
+        flag = throughput < -threshold or p95 > threshold
+        regressed = regressed or flag
+        print(
+            f"{name:<16}"
+            f"{before['throughput_rps']:>9,.0f} ->{after['throughput_rps']:>7,.0f}"
+            f"{throughput:>+5.0f}%"
+            f"{before['p95_ms']:>9.2f} ->{after['p95_ms']:>8.2f}{p95:>+5.0f}%"
+            + (
+                f"{before['alloc_peak_kib']:>8.1f} ->"
+                f"{after['alloc_peak_kib']:>7.1f}{alloc:>+5.0f}%"
+                if alloc is not None
+                else ""
+            )
+            + ("  REGRESSION" if flag else "")
+        )
+    return regressed
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the scenarios")
+    run_parser.add_argument("--requests", type=int, default=500)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument(
+        "--alloc-samples",
+        type=int,
+        default=50,
+        help="Requests traced for allocations per scenario (ASGI only, 0 skips)",
+    )
+    run_parser.add_argument("--seed-events", type=int, default=5_000)
+    run_parser.add_argument("--batch-size", type=int, default=100)
+    run_parser.add_argument("--transport", choices=["asgi", "uvicorn"], default="asgi")
+    run_parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn worker processes"
+    )
+    run_parser.add_argument(
+        "--scratch-db",
+        action="store_true",
+        help="Run against a new database created next to DATABASE_URL",
+    )
+    run_parser.add_argument("--only", nargs="+", help="Scenarios to run (default: all)")
+    run_parser.add_argument("--output", type=Path, help="Results file")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent change counted as a regression",
+    )
+
+    args = parser.parse_args()
+    if args.command == "run":
+        asyncio.run(run(args))
+    else:
+        sys.exit(1 if compare(args.old, args.new, args.threshold) else 0)
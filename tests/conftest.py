@@ -0,0 +1,11 @@
+import asyncio
+
+import pytest
+
+from api.utils.migrations import migrate
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    """Bring the test database to the latest revision before any test runs."""
+    asyncio.run(migrate())
@@ -0,0 +1,132 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from api.core.admission import (
+    AdmissionLimiter,
+    AdmissionMiddleware,
+    RateLimiter,
+    default_limits,
+    route_class,
+)
+from api.core.config import settings
+from api.core.security import Principal, create_access_token, get_current_user
+
+
+def test_route_classes():
+    assert route_class("POST", "/events/batch") == "ingest"
+    assert route_class("DELETE", "/events/bulk") == "ingest"
+    assert route_class("GET", "/events/export") == "export"
+    assert route_class("GET", "/events/") == "read"
+    assert route_class("POST", "/auth/login") == "auth"
+    assert route_class("GET", "/events/stream") is None
+    assert route_class("GET", "/health/pool") is None
+
+
+async def test_limiter_queues_then_sheds():
+    limiter = AdmissionLimiter(limit=1, max_queue=1, max_wait=0.2)
+    assert await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    # The queue is full
+    assert not await limiter.acquire()
+    limiter.release()
+    assert await waiting
+    assert limiter.stats()["active"] == 1
+
+    # Waited too long
+    assert not await limiter.acquire()
+    limiter.release()
+    assert await limiter.acquire()
+
+    stats = limiter.stats()
+    assert (stats["admitted"], stats["rejected"], stats["timed_out"]) == (3, 1, 1)
+    assert stats["queued"] == 0
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = AdmissionLimiter(limit=1, max_queue=1, max_wait=10)
+    assert await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["queued"] == 0
+
+
+async def test_middleware_sheds_with_retry_after():
+    release = asyncio.Event()
+    inner = FastAPI()
+
+    @inner.post("/events/")
+    async def create():
+        await release.wait()
+        return {}
+
+    limiter = AdmissionLimiter(limit=1, max_queue=0, max_wait=1)
+    inner.add_middleware(
+        AdmissionMiddleware, limiters={"ingest": limiter}, retry_after=3
+    )
+    transport = httpx.ASGITransport(app=inner)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        first = asyncio.create_task(http.post("/events/"))
+        while limiter.stats()["active"] == 0:
+            await asyncio.sleep(0.01)
+        shed = await http.post("/events/")
+        release.set()
+        assert (await first).status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "3"
+    assert limiter.stats()["active"] == 0
+
+
+def test_rate_limiter_refills(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("api.core.admission.time.monotonic", lambda: now[0])
+    limiter = RateLimiter(rate=2, burst=2, max_keys=10)
+    assert limiter.take(1) == limiter.take(1) == 0
+    assert limiter.take(1) == pytest.approx(0.5)
+    assert limiter.take(2) == 0
+    now[0] += 0.5
+    assert limiter.take(1) == 0
+    assert limiter.take(1) > 0
+    assert RateLimiter(rate=0, burst=1, max_keys=10).take(1) == 0
+
+
+async def test_authenticated_requests_are_rate_limited_per_user(monkeypatch):
+    monkeypatch.setattr(
+        "api.core.security.user_rate_limiter",
+        RateLimiter(rate=0.01, burst=2, max_keys=10),
+    )
+    # Trusted claims keep the lookup, and this test, off the database
+    monkeypatch.setattr(settings, "AUTH_TRUST_CLAIMS_SECONDS", 60)
+    inner = FastAPI()
+
+    @inner.get("/me")
+    async def me(current_user: Principal = Depends(get_current_user)):
+        return {"id": current_user.id}
+
+    token = create_access_token({"sub": "424242", "email": "limited@example.com"})
+    other = create_access_token({"sub": "434343", "email": "other@example.com"})
+    transport = httpx.ASGITransport(app=inner)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        headers = {"Authorization": f"Bearer {token}"}
+        assert (await http.get("/me", headers=headers)).status_code == 200
+        assert (await http.get("/me", headers=headers)).status_code == 200
+        response = await http.get("/me", headers=headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        response = await http.get("/me", headers={"Authorization": f"Bearer {other}"})
+        assert response.status_code == 200
+
+
+def test_default_limits_fit_the_pool():
+    limits = default_limits(15)
+    assert sum(limits.values()) <= 15
+    assert set(limits) == {"ingest", "read", "export", "auth"}
+    assert min(default_limits(1).values()) == 1
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from api.core.config import settings
+from api.src.events.dedup import DedupKeyExpirer
+from api.src.events.models import EventDedupKey
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_expiry_deletes_keys_older_than_the_window(session_factory):
+    # Long ago, so that keys of other tests are within the window
+    now = datetime(2000, 1, 3)
+    old = [f"old-{uuid.uuid4().hex}" for _ in range(3)]
+    fresh = f"fresh-{uuid.uuid4().hex}"
+    async with session_factory() as session:
+        session.add_all(
+            [
+                EventDedupKey(key=key, event_id=1, createdAt=now - timedelta(days=2))
+                for key in old
+            ]
+            + [EventDedupKey(key=fresh, event_id=1, createdAt=now)]
+        )
+        await session.commit()
+
+    expirer = DedupKeyExpirer(
+        window_hours=24, interval=60, batch_size=2, session_factory=session_factory
+    )
+    deleted = [await expirer.expire(now=now) for _ in range(3)]
+
+    async with session_factory() as session:
+        query = select(EventDedupKey.key).where(EventDedupKey.key.in_([*old, fresh]))
+        left = (await session.scalars(query)).all()
+        await session.delete(await session.get(EventDedupKey, fresh))
+        await session.commit()
+    assert deleted == [2, 1, 0]
+    assert left == [fresh]
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from api.src.events.downsampling import downsample, lttb, minmax
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[500] = 10
+    indexes = lttb(x, y, 20)
+    assert len(indexes) == 20
+    assert indexes[0] == 0
+    assert indexes[-1] == 999
+    assert 500 in indexes
+    assert np.all(np.diff(indexes) > 0)
+
+
+def test_minmax_keeps_extremes_of_each_bucket():
+    x = np.arange(8, dtype=np.float64)
+    y = np.array([3, 1, 4, 1.5, 9, 2, 6, 5])
+    assert minmax(x, y, 4).tolist() == [1, 2, 4, 5]
+
+
+def test_downsample_returns_short_series_unchanged():
+    start = datetime(2024, 1, 1)
+    timestamps = [start + timedelta(seconds=n) for n in range(3)]
+    assert downsample(timestamps, [1, None, 3], 10, "lttb") == (
+        [timestamps[0], timestamps[2]],
+        [1.0, 3.0],
+    )
+
+
+def test_downsample_average():
+    start = datetime(2024, 1, 1)
+    timestamps = [start + timedelta(seconds=n) for n in range(4)]
+    assert downsample(timestamps, [1, 3, 5, 7], 2, "avg") == (
+        [start + timedelta(seconds=0.5), start + timedelta(seconds=2.5)],
+        [2.0, 6.0],
+    )
@@ -0,0 +1,445 @@
+import csv
+import io
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from api.core.database import async_session
+from api.main import app
+from api.src.events.models import Event
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        email = f"{uuid.uuid4().hex}@example.com"
+        client.post("/auth/register", json={"email": email, "password": "secret"})
+        response = client.post(
+            "/auth/login", data={"username": email, "password": "secret"}
+        )
+        token = response.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+
+def test_create_events_batch(client):
+    items = [
+        {"name": "cpu", "value": {"load": 0.5}},
+        {"name": ""},
+        {"name": "cpu", "value": {"load": 0.7}},
+    ]
+    response = client.post("/events/batch", json=items)
+    assert response.status_code == 201
+    body = response.json()
+    assert [event["value"] for event in body["created"]] == [
+        {"load": 0.5},
+        {"load": 0.7},
+    ]
+    assert [error["index"] for error in body["errors"]] == [1]
+
+
+def test_upload_events(client):
+    lines = [
+        '{"name": "temp", "value": {"c": 21.5}}',
+        "",
+        "not json",
+        '{"name": "temp", "createdAt": "2024-01-01T00:00:00Z"}',
+        '{"value": {}}',
+    ]
+    response = client.post(
+        "/events/upload",
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    body = response.json()
+    assert body["accepted"] == 2
+    assert body["rejected"] == 2
+    assert [error["line"] for error in body["errors"]] == [3, 5]
+
+
+def test_upload_reports_lines_the_database_rejects(client):
+    name = f"nul-{uuid.uuid4().hex[:8]}"
+    lines = [
+        json.dumps({"name": name, "value": {"n": 1}}),
+        # jsonb cannot store NUL characters, and text columns neither
+        json.dumps({"name": name, "value": {"text": "a\u0000b"}}),
+        json.dumps({"name": f"{name}\u0000"}),
+        json.dumps({"name": name, "value": {"n": 2}}),
+    ]
+    response = client.post("/events/upload", content="\n".join(lines).encode())
+    assert response.status_code == 201
+    body = response.json()
+    assert body["accepted"] == 2
+    assert body["rejected"] == 2
+    assert [error["line"] for error in body["errors"]] == [2, 3]
+    events = client.get("/events/", params={"name": name}).json()["items"]
+    assert [event["value"] for event in events] == [{"n": 1}, {"n": 2}]
+
+
+def test_upload_rejects_unsupported_fields(client):
+    line = json.dumps({"name": "temp", "dedup_key": uuid.uuid4().hex})
+    response = client.post("/events/upload", content=line.encode())
+    body = response.json()
+    assert body["accepted"] == 0
+    assert body["errors"][0]["detail"][0]["type"] == "extra_forbidden"
+
+
+def test_uploaded_and_created_events_store_a_missing_value_alike(client):
+    name = f"novalue-{uuid.uuid4().hex[:8]}"
+    client.post("/events/", json={"name": name})
+    client.post("/events/upload", content=json.dumps({"name": name}).encode())
+
+    async def stored_values():
+        async with async_session() as session:
+            result = await session.execute(
+                select(Event.value, Event.value.is_(None)).where(Event.name == name)
+            )
+            return [tuple(row) for row in result.all()]
+
+    created, uploaded = client.portal.call(stored_values)
+    assert created == uploaded
+
+
+def test_list_events_paginates_with_cursor(client):
+    name = f"page-{uuid.uuid4().hex[:8]}"
+    client.post(
+        "/events/batch", json=[{"name": name, "value": {"n": n}} for n in range(5)]
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"name": name, "limit": 2}
+        if cursor:
+            params["after"] = cursor
+        page = client.get("/events/", params=params).json()
+        seen.extend(event["value"]["n"] for event in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [0, 1, 2, 3, 4]
+
+
+def test_fast_json_matches_response_models(client, monkeypatch):
+    name = f"fast-{uuid.uuid4().hex[:8]}"
+    created = client.post(
+        "/events/batch",
+        json=[{"name": name, "value": {"n": n, "tags": ["a"]}} for n in range(3)],
+    ).json()["created"]
+    urls = [
+        ("/events/", {"name": name, "limit": 2}),
+        (f"/events/{created[0]['id']}", {}),
+    ]
+
+    monkeypatch.setattr("api.src.events.cache.event_cache.enabled", False)
+    monkeypatch.setattr("api.core.config.settings.EVENT_FAST_JSON", True)
+    fast = [client.get(url, params=params) for url, params in urls]
+    monkeypatch.setattr("api.core.config.settings.EVENT_FAST_JSON", False)
+    validated = [client.get(url, params=params) for url, params in urls]
+
+    for fast_response, validated_response in zip(fast, validated):
+        assert fast_response.status_code == validated_response.status_code == 200
+        assert fast_response.headers["content-type"] == "application/json"
+        assert fast_response.json() == validated_response.json()
+
+
+def test_list_events_rejects_invalid_cursor(client):
+    response = client.get("/events/", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_export_events(client):
+    name = f"export-{uuid.uuid4().hex[:8]}"
+    client.post(
+        "/events/batch", json=[{"name": name, "value": {"n": n}} for n in range(3)]
+    )
+
+    response = client.get("/events/export", params={"name": name})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["value"] for line in lines] == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    response = client.get("/events/export", params={"name": name, "format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "name", "value", "createdAt"]
+    assert [row[2] for row in rows[1:]] == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+
+
+def test_export_events_columnar(client):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    name = f"columnar-{uuid.uuid4().hex[:8]}"
+    values = [{"cpu": {"load": 0.5}}, {"cpu": {"load": "high"}}, {"cpu": {"load": 2}}]
+    client.post("/events/batch", json=[{"name": name, "value": v} for v in values])
+
+    response = client.get(
+        "/events/export",
+        params={"name": name, "format": "arrow", "field": ["cpu.load", "mem"]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == [
+        "id",
+        "name",
+        "createdAt",
+        "value.cpu.load",
+        "value.mem",
+    ]
+    assert table.column("value.cpu.load").to_pylist() == [0.5, None, 2.0]
+    assert table.column("value.mem").null_count == 3
+
+    response = client.get("/events/export", params={"name": name, "format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("name").to_pylist() == [name] * 3
+    assert [json.loads(value) for value in table.column("value").to_pylist()] == values
+
+    response = client.get(
+        "/events/export", params={"format": "arrow", "field": "cpu..load"}
+    )
+    assert response.status_code == 400
+
+
+def test_aggregate_events(client):
+    name = f"agg-{uuid.uuid4().hex[:8]}"
+    lines = [
+        {
+            "name": name,
+            "value": {"cpu": {"load": 1}},
+            "createdAt": "2024-01-01T00:00:10Z",
+        },
+        {
+            "name": name,
+            "value": {"cpu": {"load": 3}},
+            "createdAt": "2024-01-01T00:00:50Z",
+        },
+        {
+            "name": name,
+            "value": {"cpu": {"load": "n/a"}},
+            "createdAt": "2024-01-01T00:01:30Z",
+        },
+        {
+            "name": name,
+            "value": {"cpu": {"load": 5}},
+            "createdAt": "2024-01-01T00:01:40Z",
+        },
+    ]
+    client.post(
+        "/events/upload",
+        content="\n".join(json.dumps(line) for line in lines).encode(),
+    )
+    params = {
+        "name": name,
+        "bucket": "1m",
+        "from": "2024-01-01T00:00:00Z",
+        "to": "2024-01-01T01:00:00Z",
+    }
+
+    response = client.get("/events/aggregate", params=params)
+    assert response.status_code == 200
+    assert response.json()["values"] == [2, 2]
+
+    response = client.get(
+        "/events/aggregate", params={**params, "agg": "avg", "field": "cpu.load"}
+    )
+    body = response.json()
+    assert body["timestamps"] == ["2024-01-01T00:00:00", "2024-01-01T00:01:00"]
+    assert body["values"] == [2, 5]
+
+
+def test_aggregate_events_rejects_invalid_bucket(client):
+    params = {
+        "bucket": "1x",
+        "from": "2024-01-01T00:00:00Z",
+        "to": "2024-01-02T00:00:00Z",
+    }
+    response = client.get("/events/aggregate", params=params)
+    assert response.status_code == 400
+
+
+def test_series_downsampled(client):
+    name = f"series-{uuid.uuid4().hex[:8]}"
+    client.post(
+        "/events/batch", json=[{"name": name, "value": {"v": n}} for n in range(50)]
+    )
+    response = client.get(
+        "/events/series", params={"name": name, "field": "v", "downsample": 10}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["source_points"] == 50
+    assert len(body["values"]) == 10
+    assert body["values"][0] == 0
+    assert body["values"][-1] == 49
+
+
+def test_create_events_batch_reports_database_errors(client):
+    items = [{"name": "cpu", "value": {"bad": "\u0000"}}, {"name": "cpu"}]
+    response = client.post("/events/batch", json=items)
+    assert response.status_code == 201
+    body = response.json()
+    assert len(body["created"]) == 1
+    assert [error["index"] for error in body["errors"]] == [0]
+    assert client.post("/events/", json=items[0]).status_code == 400
+
+
+def test_list_events_filters_on_value(client):
+    name = f"where-{uuid.uuid4().hex[:8]}"
+    items = [
+        {"name": name, "value": {"region": "eu", "latency": 100}},
+        {"name": name, "value": {"region": "eu", "latency": 300}},
+        {"name": name, "value": {"region": "us", "latency": 500}},
+    ]
+    client.post("/events/batch", json=items)
+
+    params = {"name": name, "where": ["value.region=eu", "value.latency>200"]}
+    response = client.get("/events/", params=params)
+    assert response.status_code == 200
+    assert [event["value"]["latency"] for event in response.json()["items"]] == [300]
+
+    params = {"name": name, "where": "value.region!=eu"}
+    response = client.get("/events/", params=params)
+    assert [event["value"]["region"] for event in response.json()["items"]] == ["us"]
+
+
+def test_event_reads_are_cached_with_etags(client, monkeypatch):
+    # Off by default without a shared backend; a single worker is never stale
+    monkeypatch.setattr("api.src.events.cache.event_cache.enabled", True)
+    name = f"etag-{uuid.uuid4().hex[:8]}"
+    event = client.post("/events/", json={"name": name}).json()
+    urls = [f"/events/{event['id']}", f"/events/?name={name}"]
+
+    first = [client.get(url) for url in urls]
+    etags = [response.headers["etag"] for response in first]
+    unchanged = [
+        client.get(url, headers={"If-None-Match": etag})
+        for url, etag in zip(urls, etags)
+    ]
+    assert [response.status_code for response in unchanged] == [304, 304]
+    assert unchanged[0].content == b""
+
+    renamed = f"{name}-renamed"
+    client.patch(f"/events/{event['id']}", json={"name": renamed})
+    changed = [
+        client.get(url, headers={"If-None-Match": etag})
+        for url, etag in zip(urls, etags)
+    ]
+    assert [response.status_code for response in changed] == [200, 200]
+    assert changed[0].json()["name"] == renamed
+    assert changed[1].json()["items"] == []
+
+    client.delete(f"/events/{event['id']}")
+    assert client.get(urls[0]).status_code == 404
+
+    stats = client.get("/events/cache/stats").json()
+    assert stats["backend"] == "memory"
+    assert stats["hits"] >= 2
+    assert stats["invalidations"] >= 2
+
+
+def test_bulk_update_and_delete(client, monkeypatch):
+    name = f"bulk-{uuid.uuid4().hex[:8]}"
+    created = client.post(
+        "/events/batch", json=[{"name": name, "value": {"n": n}} for n in range(5)]
+    ).json()["created"]
+    ids = [event["id"] for event in created]
+    selection = {"name": name, "where": ["value.n>=2"]}
+
+    response = client.patch(
+        "/events/bulk",
+        params={"dry_run": True},
+        json={"filter": selection, "set": {"value": {"fixed": True}}},
+    )
+    assert response.json() == {
+        "matched": 3,
+        "affected": 0,
+        "chunks": 0,
+        "dry_run": True,
+    }
+    assert client.get(f"/events/{ids[4]}").json()["value"] == {"n": 4}
+
+    monkeypatch.setattr("api.core.config.settings.EVENT_BULK_CHUNK_SIZE", 2)
+    response = client.patch(
+        "/events/bulk", json={"filter": selection, "set": {"value": {"fixed": True}}}
+    )
+    assert response.status_code == 200
+    assert response.json()["affected"] == 3
+    assert response.json()["chunks"] == 2
+    assert client.get(f"/events/{ids[4]}").json()["value"] == {"fixed": True}
+    assert client.get(f"/events/{ids[1]}").json()["value"] == {"n": 1}
+
+    response = client.patch(f"/events/{ids[0]}", json={"value": {"n": 10}})
+    assert response.json()["value"] == {"n": 10}
+
+    response = client.request(
+        "DELETE", "/events/bulk", json={"ids": ids[:2], "id_from": ids[1]}
+    )
+    assert response.json()["affected"] == 1
+    assert client.get(f"/events/{ids[1]}").status_code == 404
+    assert client.get(f"/events/{ids[0]}").status_code == 200
+
+    assert client.request("DELETE", "/events/bulk", json={}).status_code == 422
+    response = client.patch("/events/bulk", json={"filter": {"name": name}, "set": {}})
+    assert response.status_code == 400
+
+
+def test_create_event_is_idempotent_with_dedup_key(client):
+    from api.src.events.cache import recent_dedup_keys
+
+    name = f"dedup-{uuid.uuid4().hex[:8]}"
+    key = uuid.uuid4().hex
+    first = client.post("/events/", json={"name": name, "dedup_key": key})
+    assert first.status_code == 201
+    # Once answered from the recent keys, once through the database
+    hits = recent_dedup_keys.hits
+    assert client.post("/events/", json={"name": name, "dedup_key": key}).json() == (
+        first.json()
+    )
+    assert recent_dedup_keys.hits == hits + 1
+    recent_dedup_keys.clear()
+    assert client.post("/events/", json={"name": name, "dedup_key": key}).json() == (
+        first.json()
+    )
+
+    other = uuid.uuid4().hex
+    response = client.post(
+        "/events/batch",
+        json=[
+            {"name": name, "dedup_key": key},
+            {"name": name, "dedup_key": other},
+            {"name": name, "dedup_key": other},
+            {"name": name},
+        ],
+    )
+    created = response.json()["created"]
+    assert created[0] == first.json()
+    assert created[1] == created[2]
+    assert len({event["id"] for event in created}) == 3
+    events = client.get("/events/", params={"name": name}).json()["items"]
+    assert len(events) == 3
+
+    # Retries get the event as it is now, whether this worker remembers the
+    # key or not
+    client.patch(f"/events/{first.json()['id']}", json={"value": {"n": 1}})
+    for remembered in (True, False):
+        if not remembered:
+            recent_dedup_keys.clear()
+        response = client.post("/events/", json={"name": name, "dedup_key": key})
+        assert response.status_code == 201
+        assert response.json()["value"] == {"n": 1}
+
+    client.delete(f"/events/{first.json()['id']}")
+    for remembered in (True, False):
+        if not remembered:
+            recent_dedup_keys.clear()
+        response = client.post("/events/", json={"name": name, "dedup_key": key})
+        assert response.status_code == 409
+        errors = client.post("/events/batch", json=[{"name": name, "dedup_key": key}])
+        assert [error["index"] for error in errors.json()["errors"]] == [0]
@@ -0,0 +1,23 @@
+import pytest
+
+from api.core.exceptions import BadRequestException
+from api.src.events.filters import parse_value_filter
+
+
+def test_parse_value_filter():
+    parsed = parse_value_filter("value.region=eu")
+    assert (parsed.path, parsed.op, parsed.value) == (("region",), "=", "eu")
+
+    parsed = parse_value_filter("value.http.latency>=200.5")
+    assert (parsed.path, parsed.op, parsed.value) == (("http", "latency"), ">=", 200.5)
+
+    parsed = parse_value_filter('value.ok!="true"')
+    assert (parsed.path, parsed.op, parsed.value) == (("ok",), "!=", "true")
+
+
+@pytest.mark.parametrize(
+    "expression", ["region=eu", "value.=1", "value.a..b=1", "value.latency>high"]
+)
+def test_parse_value_filter_rejects_invalid(expression):
+    with pytest.raises(BadRequestException):
+        parse_value_filter(expression)
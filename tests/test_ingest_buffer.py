@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from api.core.config import settings
+from api.src.events.buffer import IngestBuffer
+from api.src.events.schemas import EventCreate
+
+
+@pytest.fixture
+async def buffer():
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    buffer = IngestBuffer(
+        max_batch=10, max_delay_ms=50, max_queue=100, session_factory=session_factory
+    )
+    await buffer.start()
+    yield buffer
+    await buffer.stop()
+    await engine.dispose()
+
+
+async def test_concurrent_events_are_group_committed(buffer):
+    events = [EventCreate(name="buffered", value={"n": n}) for n in range(25)]
+    created = await asyncio.gather(*(buffer.submit(event) for event in events))
+
+    assert [event.value for event in created] == [{"n": n} for n in range(25)]
+    stats = buffer.stats()
+    assert stats.flushed_events == 25
+    assert stats.flushes == 3
+
+
+async def test_stop_flushes_enqueued_events(buffer):
+    assert await buffer.submit(EventCreate(name="buffered"), wait=False) is None
+    await buffer.stop()
+
+    stats = buffer.stats()
+    assert not stats.running
+    assert stats.queue_depth == 0
+    assert stats.flushed_events == 1
+
+
+async def test_failing_item_gets_the_unbuffered_error(buffer):
+    events = [
+        EventCreate(name="buffered", value={"n": 1}),
+        EventCreate(name="buffered", value={"bad": "\u0000"}),
+        EventCreate(name="buffered", value={"n": 2}),
+    ]
+    results = await asyncio.gather(
+        *(buffer.submit(event) for event in events), return_exceptions=True
+    )
+
+    assert [result.value for result in results[::2]] == [{"n": 1}, {"n": 2}]
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 400
+    stats = buffer.stats()
+    assert stats.failed_events == 1
+    assert stats.last_flush_size == stats.avg_flush_size == 3
@@ -0,0 +1,177 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from api.core.config import settings
+from api.src.events.live import (
+    MAX_PAYLOAD_BYTES,
+    EventBroadcaster,
+    Subscription,
+    _listener_dsn,
+)
+from api.src.events.repository import EventRepository
+from api.src.events.schemas import EventCreate, EventFilter
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def broadcaster(session_factory):
+    broadcaster = EventBroadcaster(
+        _listener_dsn(),
+        max_subscribers=3,
+        max_queue=10,
+        session_factory=session_factory,
+    )
+    await broadcaster.start()
+    for _ in range(100):
+        if broadcaster.stats().listening:
+            break
+        await asyncio.sleep(0.01)
+    yield broadcaster
+    await broadcaster.stop()
+
+
+async def next_message(subscription: Subscription) -> bytes:
+    messages = subscription.messages(keepalive=5)
+    return await asyncio.wait_for(anext(messages), 5)
+
+
+async def test_slow_subscriber_is_dropped_without_blocking_others():
+    broadcaster = EventBroadcaster("unused", max_subscribers=2, max_queue=2)
+    slow = broadcaster.subscribe("a")
+    other = broadcaster.subscribe(None)
+    with pytest.raises(HTTPException) as error:
+        broadcaster.subscribe("b")
+    assert error.value.status_code == 503
+
+    for event_id in range(3):
+        broadcaster.publish(event_id, "a", b"{}")
+        assert await next_message(other) == b"id: %d\ndata: {}\n\n" % event_id
+
+    assert slow.dropped and not other.dropped
+    stats = broadcaster.stats()
+    assert stats.subscribers == 1
+    assert stats.dropped_subscribers == 1
+    assert [message async for message in slow.messages(keepalive=1)] == [
+        b"event: dropped\ndata: {}\n\n"
+    ]
+
+
+async def test_committed_events_reach_matching_subscribers(
+    broadcaster, session_factory
+):
+    name = f"live-{uuid.uuid4().hex[:8]}"
+    matching = broadcaster.subscribe(name)
+    everything = broadcaster.subscribe()
+    other = broadcaster.subscribe(f"{name}-other")
+
+    async with session_factory() as session:
+        event = await EventRepository(session).create(
+            EventCreate(name=name, value={"n": 1})
+        )
+    big = "x" * MAX_PAYLOAD_BYTES
+    async with session_factory() as session:
+        created, _ = await EventRepository(session).create_many(
+            [EventCreate(name=name, value={"big": big})]
+        )
+
+    for subscription in (matching, everything):
+        first = await next_message(subscription)
+        header, data = first.split(b"\ndata: ")
+        assert header == b"id: %d" % event.id
+        assert orjson.loads(data) == {
+            "id": event.id,
+            "name": name,
+            "value": {"n": 1},
+            "createdAt": event.createdAt.isoformat(),
+        }
+        # Too large for a notification, so it is read back from the table
+        second = await next_message(subscription)
+        assert orjson.loads(second.split(b"\ndata: ")[1])["value"] == {"big": big}
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(anext(other.messages(keepalive=5)), 0.2)
+    assert broadcaster.stats().delivered == 4
+
+
+async def test_stop_cancels_pending_reads():
+    started = asyncio.Event()
+
+    class StalledSession:
+        async def __aenter__(self):
+            started.set()
+            await asyncio.Event().wait()
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    broadcaster = EventBroadcaster(
+        "unused", max_subscribers=1, max_queue=1, session_factory=StalledSession
+    )
+    broadcaster._task = asyncio.create_task(asyncio.Event().wait())
+    broadcaster.subscribe()
+    # Oversized events are announced without their value and read back
+    broadcaster._on_notification(None, 0, "events", '{"id": 1, "name": "big"}')
+    await asyncio.wait_for(started.wait(), 5)
+    (read,) = broadcaster._reads
+
+    await broadcaster.stop()
+    assert read.cancelled()
+    assert not broadcaster._reads
+
+
+async def test_copied_events_reach_subscribers(broadcaster, session_factory):
+    name = f"live-{uuid.uuid4().hex[:8]}"
+    subscription = broadcaster.subscribe(name)
+    created_at = datetime(2024, 1, 1)
+
+    async with session_factory() as session:
+        await EventRepository(session).copy_rows(
+            [(name, {"n": 1}, created_at), (name, None, created_at)]
+        )
+    async with session_factory() as session:
+        page = await EventRepository(session).get_page(EventFilter(name=name), 10)
+
+    messages = [await next_message(subscription) for _ in page]
+    assert [orjson.loads(message.split(b"\ndata: ")[1]) for message in messages] == [
+        {
+            "id": event.id,
+            "name": name,
+            "value": event.value,
+            "createdAt": created_at.isoformat(),
+        }
+        for event in page
+    ]
+
+
+async def test_stop_ends_open_streams():
+    broadcaster = EventBroadcaster("unused", max_subscribers=2, max_queue=2)
+    broadcaster._task = asyncio.create_task(asyncio.Event().wait())
+    waiting = broadcaster.subscribe("a")
+    stream = asyncio.create_task(collect(waiting))
+    behind = broadcaster.subscribe("b")
+    broadcaster.publish(1, "b", b"{}")
+    await asyncio.sleep(0)
+
+    await broadcaster.stop()
+    assert await asyncio.wait_for(stream, 5) == []
+    # Messages queued before the stop are still sent
+    assert await asyncio.wait_for(collect(behind), 5) == [b"id: 1\ndata: {}\n\n"]
+    assert broadcaster.stats().subscribers == 0
+
+
+async def collect(subscription: Subscription) -> list[bytes]:
+    return [message async for message in subscription.messages(keepalive=5)]
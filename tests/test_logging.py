@@ -0,0 +1,89 @@
+import json
+import logging
+import queue
+
+from fastapi.testclient import TestClient
+
+from api.core.logging import (
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    access_logger,
+    request_id,
+)
+from api.main import app
+
+client = TestClient(app)
+
+
+def make_record(level=logging.INFO, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, "Took %s", ("5ms",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extra_fields():
+    line = JSONFormatter().format(
+        make_record(request_id="abc", duration_ms=5.2, event_id=7)
+    )
+    payload = json.loads(line)
+    assert payload["message"] == "Took 5ms"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "test"
+    assert payload["request_id"] == "abc"
+    assert payload["duration_ms"] == 5.2
+    assert payload["event_id"] == 7
+
+
+def test_sampling_keeps_whole_requests_and_all_warnings():
+    sampler = SamplingFilter(0.5)
+    kept = set()
+    for n in range(1_000):
+        token = request_id.set(f"request-{n}")
+        decisions = {sampler.filter(make_record()) for _ in range(3)}
+        assert len(decisions) == 1
+        if decisions.pop():
+            kept.add(n)
+        request_id.reset(token)
+    assert 400 < len(kept) < 600
+
+    nothing = SamplingFilter(0.0)
+    assert not nothing.filter(make_record())
+    assert nothing.filter(make_record(logging.WARNING))
+
+
+def test_queue_handler_drops_records_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+    token = request_id.set("abc")
+    handler.handle(make_record())
+    handler.handle(make_record())
+    request_id.reset(token)
+    queued = log_queue.get_nowait()
+    assert (queued.msg, queued.args, queued.request_id) == ("Took 5ms", None, "abc")
+    assert handler.dropped == 1
+
+
+def test_requests_get_ids_and_access_records():
+    seen = []
+
+    class Capture(logging.Handler):
+        def emit(self, record):
+            seen.append((record.status, record.duration_ms, request_id.get()))
+
+    handler = Capture()
+    access_logger.addHandler(handler)
+    try:
+        given = client.get("/health", headers={"X-Request-ID": "trace-1"})
+        invalid = client.get("/health", headers={"X-Request-ID": "has spaces"})
+    finally:
+        access_logger.removeHandler(handler)
+
+    assert given.headers["x-request-id"] == "trace-1"
+    generated = invalid.headers["x-request-id"]
+    assert len(generated) == 32
+    assert [(status, ident) for status, _, ident in seen] == [
+        (200, "trace-1"),
+        (200, generated),
+    ]
+    assert all(duration >= 0 for _, duration, _ in seen)
@@ -9,3 +9,20 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_pool_status():
+    response = client.get("/health/pool")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pool_class"] == "InstrumentedQueuePool"
+    assert {"size", "checked_out", "overflow", "wait_seconds"} <= body.keys()
+
+
+def test_startup_report():
+    with TestClient(app) as started:
+        response = started.get("/health/startup")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["notes"]["migrations"] == "up to date"
+    assert {"migrations", "background_workers"} <= body["phases"].keys()
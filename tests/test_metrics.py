@@ -0,0 +1,84 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry
+
+from api.core.database import engine
+from api.core.metrics import StatsCollector, operation
+from api.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        # Connections pooled by other test modules belong to other event loops
+        client.portal.call(lambda: engine.dispose(close=False))
+        email = f"{uuid.uuid4().hex}@example.com"
+        client.post("/auth/register", json={"email": email, "password": "secret"})
+        response = client.post(
+            "/auth/login", data={"username": email, "password": "secret"}
+        )
+        token = response.json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_are_counted_per_route_template(client):
+    labels = {"method": "GET", "route": "/events/{event_id}"}
+    requests_before = sample("http_requests_total", **labels, status="404")
+    queries_before = sample("http_request_db_queries_sum", **labels)
+
+    for event_id in (2_000_000_001, 2_000_000_002):
+        assert client.get(f"/events/{event_id}").status_code == 404
+    client.get(f"/no-such-route/{uuid.uuid4().hex}")
+
+    assert sample("http_requests_total", **labels, status="404") == (
+        requests_before + 2
+    )
+    assert sample("http_request_db_queries_sum", **labels) > queries_before
+    assert sample("http_request_duration_seconds_count", **labels) >= 2
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+
+def test_metrics_endpoint_exports_requests_queries_and_components(client):
+    client.get("/events/?limit=1")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in (
+        'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/events/"}',
+        'db_query_duration_seconds_count{engine="primary",operation="SELECT"}',
+        "db_pool_checkouts_total",
+        "db_pool_wait_seconds_bucket",
+        "event_cache_misses_total",
+        "ingest_buffer_queue_depth",
+        "password_hashing_completed_total",
+    ):
+        assert name in response.text
+
+
+def test_stats_collector_exports_numeric_stats():
+    registry = CollectorRegistry()
+    registry.register(
+        StatsCollector(
+            "widget",
+            lambda: {"made": 3, "queued": 1.5, "running": True, "kind": "x"},
+            counters=("made",),
+        )
+    )
+    assert registry.get_sample_value("widget_made_total") == 3
+    assert registry.get_sample_value("widget_queued") == 1.5
+    assert registry.get_sample_value("widget_running") is None
+    assert registry.get_sample_value("widget_kind") is None
+
+
+def test_statement_operation():
+    assert operation("SELECT 1") == "SELECT"
+    assert operation("\n  insert into events") == "INSERT"
+    assert operation("(SELECT 1) UNION (SELECT 2)") == "SELECT"
+    assert operation("") == "UNKNOWN"
@@ -0,0 +1,85 @@
+import asyncio
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api.core.config import settings
+from api.utils.migrations import _upgrade, alembic_config, migrate
+
+SCRATCH_DB = "migrations_scratch"
+
+
+def admin_dsn(database: str) -> str:
+    url = make_url(settings.DATABASE_URL).set(
+        drivername="postgresql", database=database
+    )
+    return url.render_as_string(hide_password=False)
+
+
+def test_concurrent_workers_migrate_once_then_skip():
+    async def scenario():
+        admin = await asyncpg.connect(admin_dsn("postgres"))
+        await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        await admin.execute(f"CREATE DATABASE {SCRATCH_DB}")
+        url = make_url(settings.DATABASE_URL).set(database=SCRATCH_DB)
+        url = url.render_as_string(hide_password=False)
+        try:
+            first = await asyncio.gather(*(migrate(url) for _ in range(3)))
+            again = await migrate(url)
+        finally:
+            await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+            await admin.close()
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    upgrades = [result for result in first if result.startswith("upgraded from")]
+    assert len(upgrades) == 1
+    assert upgrades[0].startswith("upgraded from empty database")
+    assert again == "up to date"
+
+
+def test_jsonb_conversion_replaces_only_unescaped_nul_escapes():
+    values = [
+        r'{"text": "a\u0000b"}',
+        # An escaped backslash followed by the letters u0000
+        r'{"text": "a\\u0000b"}',
+        # An escaped backslash followed by a NUL escape
+        r'{"text": "a\\\u0000b"}',
+        r'{"text": "\u0000\u0000"}',
+    ]
+
+    async def scenario():
+        admin = await asyncpg.connect(admin_dsn("postgres"))
+        await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        await admin.execute(f"CREATE DATABASE {SCRATCH_DB}")
+        url = make_url(settings.DATABASE_URL).set(database=SCRATCH_DB)
+        engine = create_async_engine(url, poolclass=NullPool)
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(_upgrade, alembic_config(), "a41f3c9d2e67")
+                await connection.execute(
+                    text(
+                        "INSERT INTO events (name, value) "
+                        "VALUES ('nul', CAST(:value AS json))"
+                    ),
+                    [{"value": value} for value in values],
+                )
+                await connection.run_sync(_upgrade, alembic_config(), "c7e2a95b1f38")
+                result = await connection.execute(
+                    text("SELECT value ->> 'text' FROM events ORDER BY id")
+                )
+                return result.scalars().all()
+        finally:
+            await engine.dispose()
+            await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+            await admin.close()
+
+    assert asyncio.run(scenario()) == [
+        "a\ufffdb",
+        "a\\u0000b",
+        "a\\\ufffdb",
+        "\ufffd\ufffd",
+    ]
@@ -0,0 +1,220 @@
+import asyncio
+from datetime import datetime
+
+import asyncpg
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from api.core.config import settings
+from api.src.events.partitions import PartitionMaintainer, list_partitions
+from api.utils.migrations import migrate
+
+SCRATCH_DB = "partitions_scratch"
+
+
+def admin_dsn(database: str) -> str:
+    url = make_url(settings.DATABASE_URL).set(
+        drivername="postgresql", database=database
+    )
+    return url.render_as_string(hide_password=False)
+
+
+async def with_scratch_database(scenario, **engine_options):
+    admin = await asyncpg.connect(admin_dsn("postgres"))
+    await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+    await admin.execute(f"CREATE DATABASE {SCRATCH_DB}")
+    url = make_url(settings.DATABASE_URL).set(database=SCRATCH_DB)
+    url = url.render_as_string(hide_password=False)
+    engine = create_async_engine(url, poolclass=NullPool, **engine_options)
+    try:
+        await migrate(url)
+        return await scenario(engine)
+    finally:
+        await engine.dispose()
+        await admin.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        await admin.close()
+
+
+async def insert(engine, *created_at: datetime) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(
+            text("INSERT INTO events (name, \"createdAt\") VALUES ('p', :at)"),
+            [{"at": at} for at in created_at],
+        )
+
+
+async def rows_by_partition(engine) -> dict[str, int]:
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text("SELECT tableoid::regclass::text, count(*) FROM events GROUP BY 1")
+        )
+        return dict(result.all())
+
+
+def test_maintenance_creates_drains_and_drops_partitions():
+    async def scenario(engine):
+        await insert(
+            engine,
+            datetime(2025, 1, 15),
+            datetime(2026, 9, 10),
+            datetime(2026, 10, 5),
+        )
+        maintainer = PartitionMaintainer(
+            "month", premake=1, retention_days=60, run_interval=60, engine=engine
+        )
+        first = await maintainer.maintain(now=datetime(2026, 10, 17))
+        after_first = await rows_by_partition(engine)
+        backfilled = await maintainer.backfill(now=datetime(2026, 10, 17))
+        after_backfill = await rows_by_partition(engine)
+        again = await maintainer.maintain(now=datetime(2026, 10, 17))
+
+        later = await maintainer.maintain(now=datetime(2026, 12, 20))
+        await insert(engine, datetime(2026, 12, 20, 12))
+        async with engine.connect() as connection:
+            partitions = [p.name for p in await list_partitions(connection)]
+            plan = await connection.execute(
+                text(
+                    "EXPLAIN SELECT * FROM events "
+                    "WHERE \"createdAt\" >= '2026-12-01' "
+                    'AND "createdAt" < \'2027-01-01\' ORDER BY "createdAt", id'
+                )
+            )
+            plan = "\n".join(row[0] for row in plan.all())
+        return (
+            first,
+            after_first,
+            backfilled,
+            after_backfill,
+            again,
+            later,
+            partitions,
+            plan,
+        )
+
+    (
+        first,
+        after_first,
+        backfilled,
+        after_backfill,
+        again,
+        later,
+        partitions,
+        plan,
+    ) = asyncio.run(with_scratch_database(scenario))
+    # Periods with rows in the default partition wait for the backfill
+    assert first.created == ["events_p202611"]
+    assert first.pending == [datetime(2026, 9, 1), datetime(2026, 10, 1)]
+    assert first.moved == 0
+    assert first.expired == 1
+    assert first.dropped == []
+    assert after_first == {"events_default": 2}
+    assert backfilled.created == ["events_p202609", "events_p202610"]
+    assert backfilled.moved == 2
+    assert after_backfill == {"events_p202609": 1, "events_p202610": 1}
+    assert again.created == [] and again.pending == [] and again.expired == 0
+
+    assert later.created == ["events_p202612", "events_p202701"]
+    assert later.dropped == ["events_p202609"]
+    assert partitions == [
+        "events_p202610",
+        "events_p202611",
+        "events_p202612",
+        "events_p202701",
+        "events_default",
+    ]
+    # Only partitions that can hold matching rows are scanned
+    assert "events_p202612" in plan
+    assert "events_p202610" not in plan
+    assert "events_p202701" not in plan
+    assert "events_default" not in plan
+
+
+def test_backfill_catches_up_with_changes_made_during_the_copy():
+    async def scenario(engine):
+        await insert(engine, *(datetime(2026, 9, day) for day in range(1, 6)))
+        maintainer = PartitionMaintainer(
+            "month",
+            premake=0,
+            retention_days=None,
+            run_interval=60,
+            engine=engine,
+            batch_size=2,
+        )
+        start, end = datetime(2026, 9, 1), datetime(2026, 10, 1)
+        async with engine.connect() as connection:
+            staging = await maintainer._stage(connection, start, end)
+        async with engine.begin() as connection:
+            await connection.execute(
+                text(
+                    "UPDATE events SET value = '{\"seen\": true}' "
+                    "WHERE \"createdAt\" = '2026-09-01'"
+                )
+            )
+            await connection.execute(
+                text("DELETE FROM events WHERE \"createdAt\" = '2026-09-02'")
+            )
+        await insert(engine, datetime(2026, 9, 20))
+        async with engine.connect() as connection:
+            staged = await connection.scalar(text(f'SELECT count(*) FROM "{staging}"'))
+            moved = await maintainer._swap(connection, staging, start, end)
+            await connection.commit()
+        async with engine.connect() as connection:
+            rows = await connection.execute(
+                text(
+                    'SELECT tableoid::regclass::text, "createdAt", value '
+                    'FROM events ORDER BY "createdAt"'
+                )
+            )
+            return staged, moved, rows.all()
+
+    staged, moved, rows = asyncio.run(with_scratch_database(scenario))
+    assert staged == 5
+    assert moved == 5
+    assert [(table, at.day, value) for table, at, value in rows] == [
+        ("events_p202609", 1, {"seen": True}),
+        ("events_p202609", 3, None),
+        ("events_p202609", 4, None),
+        ("events_p202609", 5, None),
+        ("events_p202609", 20, None),
+    ]
+
+
+def test_attach_relies_on_a_validated_constraint_of_the_default_partition():
+    messages = []
+
+    async def scenario(engine):
+        @event.listens_for(engine.sync_engine, "connect")
+        def listen(dbapi_connection, connection_record):
+            dbapi_connection.driver_connection.add_log_listener(
+                lambda connection, message: messages.append(message.message)
+            )
+
+        await insert(engine, datetime(2025, 1, 15))
+        maintainer = PartitionMaintainer(
+            "month", premake=0, retention_days=None, run_interval=60, engine=engine
+        )
+        report = await maintainer.maintain(now=datetime(2026, 10, 17))
+        async with engine.connect() as connection:
+            constraints = await connection.execute(
+                text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = 'events_default'::regclass AND contype = 'c'"
+                )
+            )
+            return report, constraints.scalars().all()
+
+    report, constraints = asyncio.run(
+        with_scratch_database(
+            scenario,
+            connect_args={"server_settings": {"client_min_messages": "debug1"}},
+        )
+    )
+    assert report.created == ["events_p202610"]
+    # The attach skipped scanning the default partition
+    assert (
+        'updated partition constraint for default partition "events_default" '
+        "is implied by existing constraints"
+    ) in messages
+    assert constraints == []
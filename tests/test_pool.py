@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.core.config import settings
+from api.core.pool import InstrumentedQueuePool, pool_metrics
+
+
+def test_pool_metrics_count_checkouts_waits_and_timeouts():
+    async def scenario():
+        engine = create_async_engine(
+            settings.DATABASE_URL,
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.2,
+        )
+        pool_metrics.reset()
+        pool_metrics.instrument(engine)
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                busy = pool_metrics.snapshot(engine)
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            return busy, pool_metrics.snapshot(engine)
+        finally:
+            await engine.dispose()
+            pool_metrics.reset()
+
+    busy, done = asyncio.run(scenario())
+
+    assert (busy["size"], busy["checked_out"], busy["overflow"]) == (1, 1, 0)
+    assert done["checked_out"] == 0 and done["checked_in"] == 1
+    assert done["checkouts"] == 2
+    assert done["connections_opened"] == 1
+    assert done["timeouts"] == 1
+    waits = done["wait_seconds"]
+    assert waits["count"] == 3
+    assert waits["max"] >= 0.2
+    assert waits["buckets"]["+Inf"] == 3
+    # The timed out checkout waited the full timeout; reusing the idle
+    # connection afterwards did not
+    assert 1 <= waits["buckets"]["0.1"] <= 2
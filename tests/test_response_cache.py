@@ -0,0 +1,68 @@
+import asyncio
+
+from api.core.response_cache import (
+    ENTRY_OVERHEAD,
+    MemoryBackend,
+    ResponseCache,
+    etag_matches,
+)
+
+
+def test_etag_matching():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_memory_backend_evicts_least_recently_used_within_byte_budget():
+    async def scenario():
+        body = b"x" * 100
+        size = len("a") + len(body) + 34 + ENTRY_OVERHEAD
+        cache = ResponseCache(MemoryBackend(max_bytes=2 * size, ttl=60))
+        calls = []
+
+        async def produce(key):
+            calls.append(key)
+            return body
+
+        for key in ["a", "b", "a", "c", "a", "b"]:
+            await cache.get_or_set(key, ("events",), lambda: produce(key))
+        return calls, cache.stats()
+
+    calls, stats = asyncio.run(scenario())
+    assert calls == ["a", "b", "c", "b"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 4
+    assert stats["evictions"] == 2
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["entries"] * (100 + 34 + 1 + ENTRY_OVERHEAD)
+
+
+def test_invalidation_drops_tagged_entries_and_stale_fills():
+    async def scenario():
+        cache = ResponseCache(MemoryBackend(max_bytes=1_000_000, ttl=60))
+        version = [1]
+
+        async def produce():
+            return str(version[0]).encode()
+
+        await cache.get_or_set("event:1", ("event:1",), produce)
+        await cache.get_or_set("page", ("events",), produce)
+        version[0] = 2
+        await cache.invalidate("events")
+        kept = await cache.get_or_set("event:1", ("event:1",), produce)
+        dropped = await cache.get_or_set("page", ("events",), produce)
+
+        async def slow_produce():
+            # A write commits while this response is being built
+            await cache.invalidate("events")
+            return b"stale"
+
+        await cache.get_or_set("other", ("events",), slow_produce)
+        refilled = await cache.get_or_set("other", ("events",), produce)
+        return kept.body, dropped.body, refilled.body
+
+    assert asyncio.run(scenario()) == (b"1", b"2", b"2")
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.core.cache import TTLCache
+from api.core.config import settings
+from api.core.database import async_session, engine
+from api.core.exceptions import ServiceUnavailableException
+from api.core.security import (
+    PasswordHasher,
+    create_access_token,
+    get_current_user,
+    principal_cache,
+)
+from api.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        # Connections pooled by other test modules belong to other event loops
+        client.portal.call(lambda: engine.dispose(close=False))
+        yield client
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("api.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_authenticated_user_is_cached(client):
+    email = f"auth-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": email, "password": "pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    principal_cache.clear()
+    first = client.get("/auth/me", headers=headers)
+    hits = principal_cache.hits
+    second = client.get("/auth/me", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json() == {"email": email, "id": first.json()["id"]}
+    assert principal_cache.hits == hits + 1
+
+
+def test_user_lookup_does_not_hold_a_transaction(client):
+    email = f"auth-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": email, "password": "pw"}
+    ).json()["access_token"]
+
+    async def look_up():
+        principal_cache.clear()
+        async with async_session() as session:
+            principal = await get_current_user(token, session)
+            return principal.email, session.in_transaction()
+
+    assert client.portal.call(look_up) == (email, False)
+
+
+def test_unknown_user_is_rejected_unless_claims_are_trusted(client, monkeypatch):
+    token = create_access_token({"sub": "999999999", "email": "ghost@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    monkeypatch.setattr(settings, "AUTH_TRUST_CLAIMS_SECONDS", 60)
+    response = client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"email": "ghost@example.com", "id": 999999999}
+
+
+def test_malformed_subject_is_rejected(client):
+    token = create_access_token({"sub": "not-a-number"})
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+def test_password_hasher_sheds_excess_calls(monkeypatch):
+    def slow_hash(password):
+        time.sleep(0.2)
+        return f"hashed-{password}"
+
+    monkeypatch.setattr("api.core.security.get_password_hash", slow_hash)
+    hasher = PasswordHasher(workers=1, max_queue=1)
+
+    async def burst():
+        return await asyncio.gather(
+            *(hasher.hash(str(i)) for i in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    hasher.shutdown()
+
+    assert results[:2] == ["hashed-0", "hashed-1"]
+    assert isinstance(results[2], ServiceUnavailableException)
+    assert results[2].status_code == 503
+    stats = hasher.stats()
+    assert (stats.completed, stats.rejected, stats.in_flight) == (2, 1, 0)
+    assert stats.max_hash_seconds >= 0.2
+    assert stats.max_wait_seconds > 0.1
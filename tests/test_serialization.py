@@ -0,0 +1,36 @@
+import json
+from datetime import datetime
+
+from api.src.events.serialization import dumps, dumps_lines, dumps_page
+
+
+def test_dumps_page_matches_event_page_shape():
+    created_at = datetime(2024, 5, 1, 12, 30, 0, 250000)
+    body = dumps_page([(1, "cpu", {"load": 0.5}, created_at)], "next")
+    assert json.loads(body) == {
+        "items": [
+            {
+                "id": 1,
+                "name": "cpu",
+                "value": {"load": 0.5},
+                "createdAt": "2024-05-01T12:30:00.250000",
+            }
+        ],
+        "next_cursor": "next",
+    }
+
+
+def test_dumps_lines_writes_one_document_per_row():
+    created_at = datetime(2024, 5, 1)
+    rows = [(n, "cpu", {"n": n}, created_at) for n in range(3)]
+    lines = dumps_lines(rows).decode().splitlines()
+    assert [json.loads(line)["value"] for line in lines] == [
+        {"n": 0},
+        {"n": 1},
+        {"n": 2},
+    ]
+
+
+def test_dumps_falls_back_for_big_integers():
+    value = {"big": 2**70, "at": datetime(2024, 5, 1)}
+    assert json.loads(dumps(value)) == {"big": 2**70, "at": "2024-05-01T00:00:00"}
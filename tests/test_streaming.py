@@ -0,0 +1,18 @@
+from api.utils.streaming import iter_lines
+
+
+async def collect(chunks, max_line_bytes=10):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in iter_lines(stream(), max_line_bytes)]
+
+
+async def test_iter_lines_joins_chunks():
+    assert await collect([b"ab", b"c\nd", b"e\n", b"f"]) == [b"abc", b"de", b"f"]
+
+
+async def test_iter_lines_skips_long_lines():
+    chunks = [b"0123456789", b"abc\nok\n", b"0123456789x\nend"]
+    assert await collect(chunks) == [None, b"ok", None, b"end"]